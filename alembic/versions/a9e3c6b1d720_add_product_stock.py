@@ -0,0 +1,29 @@
+"""add product stock
+
+Revision ID: a9e3c6b1d720
+Revises: f2b6d9e4a013
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a9e3c6b1d720"
+down_revision: Union[str, Sequence[str], None] = "f2b6d9e4a013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable: existing products stay untracked until a stock level is set.
+    op.add_column("products", sa.Column("stock", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("products", "stock")
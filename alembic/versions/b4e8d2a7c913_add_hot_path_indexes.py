@@ -0,0 +1,44 @@
+"""add hot path indexes
+
+Revision ID: b4e8d2a7c913
+Revises: d3b8f1c6e259
+Create Date: 2026-10-18 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b4e8d2a7c913"
+down_revision: Union[str, Sequence[str], None] = "d3b8f1c6e259"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index, table, columns, leads with a foreign key column)
+INDEXES = [
+    ("ix_order_items_order_id", "order_items", ["order_id"], True),
+    ("ix_order_items_product_id", "order_items", ["product_id"], True),
+    ("ix_payments_order_id", "payments", ["order_id"], True),
+    ("ix_orders_user_id_created_at", "orders", ["user_id", "created_at"], True),
+    ("ix_orders_status_created_at", "orders", ["status", "created_at"], False),
+    ("ix_products_is_active_sku", "products", ["is_active", "sku"], False),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # InnoDB builds secondary indexes online and drops the implicit index it
+    # had created for a foreign key once one of these can serve it instead.
+    for name, table, columns, _ in INDEXES:
+        op.create_index(op.f(name), table, columns, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # MySQL refuses to drop the only index behind a foreign key; those stay.
+    keep_foreign_key_indexes = op.get_context().dialect.name == "mysql"
+    for name, table, _, foreign_key in reversed(INDEXES):
+        if not (foreign_key and keep_foreign_key_indexes):
+            op.drop_index(op.f(name), table_name=table)
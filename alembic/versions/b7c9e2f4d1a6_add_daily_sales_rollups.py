@@ -0,0 +1,81 @@
+"""add daily sales rollups
+
+Revision ID: b7c9e2f4d1a6
+Revises: 8d2e41c7a9b3
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from collections import defaultdict
+from datetime import timezone
+from decimal import Decimal
+import os
+from typing import Sequence, Union
+from zoneinfo import ZoneInfo
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b7c9e2f4d1a6"
+down_revision: Union[str, Sequence[str], None] = "8d2e41c7a9b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_CHUNK_SIZE = 1000
+
+
+def _business_day(moment, zone):
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(zone).date()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    rollups = op.create_table(
+        "daily_sales_rollups",
+        sa.Column("business_day", sa.Date(), nullable=False),
+        sa.Column("order_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("revenue_total", sa.Numeric(14, 2), nullable=False, server_default="0"),
+        sa.Column("payment_total", sa.Numeric(14, 2), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("CURRENT_TIMESTAMP")),
+        sa.PrimaryKeyConstraint("business_day", name=op.f("pk_daily_sales_rollups")),
+    )
+
+    if context.is_offline_mode():
+        return
+
+    # Backfill from raw rows; grouping happens here so the business day follows BUSINESS_TIMEZONE.
+    zone = ZoneInfo(os.getenv("BUSINESS_TIMEZONE", "Asia/Tokyo"))
+    bind = op.get_bind()
+    orders = sa.table(
+        "orders",
+        sa.column("id", sa.Integer()),
+        sa.column("created_at", sa.DateTime()),
+        sa.column("total", sa.Numeric(12, 2)),
+    )
+    payments = sa.table("payments", sa.column("order_id", sa.Integer()), sa.column("amount", sa.Numeric(12, 2)))
+    totals = defaultdict(lambda: {"order_count": 0, "revenue_total": Decimal("0"), "payment_total": Decimal("0")})
+
+    order_rows = bind.execution_options(yield_per=BACKFILL_CHUNK_SIZE).execute(
+        sa.select(orders.c.created_at, orders.c.total)
+    )
+    for created_at, total in order_rows:
+        day = totals[_business_day(created_at, zone)]
+        day["order_count"] += 1
+        day["revenue_total"] += Decimal(total)
+
+    payment_rows = bind.execution_options(yield_per=BACKFILL_CHUNK_SIZE).execute(
+        sa.select(orders.c.created_at, payments.c.amount).join(payments, payments.c.order_id == orders.c.id)
+    )
+    for created_at, amount in payment_rows:
+        totals[_business_day(created_at, zone)]["payment_total"] += Decimal(amount)
+
+    if totals:
+        op.bulk_insert(rollups, [{"business_day": day, **values} for day, values in totals.items()])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("daily_sales_rollups")
@@ -0,0 +1,62 @@
+"""add product name ngrams
+
+Revision ID: d3b8f1c6e259
+Revises: a9e3c6b1d720
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+import unicodedata
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d3b8f1c6e259"
+down_revision: Union[str, Sequence[str], None] = "a9e3c6b1d720"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+GRAM_TYPE = sa.String(length=8).with_variant(mysql.VARCHAR(8, collation="utf8mb4_bin"), "mysql")
+BACKFILL_CHUNK_SIZE = 1000
+_HIRAGANA_TO_KATAKANA = {code: code + 0x60 for code in range(0x3041, 0x3097)}
+
+
+def _name_grams(name):
+    # Mirrors app.services.product_search.name_grams at the time of writing.
+    folded = unicodedata.normalize("NFKC", name).casefold().translate(_HIRAGANA_TO_KATAKANA)
+    text = " ".join(folded.split()) + " "
+    return {text[index : index + 2] for index in range(len(text) - 1)}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    ngrams = op.create_table(
+        "product_name_ngrams",
+        sa.Column("gram", GRAM_TYPE, nullable=False),
+        sa.Column("product_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["product_id"], ["products.id"], name=op.f("fk_product_name_ngrams_product_id_products"), ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("gram", "product_id", name=op.f("pk_product_name_ngrams")),
+    )
+    op.create_index(op.f("ix_product_name_ngrams_product_id"), "product_name_ngrams", ["product_id"], unique=False)
+
+    if context.is_offline_mode():
+        return
+
+    bind = op.get_bind()
+    products = sa.table("products", sa.column("id", sa.Integer()), sa.column("name", sa.String()))
+    result = bind.execute(sa.select(products.c.id, products.c.name).order_by(products.c.id))
+    for rows in result.partitions(BACKFILL_CHUNK_SIZE):
+        grams = [{"gram": gram, "product_id": product_id} for product_id, name in rows for gram in _name_grams(name)]
+        if grams:
+            bind.execute(ngrams.insert(), grams)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_product_name_ngrams_product_id"), table_name="product_name_ngrams")
+    op.drop_table("product_name_ngrams")
@@ -0,0 +1,156 @@
+"""add sales buckets
+
+Revision ID: e4a1f7c3b285
+Revises: b7c9e2f4d1a6
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from datetime import datetime, time, timezone
+from decimal import Decimal
+from itertools import groupby
+from operator import itemgetter
+import os
+from typing import Sequence, Union
+from zoneinfo import ZoneInfo
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e4a1f7c3b285"
+down_revision: Union[str, Sequence[str], None] = "b7c9e2f4d1a6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Like the other Enum columns, SQLAlchemy stores the member names.
+SALES_GRANULARITY_ENUM = sa.Enum("HOUR", "DAY", name="salesgranularity", native_enum=False, length=16)
+SALES_DIMENSION_ENUM = sa.Enum("PRODUCT", "PAYMENT_METHOD", name="salesdimension", native_enum=False, length=32)
+BACKFILL_CHUNK_SIZE = 1000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    buckets = op.create_table(
+        "sales_buckets",
+        sa.Column("granularity", SALES_GRANULARITY_ENUM, nullable=False),
+        sa.Column("dimension", SALES_DIMENSION_ENUM, nullable=False),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("dimension_key", sa.String(length=64), nullable=False),
+        sa.Column("order_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("quantity", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("amount", sa.Numeric(14, 2), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint(
+            "granularity", "dimension", "bucket_start", "dimension_key", name=op.f("pk_sales_buckets")
+        ),
+    )
+
+    if context.is_offline_mode():
+        return
+
+    # Backfill from raw rows, mirroring app.services.rollups at the time of writing.
+    zone = ZoneInfo(os.getenv("BUSINESS_TIMEZONE", "Asia/Tokyo"))
+    bind = op.get_bind()
+    orders = sa.table(
+        "orders",
+        sa.column("id", sa.Integer()),
+        sa.column("created_at", sa.DateTime()),
+        sa.column("change_amount", sa.Numeric(12, 2)),
+    )
+    order_items = sa.table(
+        "order_items",
+        sa.column("order_id", sa.Integer()),
+        sa.column("product_id", sa.Integer()),
+        sa.column("quantity", sa.Integer()),
+        sa.column("line_total", sa.Numeric(12, 2)),
+    )
+    payments = sa.table(
+        "payments",
+        sa.column("id", sa.Integer()),
+        sa.column("order_id", sa.Integer()),
+        sa.column("method", sa.String()),
+        sa.column("amount", sa.Numeric(12, 2)),
+    )
+    totals = {}
+
+    def add(dimension, rows, normalize_key=str):
+        for _, lines in groupby(rows, key=itemgetter(0)):
+            per_order = {}
+            for _, created_at, key, quantity, amount in lines:
+                key = normalize_key(key)
+                moment = created_at if created_at.tzinfo else created_at.replace(tzinfo=timezone.utc)
+                starts = {
+                    "HOUR": moment.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0),
+                    "DAY": datetime.combine(moment.astimezone(zone).date(), time.min, tzinfo=zone).astimezone(timezone.utc),
+                }
+                for granularity, bucket_start in starts.items():
+                    row = per_order.setdefault(
+                        (granularity, dimension, bucket_start, key),
+                        {
+                            "granularity": granularity,
+                            "dimension": dimension,
+                            "bucket_start": bucket_start,
+                            "dimension_key": key,
+                            "order_count": 1,
+                            "quantity": 0,
+                            "amount": Decimal("0"),
+                        },
+                    )
+                    row["quantity"] += quantity
+                    row["amount"] += Decimal(amount)
+            for bucket_key, row in per_order.items():
+                existing = totals.setdefault(bucket_key, {**row, "order_count": 0, "quantity": 0, "amount": Decimal("0")})
+                for name in ("order_count", "quantity", "amount"):
+                    existing[name] += row[name]
+
+    def net_of_change(rows):
+        # Count what each payment contributed to the total, like net_payment_lines: the change
+        # comes off cash payments first, then off the others, latest first; zero lines are dropped.
+        for order_id, lines in groupby(rows, key=itemgetter(0)):
+            lines = list(lines)
+            net = [Decimal(amount) for *_, amount in lines]
+            remaining = Decimal(lines[0][2])
+            cash_first = sorted(reversed(range(len(lines))), key=lambda index: str(lines[index][3]).upper() != "CASH")
+            for index in cash_first:
+                taken = min(net[index], remaining)
+                net[index] -= taken
+                remaining -= taken
+            for (_, created_at, _, method, _), amount in zip(lines, net):
+                if amount > 0:
+                    yield order_id, created_at, method, 1, amount
+
+    streaming = bind.execution_options(yield_per=BACKFILL_CHUNK_SIZE)
+    add(
+        "PRODUCT",
+        streaming.execute(
+            sa.select(
+                orders.c.id,
+                orders.c.created_at,
+                order_items.c.product_id,
+                order_items.c.quantity,
+                order_items.c.line_total,
+            )
+            .join(order_items, order_items.c.order_id == orders.c.id)
+            .order_by(orders.c.id)
+        ),
+    )
+    # payments.method holds enum names ("CASH"); bucket keys use the API values ("cash").
+    add(
+        "PAYMENT_METHOD",
+        net_of_change(
+            streaming.execute(
+                sa.select(orders.c.id, orders.c.created_at, orders.c.change_amount, payments.c.method, payments.c.amount)
+                .join(payments, payments.c.order_id == orders.c.id)
+                .order_by(orders.c.id, payments.c.id)
+            )
+        ),
+        normalize_key=lambda method: str(method).lower(),
+    )
+
+    if totals:
+        op.bulk_insert(buckets, list(totals.values()))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("sales_buckets")
@@ -0,0 +1,34 @@
+"""add order sequences
+
+Revision ID: f2b6d9e4a013
+Revises: c5d8a2f0e917
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f2b6d9e4a013"
+down_revision: Union[str, Sequence[str], None] = "c5d8a2f0e917"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    order_sequences = op.create_table(
+        "order_sequences",
+        sa.Column("name", sa.String(length=32), nullable=False),
+        sa.Column("next_value", sa.BigInteger(), nullable=False, server_default="1"),
+        sa.PrimaryKeyConstraint("name", name=op.f("pk_order_sequences")),
+    )
+    op.bulk_insert(order_sequences, [{"name": "order_no", "next_value": 1}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("order_sequences")
@@ -20,14 +20,69 @@ def _load_env_file(path: Path | None = None) -> None:
         os.environ.setdefault(key.strip(), value.strip())
 
 
+def _env_int(name: str, default: int) -> int:
+    raw_value = os.getenv(name)
+    try:
+        return int(raw_value) if raw_value is not None else default
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    raw_value = os.getenv(name)
+    try:
+        return float(raw_value) if raw_value is not None else default
+    except ValueError:
+        return default
+
+
 class Settings:
     def __init__(self) -> None:
         _load_env_file()
         self.environment = os.getenv("ENVIRONMENT", "development")
         self.debug = os.getenv("DEBUG", "false").lower() == "true"
         self.database_url = self._build_database_url()
+        self.database_mode = os.getenv("DATABASE_MODE", "sync").lower()
+        # Comma-separated replica URLs for read-only endpoints; empty sends every read to the primary.
+        self.database_read_urls = [
+            url.strip() for url in os.getenv("DATABASE_READ_URL", "").split(",") if url.strip()
+        ]
+        self.read_after_write_seconds = _env_float("READ_AFTER_WRITE_SECONDS", 5.0)
+        self.replica_retry_seconds = _env_float("REPLICA_RETRY_SECONDS", 30.0)
         self.secret_key = self._resolve_secret_key()
         self.access_token_expire_minutes = self._resolve_access_token_expire_minutes()
+        self.catalog_version_ttl_seconds = _env_float("CATALOG_VERSION_TTL_SECONDS", 1.0)
+        self.product_lookup_cache_size = _env_int("PRODUCT_LOOKUP_CACHE_SIZE", 8192)
+        self.product_lookup_cache_ttl_seconds = _env_float("PRODUCT_LOOKUP_CACHE_TTL_SECONDS", 300.0)
+        # Rows per transaction (and per multi-row upsert) in the bulk catalog import.
+        self.import_chunk_size = _env_int("IMPORT_CHUNK_SIZE", 1000)
+        self.business_timezone = os.getenv("BUSINESS_TIMEZONE", "Asia/Tokyo")
+        self.token_cache_size = _env_int("TOKEN_CACHE_SIZE", 4096)
+        self.token_cache_ttl_seconds = _env_float("TOKEN_CACHE_TTL_SECONDS", 300.0)
+        self.user_cache_size = _env_int("USER_CACHE_SIZE", 1024)
+        self.user_cache_ttl_seconds = _env_float("USER_CACHE_TTL_SECONDS", 30.0)
+        self.password_scrypt_n = _env_int("PASSWORD_SCRYPT_N", 2**14)
+        self.password_pool_size = _env_int("PASSWORD_POOL_SIZE", os.cpu_count() or 1)
+        self.password_pool_queue_depth = _env_int("PASSWORD_POOL_QUEUE_DEPTH", 64)
+        self.password_pool_kind = os.getenv("PASSWORD_POOL_KIND", "thread")
+        self.order_number_strategy = os.getenv("ORDER_NUMBER_STRATEGY", "block").lower()
+        self.order_number_block_size = _env_int("ORDER_NUMBER_BLOCK_SIZE", 1000)
+        self.idempotency_key_ttl_hours = _env_float("IDEMPOTENCY_KEY_TTL_HOURS", 24.0)
+        self.idempotency_cache_size = _env_int("IDEMPOTENCY_CACHE_SIZE", 2048)
+        self.slow_query_ms = _env_float("SLOW_QUERY_MS", 200.0)
+        # Bound values can carry emails, hashes and tokens, so they are logged only on request.
+        self.slow_query_log_parameters = os.getenv("SLOW_QUERY_LOG_PARAMETERS", "false").lower() == "true"
+        self.sql_repeat_limit = _env_int("SQL_REPEAT_LIMIT", 0)
+        self.sql_repeat_strict = os.getenv("SQL_REPEAT_STRICT", "false").lower() == "true"
+        self.metrics_enabled = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+        self.fast_json = os.getenv("FAST_JSON", "true").lower() == "true"
+        self.db_pool_size = _env_int("DB_POOL_SIZE", 5)
+        self.db_max_overflow = _env_int("DB_MAX_OVERFLOW", 10)
+        self.db_pool_timeout_seconds = _env_float("DB_POOL_TIMEOUT_SECONDS", 30.0)
+        # Azure MySQL drops idle sessions; recycle well before its idle timeout.
+        self.db_pool_recycle_seconds = _env_int("DB_POOL_RECYCLE_SECONDS", 280)
+        self.db_pool_pre_ping = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+        self.db_pool_use_lifo = os.getenv("DB_POOL_USE_LIFO", "false").lower() == "true"
 
     def _build_database_url(self) -> str:
         url = os.getenv("DATABASE_URL")
@@ -61,13 +116,54 @@ class Settings:
         except ValueError:
             return 30
 
+    def engine_options(self, url: str) -> Dict[str, object]:
+        options: Dict[str, object] = {"future": True, "pool_pre_ping": self.db_pool_pre_ping}
+        if url.startswith("sqlite"):
+            options["connect_args"] = {"check_same_thread": False}
+            return options
+        options.update(
+            pool_size=self.db_pool_size,
+            max_overflow=self.db_max_overflow,
+            pool_timeout=self.db_pool_timeout_seconds,
+            pool_recycle=self.db_pool_recycle_seconds,
+            pool_use_lifo=self.db_pool_use_lifo,
+        )
+        return options
+
     @property
     def sqlalchemy_engine_options(self) -> Dict[str, object]:
-        options: Dict[str, object] = {"future": True, "pool_pre_ping": True}
-        if self.database_url.startswith("sqlite"):
-            options["connect_args"] = {"check_same_thread": False}
+        return self.engine_options(self.database_url)
+
+    @property
+    def database_async(self) -> bool:
+        return self.database_mode == "async"
+
+    @staticmethod
+    def async_url(url: str) -> str:
+        """``url`` rewritten for the asyncio driver of the same backend."""
+
+        scheme, sep, rest = url.partition("://")
+        backend = scheme.split("+", 1)[0]
+        drivers = {"mysql": "aiomysql", "sqlite": "aiosqlite"}
+        if backend not in drivers:
+            return url
+        return f"{backend}+{drivers[backend]}{sep}{rest}"
+
+    @property
+    def async_database_url(self) -> str:
+        """``database_url`` rewritten for the asyncio driver of the same backend."""
+
+        return self.async_url(self.database_url)
+
+    def async_options(self, url: str) -> Dict[str, object]:
+        options = self.engine_options(url)
+        options.pop("future", None)
         return options
 
+    @property
+    def async_engine_options(self) -> Dict[str, object]:
+        return self.async_options(self.database_url)
+
 
 @lru_cache()
 def get_settings() -> Settings:
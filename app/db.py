@@ -1,15 +1,37 @@
-﻿from typing import Generator
+﻿from functools import lru_cache
+from typing import Any, AsyncGenerator, Dict, Generator
 
-from sqlalchemy import create_engine
+from fastapi import Depends, Request
+from sqlalchemy import create_engine, make_url
 from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from app.config import get_settings
 from app.models.base import Base
+from app.utils.db_pool import PoolStats, timed_pool_class
+from app.utils.replicas import ReplicaSet, wrote_recently
+from app.utils.sql_stats import instrument_engine
 
 settings = get_settings()
+sync_pool_stats = PoolStats()
+async_pool_stats = PoolStats()
 
-engine: Engine = create_engine(settings.database_url, **settings.sqlalchemy_engine_options)
+
+def _with_timed_pool(options: Dict[str, object], base: type[QueuePool], stats: PoolStats) -> Dict[str, object]:
+    # Only server backends get a sized queue pool; SQLite keeps SQLAlchemy's default pool.
+    if "pool_size" not in options:
+        return options
+    return {**options, "poolclass": timed_pool_class(base, stats)}
+
+
+engine: Engine = create_engine(
+    settings.database_url, **_with_timed_pool(settings.sqlalchemy_engine_options, QueuePool, sync_pool_stats)
+)
+sync_pool_stats.attach(engine)
+instrument_engine(engine)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False, future=True)
 
 
@@ -21,4 +43,148 @@ def get_db() -> Generator[Session, None, None]:
         session.close()
 
 
-__all__ = ["engine", "SessionLocal", "Base", "get_db"]
+def _replica_name(url: str) -> str:
+    return make_url(url).render_as_string(hide_password=True)
+
+
+def _build_read_replicas() -> ReplicaSet[sessionmaker[Session]]:
+    replicas: list[tuple[str, sessionmaker[Session]]] = []
+    for url in settings.database_read_urls:
+        name = _replica_name(url)
+        stats = replica_pool_stats[name] = PoolStats()
+        replica_engine = create_engine(url, **_with_timed_pool(settings.engine_options(url), QueuePool, stats))
+        stats.attach(replica_engine)
+        instrument_engine(replica_engine)
+        replicas.append((name, sessionmaker(bind=replica_engine, autoflush=False, expire_on_commit=False)))
+    return ReplicaSet(replicas, retry_after=settings.replica_retry_seconds)
+
+
+replica_pool_stats: Dict[str, PoolStats] = {}
+read_replicas = _build_read_replicas()
+
+
+def get_read_db(request: Request, primary: Session = Depends(get_db)) -> Generator[Session, None, None]:
+    """Session for read-only endpoints: a healthy replica, falling back to the primary.
+
+    Clients that committed a write within READ_AFTER_WRITE_SECONDS stay on the
+    primary so they read their own writes.
+    """
+
+    if not len(read_replicas) or wrote_recently(request.headers, settings.read_after_write_seconds):
+        yield primary
+        return
+    for name, factory in read_replicas.candidates():
+        session = factory()
+        try:
+            session.connection()  # checkout plus pre-ping doubles as the health check
+        except DBAPIError:
+            session.close()
+            read_replicas.mark_down(name)
+            continue
+        try:
+            yield session
+        except DBAPIError as exc:
+            if exc.connection_invalidated:
+                read_replicas.mark_down(name)
+            raise
+        finally:
+            session.close()
+        return
+    yield primary
+
+
+@lru_cache()
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """Build the asyncio engine on first use so the async drivers stay optional in sync mode."""
+
+    async_engine: AsyncEngine = create_async_engine(
+        settings.async_database_url,
+        **_with_timed_pool(settings.async_engine_options, AsyncAdaptedQueuePool, async_pool_stats),
+    )
+    async_pool_stats.attach(async_engine.sync_engine)
+    instrument_engine(async_engine.sync_engine)
+    return async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+@lru_cache()
+def get_async_read_replicas() -> ReplicaSet[async_sessionmaker[AsyncSession]]:
+    replicas: list[tuple[str, async_sessionmaker[AsyncSession]]] = []
+    for url in settings.database_read_urls:
+        async_engine = create_async_engine(settings.async_url(url), **settings.async_options(url))
+        instrument_engine(async_engine.sync_engine)
+        replicas.append((_replica_name(url), async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)))
+    return ReplicaSet(replicas, retry_after=settings.replica_retry_seconds)
+
+
+async def dispose_async_engine() -> None:
+    """Close pooled async connections (and aiosqlite worker threads) if the engines were ever built."""
+
+    if get_async_sessionmaker.cache_info().currsize:
+        await get_async_sessionmaker().kw["bind"].dispose()
+        get_async_sessionmaker.cache_clear()
+    if get_async_read_replicas.cache_info().currsize:
+        for _, factory in get_async_read_replicas().members():
+            await factory.kw["bind"].dispose()
+        get_async_read_replicas.cache_clear()
+
+
+def pool_statistics() -> Dict[str, Any]:
+    """Live pool occupancy plus event counters for this worker's engines."""
+
+    return {
+        "sync": sync_pool_stats.snapshot(),
+        "async": async_pool_stats.snapshot() if get_async_sessionmaker.cache_info().currsize else None,
+        "replicas": [
+            {**replica, "pool": replica_pool_stats[replica["name"]].snapshot()} for replica in read_replicas.status()
+        ],
+    }
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with get_async_sessionmaker()() as session:
+        yield session
+
+
+async def get_async_read_db(
+    request: Request, primary: AsyncSession = Depends(get_async_db)
+) -> AsyncGenerator[AsyncSession, None]:
+    """Asyncio counterpart of :func:`get_read_db`."""
+
+    replicas = get_async_read_replicas()
+    if not len(replicas) or wrote_recently(request.headers, settings.read_after_write_seconds):
+        yield primary
+        return
+    for name, factory in replicas.candidates():
+        session = factory()
+        try:
+            await session.connection()
+        except DBAPIError:
+            await session.close()
+            replicas.mark_down(name)
+            continue
+        try:
+            yield session
+        except DBAPIError as exc:
+            if exc.connection_invalidated:
+                replicas.mark_down(name)
+            raise
+        finally:
+            await session.close()
+        return
+    yield primary
+
+
+__all__ = [
+    "engine",
+    "SessionLocal",
+    "Base",
+    "get_db",
+    "get_read_db",
+    "dispose_async_engine",
+    "get_async_db",
+    "get_async_read_db",
+    "get_async_read_replicas",
+    "get_async_sessionmaker",
+    "pool_statistics",
+    "read_replicas",
+]
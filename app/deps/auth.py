@@ -1,38 +1,127 @@
 from __future__ import annotations
 
+import hashlib
+import time
+from typing import Any, Dict
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db import get_db
-from app.models.user import User
+from app.config import get_settings
+from app.db import get_async_db, get_db
+from app.models.user import User, UserRole
+from app.utils.cache import TTLCache
 from app.utils.security import TokenError, verify_token
 
 bearer_scheme = HTTPBearer(auto_error=False)
 
+_settings = get_settings()
+token_cache: TTLCache[Dict[str, Any]] = TTLCache(_settings.token_cache_size, _settings.token_cache_ttl_seconds)
+user_cache: TTLCache[User] = TTLCache(_settings.user_cache_size, _settings.user_cache_ttl_seconds)
+
+
+def _verify_token_cached(token: str) -> Dict[str, Any]:
+    """Verify a JWT, reusing the payload of a recent identical token until it expires."""
+
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
+
+    payload = verify_token(token)
+    remaining = float(payload["exp"]) - time.time() if "exp" in payload else None
+    token_cache.set(key, payload, ttl=remaining)
+    return payload
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
-    db: Session = Depends(get_db),
-) -> User:
-    """Resolve and return the currently authenticated user."""
 
+def invalidate_user(user_id: int) -> None:
+    """Drop a cached user so the next request reloads it (role change, deletion, ...)."""
+
+    user_cache.pop(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target: User) -> None:  # noqa: ANN001
+    invalidate_user(target.id)
+
+
+def auth_cache_stats() -> dict[str, dict[str, int]]:
+    return {"token": token_cache.stats(), "user": user_cache.stats()}
+
+
+def clear_auth_caches() -> None:
+    token_cache.clear()
+    user_cache.clear()
+
+
+def _authenticated_user_id(credentials: HTTPAuthorizationCredentials | None) -> int:
     if credentials is None or not credentials.credentials:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
 
     try:
-        payload = verify_token(credentials.credentials)
+        payload = _verify_token_cached(credentials.credentials)
     except TokenError as exc:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc)) from exc
 
     subject = payload.get("sub")
     try:
-        user_id = int(subject)
+        return int(subject)
     except (TypeError, ValueError) as exc:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token subject") from exc
 
-    user = db.get(User, user_id)
+
+def _detached_copy(user: User) -> User:
+    """A transient ``User`` holding the loaded column values and bound to no session.
+
+    The session that loaded ``user`` expires it on rollback (a 409, a failed batch
+    chunk, ...), after which any attribute access on a cached live instance raises
+    DetachedInstanceError. The copy is shared across requests, so it is never modified.
+    """
+
+    return User(**{attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs})
+
+
+def _remember_user(user_id: int, user: User | None) -> User:
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    snapshot = _detached_copy(user)
+    user_cache.set(user_id, snapshot)
+    return snapshot
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
+    db: Session = Depends(get_db),
+) -> User:
+    """Resolve and return the currently authenticated user."""
+
+    user_id = _authenticated_user_id(credentials)
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+    return _remember_user(user_id, db.get(User, user_id))
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
+    """Asyncio counterpart of :func:`get_current_user` for routes on the async database path."""
+
+    user_id = _authenticated_user_id(credentials)
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+    return _remember_user(user_id, await db.get(User, user_id))
+
+
+def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+    """Require the authenticated user to have the admin role."""
 
-    return user
+    if current_user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin role required")
+    return current_user
@@ -1,12 +1,19 @@
 ﻿from __future__ import annotations
 
 import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from typing import List, Tuple
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.routes import auth, health, orders, products, reports
+from app.config import get_settings
+from app.db import dispose_async_engine
+from app.routes import auth, health, internal, orders, products, reports
+from app.utils.metrics import MetricsMiddleware
+from app.utils.replicas import LAST_WRITE_HEADER, ReadAfterWriteMiddleware
+from app.utils.sql_stats import QueryAccountingMiddleware
 
 DEFAULT_CORS_ORIGINS = (
     "http://localhost:3000",
@@ -31,8 +38,14 @@ def _resolve_cors_settings() -> Tuple[List[str], bool]:
     return origins, allow_credentials
 
 
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    yield
+    await dispose_async_engine()
+
+
 def create_app() -> FastAPI:
-    app = FastAPI(title="POS API", version="0.1.0")
+    app = FastAPI(title="POS API", version="0.1.0", lifespan=lifespan)
     cors_origins, allow_credentials = _resolve_cors_settings()
     app.add_middleware(
         CORSMiddleware,
@@ -40,13 +53,21 @@ def create_app() -> FastAPI:
         allow_credentials=allow_credentials,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[orders.NEXT_CURSOR_HEADER, orders.IDEMPOTENT_REPLAY_HEADER, LAST_WRITE_HEADER],
     )
+    app.add_middleware(QueryAccountingMiddleware)
+    settings = get_settings()
+    if settings.database_read_urls:
+        app.add_middleware(ReadAfterWriteMiddleware, window=settings.read_after_write_seconds)
+    if settings.metrics_enabled:
+        app.add_middleware(MetricsMiddleware)
 
     app.include_router(health.router)
     app.include_router(auth.router)
     app.include_router(products.router)
     app.include_router(orders.router)
     app.include_router(reports.router)
+    app.include_router(internal.router)
 
     return app
 
@@ -1,8 +1,13 @@
 ﻿"""ORM model package exports."""
 from app.models.base import Base, metadata
+from app.models.catalog import CatalogState
+from app.models.idempotency import IdempotencyKey
 from app.models.order import Order, OrderItem, OrderStatus
+from app.models.order_sequence import OrderSequence
 from app.models.payment import Payment, PaymentMethod
 from app.models.product import Product
+from app.models.product_name_gram import ProductNameGram
+from app.models.report import DailySalesRollup, SalesBucket, SalesDimension, SalesGranularity
 from app.models.user import User, UserRole
 
 __all__ = [
@@ -11,9 +16,17 @@ __all__ = [
     "User",
     "UserRole",
     "Product",
+    "ProductNameGram",
+    "CatalogState",
     "Order",
     "OrderStatus",
     "OrderItem",
+    "OrderSequence",
+    "IdempotencyKey",
     "Payment",
     "PaymentMethod",
+    "DailySalesRollup",
+    "SalesBucket",
+    "SalesDimension",
+    "SalesGranularity",
 ]
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from sqlalchemy import BigInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class OrderSequence(Base):
+    """Named counters from which workers reserve blocks of order numbers."""
+
+    __tablename__ = "order_sequences"
+
+    name: Mapped[str] = mapped_column(String(32), primary_key=True)
+    next_value: Mapped[int] = mapped_column(BigInteger, default=1, nullable=False)
+
+
+__all__ = ["OrderSequence"]
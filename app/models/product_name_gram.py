@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from sqlalchemy import ForeignKey, String
+from sqlalchemy.dialects import mysql
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+# Binary collation on MySQL: grams are already normalised, and an accent/case-insensitive
+# collation would make distinct grams of one product collide on the primary key.
+GRAM_TYPE = String(8).with_variant(mysql.VARCHAR(8, collation="utf8mb4_bin"), "mysql")
+
+
+class ProductNameGram(Base):
+    """Inverted index of normalised product-name bigrams used by ``GET /products/search``."""
+
+    __tablename__ = "product_name_ngrams"
+
+    gram: Mapped[str] = mapped_column(GRAM_TYPE, primary_key=True)
+    product_id: Mapped[int] = mapped_column(
+        ForeignKey("products.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+
+
+__all__ = ["ProductNameGram"]
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from decimal import Decimal
+from enum import StrEnum
+
+from sqlalchemy import Date, DateTime, Enum, Numeric, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class DailySalesRollup(Base):
+    """Per business day sales totals maintained by create_order."""
+
+    __tablename__ = "daily_sales_rollups"
+
+    business_day: Mapped[date] = mapped_column(Date, primary_key=True)
+    order_count: Mapped[int] = mapped_column(default=0, nullable=False)
+    revenue_total: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=Decimal("0"), nullable=False)
+    payment_total: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=Decimal("0"), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+
+class SalesDimension(StrEnum):
+    PRODUCT = "product"
+    PAYMENT_METHOD = "payment_method"
+
+
+class SalesGranularity(StrEnum):
+    HOUR = "hour"
+    DAY = "day"
+
+
+class SalesBucket(Base):
+    """Sales per product or payment method and hour or business day, maintained by create_order.
+
+    ``bucket_start`` is stored in UTC: the hour start for hourly buckets and the
+    business-timezone midnight for daily ones, so any report is a single range
+    scan over the primary key.
+    """
+
+    __tablename__ = "sales_buckets"
+
+    granularity: Mapped[SalesGranularity] = mapped_column(
+        Enum(SalesGranularity, native_enum=False, length=16), primary_key=True
+    )
+    dimension: Mapped[SalesDimension] = mapped_column(
+        Enum(SalesDimension, native_enum=False, length=32), primary_key=True
+    )
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    dimension_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    order_count: Mapped[int] = mapped_column(default=0, nullable=False)
+    quantity: Mapped[int] = mapped_column(default=0, nullable=False)
+    amount: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=Decimal("0"), nullable=False)
+
+
+__all__ = ["DailySalesRollup", "SalesBucket", "SalesDimension", "SalesGranularity"]
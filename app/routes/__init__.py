@@ -1,10 +1,11 @@
 """FastAPI route modules."""
 
-from app.routes import auth, health, orders, products, reports
+from app.routes import auth, health, internal, orders, products, reports
 
 __all__ = [
     "auth",
     "health",
+    "internal",
     "orders",
     "products",
     "reports",
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
@@ -6,17 +7,59 @@ from app.config import get_settings
 from app.db import get_db
 from app.models.user import User
 from app.schemas.auth import LoginRequest, LoginResponse
-from app.utils.security import create_access_token, verify_password
+from app.utils.security import (
+    PasswordPoolBusy,
+    create_access_token,
+    dummy_password_hash,
+    get_password_pool,
+    needs_rehash,
+)
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
-@router.post("/login", response_model=LoginResponse, summary="Authenticate user")
-def login(payload: LoginRequest, db: Session = Depends(get_db)) -> LoginResponse:
-    user = db.execute(select(User).where(User.email == payload.email)).scalar_one_or_none()
-    if not user or not verify_password(payload.password, user.password_hash):
+def _find_user(db: Session, email: str) -> User | None:
+    return db.execute(select(User).where(User.email == email)).scalar_one_or_none()
+
+
+def _store_password_hash(db: Session, user: User, password_hash: str) -> None:
+    user.password_hash = password_hash
+    db.commit()
+
+
+@router.post(
+    "/login",
+    response_model=LoginResponse,
+    summary="Authenticate user",
+    responses={status.HTTP_503_SERVICE_UNAVAILABLE: {"description": "Password hashing pool saturated"}},
+)
+async def login(payload: LoginRequest, db: Session = Depends(get_db)) -> LoginResponse:
+    # The handler is async so waiting on the hashing pool does not hold a request worker thread;
+    # only the short DB calls borrow one.
+    user = await run_in_threadpool(_find_user, db, payload.email)
+    # Unknown emails still pay for a scrypt verification, so timing does not reveal which accounts exist.
+    password_hash = user.password_hash if user else await run_in_threadpool(dummy_password_hash)
+
+    pool = get_password_pool()
+    try:
+        valid = await pool.verify(payload.password, password_hash)
+    except PasswordPoolBusy as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent logins, retry shortly",
+            headers={"Retry-After": "1"},
+        ) from exc
+    if not user or not valid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
+    if needs_rehash(user.password_hash):
+        try:
+            upgraded = await pool.hash(payload.password)
+        except PasswordPoolBusy:
+            upgraded = None  # keep the old hash; the next login retries the upgrade
+        if upgraded:
+            await run_in_threadpool(_store_password_hash, db, user, upgraded)
+
     settings = get_settings()
     token = create_access_token(user.id, settings.access_token_expire_minutes)
     return LoginResponse(access_token=token, user=user)
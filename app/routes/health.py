@@ -1,4 +1,6 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
+
+from app.utils.metrics import render_metrics
 
 router = APIRouter(tags=["system"])
 
@@ -8,3 +10,11 @@ def healthz() -> dict[str, str]:
     """Return service health."""
 
     return {"status": "ok"}
+
+
+@router.get("/metrics", summary="Prometheus metrics", include_in_schema=False)
+def metrics() -> Response:
+    """Expose request metrics in the Prometheus text format."""
+
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
@@ -0,0 +1,25 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends
+
+from app.db import pool_statistics
+from app.deps.auth import auth_cache_stats, get_current_admin
+from app.models.user import User
+
+router = APIRouter(prefix="/internal", tags=["system"])
+
+
+@router.get("/auth-cache", summary="Authentication cache statistics")
+def get_auth_cache_stats(current_user: User = Depends(get_current_admin)) -> dict[str, dict[str, int]]:
+    """Return hit/miss counters of the token and user caches in this worker."""
+
+    _ = current_user
+    return auth_cache_stats()
+
+
+@router.get("/db-pool", summary="Database connection pool statistics")
+def get_db_pool_stats(current_user: User = Depends(get_current_admin)) -> dict[str, Any]:
+    """Return pool occupancy, checkout wait and connection churn counters in this worker."""
+
+    _ = current_user
+    return pool_statistics()
@@ -1,124 +1,619 @@
 ﻿from __future__ import annotations
 
-from datetime import datetime
-from decimal import Decimal, ROUND_HALF_UP
-import uuid
+from collections import Counter
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Literal
+import base64
+import csv
+import io
+import json
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, and_, insert, or_, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
-from app.deps.auth import get_current_user
-from app.db import get_db
-from app.models import Order, OrderItem, OrderStatus, Payment, PaymentMethod, Product, User
-from app.schemas.order import OrderCreate, OrderRead
+from app.config import get_settings
+from app.deps.auth import get_current_user, get_current_user_async
+from app.db import get_async_db, get_db, get_read_db
+from app.models import IdempotencyKey, Order, OrderItem, OrderStatus, Payment, PaymentMethod, Product, User
+from app.schemas.order import (
+    OrderBatchCreate,
+    OrderBatchItemResult,
+    OrderBatchResult,
+    OrderCreate,
+    OrderItemRead,
+    OrderRead,
+    PaymentRead,
+)
+from app.services import idempotency, pricing
+from app.services.inventory import reserve_stock, short_products, stock_demand
+from app.services.order_numbers import next_order_number, next_order_numbers
+from app.services.rollups import (
+    net_payment_lines,
+    record_order_buckets,
+    record_order_sale,
+    record_order_sales,
+    record_orders_buckets,
+)
+from app.utils import fastjson
+from app.utils.fields import FIELDS_DESCRIPTION, parse_fields
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
-MONEY_QUANTIZER = Decimal("0.01")
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+IDEMPOTENT_REPLAY_HEADER = "Idempotent-Replayed"
+CURSOR_VERSION = "o2"
+EXPORT_CHUNK_SIZE = 1000
+BATCH_CHUNK_SIZE = 100
+EXPORT_COLUMNS = (
+    Order.id,
+    Order.order_no,
+    Order.user_id,
+    Order.subtotal,
+    Order.tax_total,
+    Order.total,
+    Order.paid_amount,
+    Order.change_amount,
+    Order.status,
+    Order.memo,
+    Order.created_at,
+)
+EXPORT_FIELDS = tuple(column.key for column in EXPORT_COLUMNS)
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+# Fast list path: columns in response-schema field order, projected straight into dicts.
+ORDER_LIST_FIELDS = tuple(OrderRead.model_fields)
+ORDER_NESTED_FIELDS = ("items", "payments")
+ORDER_ITEM_READ_FIELDS = tuple(OrderItemRead.model_fields)
+ORDER_ITEM_READ_COLUMNS = (OrderItem.order_id, *(getattr(OrderItem, name) for name in ORDER_ITEM_READ_FIELDS))
+PAYMENT_READ_FIELDS = tuple(PaymentRead.model_fields)
+PAYMENT_READ_COLUMNS = (Payment.order_id, *(getattr(Payment, name) for name in PAYMENT_READ_FIELDS))
 
-def quantize(amount: Decimal) -> Decimal:
-    return amount.quantize(MONEY_QUANTIZER, rounding=ROUND_HALF_UP)
+def encode_cursor(created_at: datetime, order_id: int) -> str:
+    """Opaque keyset cursor holding the last row's ``(created_at, id)``, exactly as read back."""
 
-def generate_order_no() -> str:
-    timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
-    suffix = uuid.uuid4().hex[:4].upper()
-    return f"{timestamp}-{suffix}"
+    raw = f"{CURSOR_VERSION}:{created_at.isoformat()}:{order_id}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
 
-@router.get("/", response_model=list[OrderRead], summary="List orders")
-def list_orders(db: Session = Depends(get_db)) -> list[OrderRead]:
-    orders = (
-        db.execute(
-            select(Order)
-            .options(joinedload(Order.items), joinedload(Order.payments))
-            .order_by(Order.created_at.desc())
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        version, anchor = base64.urlsafe_b64decode(padded).decode("ascii").split(":", 1)
+        if version != CURSOR_VERSION:
+            raise ValueError(version)
+        created_at, _, order_id = anchor.rpartition(":")
+        return datetime.fromisoformat(created_at), int(order_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+
+def _filter_created_range(stmt: Select, created_from: datetime | None, created_to: datetime | None) -> Select:
+    if created_from is not None:
+        stmt = stmt.where(Order.created_at >= created_from)
+    if created_to is not None:
+        stmt = stmt.where(Order.created_at < created_to)
+    return stmt
+
+def _order_projection(fields: Sequence[str]) -> tuple[str, ...]:
+    """Order columns to select for ``fields``; ``id`` and ``created_at`` are always read for the cursor."""
+
+    names = ("id", *(name for name in fields if name != "id" and name not in ORDER_NESTED_FIELDS))
+    return names if "created_at" in names else (*names, "created_at")
+
+def _order_documents(
+    db: Session, rows: Sequence[Sequence[Any]], fields: Sequence[str] = ORDER_LIST_FIELDS
+) -> list[dict[str, Any]]:
+    """Build OrderRead-shaped dicts from projected order rows.
+
+    Items and payments cost one query each, and only when ``fields`` asks for them.
+    """
+
+    names = _order_projection(fields)
+    nested = [name for name in ORDER_NESTED_FIELDS if name in fields]
+    orders = [dict(zip(names, row)) for row in rows]
+    by_id: dict[int, dict[str, Any]] = {}
+    for order in orders:
+        for name in nested:
+            order[name] = []
+        by_id[order["id"]] = order
+    if by_id and "items" in nested:
+        item_rows = db.execute(
+            select(*ORDER_ITEM_READ_COLUMNS).where(OrderItem.order_id.in_(by_id)).order_by(OrderItem.id)
         )
-        .scalars()
-        .unique()
-        .all()
+        for order_id, *values in item_rows:
+            by_id[order_id]["items"].append(dict(zip(ORDER_ITEM_READ_FIELDS, values)))
+    if by_id and "payments" in nested:
+        payment_rows = db.execute(
+            select(*PAYMENT_READ_COLUMNS).where(Payment.order_id.in_(by_id)).order_by(Payment.id)
+        )
+        for order_id, *values in payment_rows:
+            by_id[order_id]["payments"].append(dict(zip(PAYMENT_READ_FIELDS, values)))
+    for name in ("id", "created_at"):
+        if name not in fields:
+            for order in orders:
+                del order[name]
+    return orders
+
+def _export_value(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def _render_ndjson(rows: Sequence[Sequence[Any]]) -> str:
+    return "".join(
+        json.dumps(dict(zip(EXPORT_FIELDS, map(_export_value, row))), ensure_ascii=False) + "\n" for row in rows
+    )
+
+def _render_csv(rows: Sequence[Sequence[Any]]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([_export_value(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+def load_available_products(db: Session, product_ids: Iterable[int]) -> dict[int, Product]:
+    """Load the active products among ``product_ids`` in one query."""
+
+    return {
+        product.id: product
+        for product in db.execute(select(Product).where(Product.id.in_(set(product_ids)))).scalars()
+        if product.is_active
+    }
+
+def unavailable_products_error(missing: Iterable[int]) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Product {', '.join(map(str, sorted(missing)))} not available",
+    )
+
+def insufficient_stock_error(product_ids: Iterable[int]) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"Insufficient stock for product {', '.join(map(str, sorted(product_ids)))}",
+    )
+
+def resolve_products(db: Session, product_ids: Sequence[int]) -> dict[int, Product]:
+    """Load every requested product in one query, failing on any missing or inactive id."""
+
+    products = load_available_products(db, product_ids)
+    missing = set(product_ids) - products.keys()
+    if missing:
+        raise unavailable_products_error(missing)
+    return products
+
+@router.get("/", response_model=list[OrderRead], summary="List orders")
+def list_orders(
+    response: Response,
+    cursor: str | None = Query(default=None, description="Opaque cursor from a previous X-Next-Cursor header"),
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    created_from: datetime | None = Query(default=None, alias="from"),
+    created_to: datetime | None = Query(default=None, alias="to"),
+    status_filter: OrderStatus | None = Query(default=None, alias="status"),
+    user_id: int | None = Query(default=None),
+    fields: str | None = Query(default=None, description=FIELDS_DESCRIPTION),
+    db: Session = Depends(get_read_db),
+) -> list[OrderRead] | Response:
+    selected = parse_fields(fields, ORDER_LIST_FIELDS)
+    # A sparse fieldset is always served from a column projection, whatever FAST_JSON says.
+    projected = selected is not None or get_settings().fast_json
+    selected = selected or ORDER_LIST_FIELDS
+    stmt = (
+        select(*(getattr(Order, name) for name in _order_projection(selected))) if projected
+        else select(Order).options(selectinload(Order.items), selectinload(Order.payments))
     )
+    stmt = stmt.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit + 1)
+    stmt = _filter_created_range(stmt, created_from, created_to)
+    if status_filter is not None:
+        stmt = stmt.where(Order.status == status_filter)
+    if user_id is not None:
+        stmt = stmt.where(Order.user_id == user_id)
+    if cursor is not None:
+        # The cursor carries the anchor's created_at as read from the database, so the keyset
+        # predicate matches what the index holds and still works once that order is gone.
+        anchor_created_at, anchor_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            or_(
+                Order.created_at < anchor_created_at,
+                and_(Order.created_at == anchor_created_at, Order.id < anchor_id),
+            )
+        )
+
+    result = db.execute(stmt)
+    orders = list(result.all() if projected else result.scalars().all())
+    headers: dict[str, str] = {}
+    if len(orders) > limit:
+        orders = orders[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(orders[-1].created_at, orders[-1].id)
+    if projected:
+        return fastjson.FastJSONResponse(_order_documents(db, orders, selected), headers=headers)
+    response.headers.update(headers)
     return orders
 
-@router.post("/", response_model=OrderRead, status_code=status.HTTP_201_CREATED, summary="Create order")
-def create_order(
-    payload: OrderCreate,
+@router.get("/export", summary="Export orders as NDJSON or CSV")
+def export_orders(
+    export_format: Literal["ndjson", "csv"] = Query(default="ndjson", alias="format"),
+    created_from: datetime | None = Query(default=None, alias="from"),
+    created_to: datetime | None = Query(default=None, alias="to"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-) -> OrderRead:
-    if not payload.items:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Order requires at least one item")
+) -> StreamingResponse:
+    _ = current_user
+
+    stmt = _filter_created_range(
+        select(*EXPORT_COLUMNS).order_by(Order.created_at, Order.id), created_from, created_to
+    )
+    render = _render_csv if export_format == "csv" else _render_ndjson
+
+    def stream() -> Iterator[str]:
+        if export_format == "csv":
+            yield _render_csv([EXPORT_FIELDS])
+        # yield_per keeps a server-side cursor open and hands back plain rows one chunk at a time.
+        result = db.execute(stmt, execution_options={"yield_per": EXPORT_CHUNK_SIZE})
+        try:
+            for rows in result.partitions():
+                yield render(rows)
+        finally:
+            result.close()
+
+    filename = f"orders.{export_format}"
+    return StreamingResponse(
+        stream(),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@dataclass
+class PricedOrder:
+    """Totals and row values of one priced order, ready for the ORM or a bulk insert."""
+
+    subtotal: Decimal
+    tax_total: Decimal
+    total: Decimal
+    paid_amount: Decimal
+    change_amount: Decimal
+    status: OrderStatus
+    items: list[dict[str, Any]]
+    payments: list[dict[str, Any]]
+
+    def order_values(self) -> dict[str, Any]:
+        return {
+            "subtotal": self.subtotal,
+            "tax_total": self.tax_total,
+            "total": self.total,
+            "paid_amount": self.paid_amount,
+            "change_amount": self.change_amount,
+            "status": self.status,
+        }
+
+    def product_lines(self) -> list[tuple[int, int, Decimal]]:
+        return [(line["product_id"], line["quantity"], line["line_total"]) for line in self.items]
+
+    def payment_lines(self) -> list[tuple[str, Decimal]]:
+        """What each payment contributed to the total, net of change, for the sales buckets."""
+
+        tendered = [(payment["method"], payment["amount"]) for payment in self.payments]
+        return net_payment_lines(tendered, self.change_amount)
 
+    def stock_lines(self) -> list[tuple[int, int]]:
+        return [(line["product_id"], line["quantity"]) for line in self.items]
+
+
+def check_order_owner(payload: OrderCreate, current_user: User) -> None:
     if payload.user_id is not None and payload.user_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="user_id does not match token")
 
-    subtotal = Decimal("0")
-    tax_total = Decimal("0")
-    order_items: list[OrderItem] = []
 
+def price_order(payload: OrderCreate, products: dict[int, Product]) -> PricedOrder:
+    """Price ``payload`` against already-resolved ``products``."""
+
+    if not payload.items:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Order requires at least one item")
+
+    lines = []
     for item in payload.items:
-        product = db.get(Product, item.product_id)
-        if not product or not product.is_active:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Product {item.product_id} not available")
-
-        unit_price = Decimal(product.unit_price)
-        quantity = item.quantity
-        line_subtotal = unit_price * quantity
-        tax_rate = Decimal(product.tax_rate) / Decimal("100")
-        line_tax = quantize(line_subtotal * tax_rate)
-
-        subtotal += line_subtotal
-        tax_total += line_tax
-
-        order_items.append(
-            OrderItem(
-                product_id=product.id,
-                quantity=quantity,
-                unit_price=quantize(unit_price),
-                line_total=quantize(line_subtotal + line_tax),
+        product = products[item.product_id]
+        lines.append(
+            pricing.PriceLine(
+                item.product_id,
+                item.quantity,
+                pricing.to_minor(product.unit_price),
+                pricing.rate_to_basis_points(product.tax_rate),
             )
         )
+    basket = pricing.price_basket(lines)
+    order_items = [
+        {
+            "product_id": line.product_id,
+            "quantity": line.quantity,
+            "unit_price": pricing.from_minor(line.unit_price),
+            "line_total": pricing.from_minor(line.total),
+        }
+        for line in basket.lines
+    ]
 
-    subtotal = quantize(subtotal)
-    tax_total = quantize(tax_total)
-    total = quantize(subtotal + tax_total)
-
-    payment_models = payload.payments or []
-    payments: list[Payment] = []
-    paid_amount = Decimal("0")
-
-    if not payment_models:
-        payments.append(Payment(method=PaymentMethod.CASH, amount=total))
-        paid_amount = total
+    payments: list[dict[str, Any]] = []
+    if not payload.payments:
+        payments.append({"method": PaymentMethod.CASH, "amount": basket.total, "transaction_id": None})
     else:
-        for payment in payment_models:
-            amount = quantize(Decimal(payment.amount))
-            if amount <= Decimal("0"):
+        for payment in payload.payments:
+            amount = pricing.to_minor(payment.amount)
+            if amount <= 0:
                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Payment amount must be positive")
-            payments.append(
-                Payment(method=payment.method, amount=amount, transaction_id=payment.transaction_id)
-            )
-            paid_amount += amount
+            payments.append({"method": payment.method, "amount": amount, "transaction_id": payment.transaction_id})
+    paid_amount, change_amount = pricing.settle(basket.total, (payment["amount"] for payment in payments))
+    for payment in payments:
+        payment["amount"] = pricing.from_minor(payment["amount"])
+
+    return PricedOrder(
+        subtotal=pricing.from_minor(basket.subtotal),
+        tax_total=pricing.from_minor(basket.tax_total),
+        total=pricing.from_minor(basket.total),
+        paid_amount=pricing.from_minor(paid_amount),
+        change_amount=pricing.from_minor(change_amount),
+        status=OrderStatus.PAID if paid_amount >= basket.total else OrderStatus.DRAFT,
+        items=order_items,
+        payments=payments,
+    )
 
-    paid_amount = quantize(paid_amount)
-    change_amount = quantize(paid_amount - total) if paid_amount >= total else quantize(Decimal("0"))
-    status_value = OrderStatus.PAID if paid_amount >= total else OrderStatus.DRAFT
 
+def place_order(
+    db: Session,
+    payload: OrderCreate,
+    current_user: User,
+    claim: IdempotencyKey | None = None,
+    order_no: str | None = None,
+) -> Order:
+    """Price, persist and commit one order together with its rollup increments.
+
+    ``claim`` is an idempotency key row already flushed in this transaction;
+    it is pointed at the new order before the commit. Callers that write
+    before this point pass an ``order_no`` reserved ahead of their first write.
+    """
+
+    if not payload.items:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Order requires at least one item")
+    check_order_owner(payload, current_user)
+
+    products = resolve_products(db, [item.product_id for item in payload.items])
+    priced = price_order(payload, products)
+    if order_no is None:
+        order_no = next_order_number(db)
+
+    # Decrement before inserting items: their foreign key checks then find the rows already locked.
+    demand = stock_demand(priced.stock_lines(), products)
+    if not reserve_stock(db, demand):
+        db.rollback()
+        raise insufficient_stock_error(short_products(db, demand) or demand)
+
+    created_at = datetime.now(timezone.utc).replace(microsecond=0)
     order = Order(
-        order_no=generate_order_no(),
+        order_no=order_no,
         user_id=current_user.id,
-        subtotal=subtotal,
-        tax_total=tax_total,
-        total=total,
-        paid_amount=paid_amount,
-        change_amount=change_amount,
-        status=status_value,
         memo=payload.memo,
-        items=order_items,
-        payments=payments,
+        created_at=created_at,
+        items=[OrderItem(**line) for line in priced.items],
+        payments=[Payment(**payment) for payment in priced.payments],
+        **priced.order_values(),
     )
 
     db.add(order)
+    db.flush()
+    if claim is not None:
+        claim.order_id = order.id
+    # Touch the shared aggregate rows last so their locks are held only until commit.
+    record_order_buckets(db, created_at, priced.product_lines(), priced.payment_lines())
+    record_order_sale(db, created_at, priced.total, priced.paid_amount)
     db.commit()
     db.refresh(order)
 
     return order
+
+
+def _store_priced_orders(
+    db: Session,
+    user_id: int,
+    entries: Sequence[tuple[int, OrderCreate, PricedOrder]],
+    order_nos: Sequence[str],
+) -> list[OrderBatchItemResult]:
+    """Insert one chunk of priced orders with a handful of multi-row statements and commit it."""
+
+    created_at = datetime.now(timezone.utc).replace(microsecond=0)
+    db.execute(
+        insert(Order),
+        [
+            {"order_no": order_no, "user_id": user_id, "memo": payload.memo, "created_at": created_at,
+             **priced.order_values()}
+            for order_no, (_, payload, priced) in zip(order_nos, entries)
+        ],
+    )
+    order_ids = dict(db.execute(select(Order.order_no, Order.id).where(Order.order_no.in_(order_nos))).all())
+    db.execute(
+        insert(OrderItem),
+        [
+            {"order_id": order_ids[order_no], **line}
+            for order_no, (_, _, priced) in zip(order_nos, entries)
+            for line in priced.items
+        ],
+    )
+    db.execute(
+        insert(Payment),
+        [
+            {"order_id": order_ids[order_no], **payment}
+            for order_no, (_, _, priced) in zip(order_nos, entries)
+            for payment in priced.payments
+        ],
+    )
+    record_orders_buckets(db, [(created_at, priced.product_lines(), priced.payment_lines()) for _, _, priced in entries])
+    record_order_sales(db, [(created_at, priced.total, priced.paid_amount) for _, _, priced in entries])
+    db.commit()
+
+    return [
+        OrderBatchItemResult(
+            index=index, status="created", order_id=order_ids[order_no], order_no=order_no, total=priced.total
+        )
+        for order_no, (index, _, priced) in zip(order_nos, entries)
+    ]
+
+
+@router.post("/batch", response_model=OrderBatchResult, summary="Create many orders")
+def create_orders_batch(
+    payload: OrderBatchCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> OrderBatchResult:
+    """Store queued sales in chunked transactions, reporting a status per submitted order.
+
+    Invalid orders are rejected individually; a chunk that fails to commit is
+    reported as ``failed`` and can be resubmitted as a whole.
+    """
+
+    products = load_available_products(db, (item.product_id for order in payload.orders for item in order.items))
+    # Stock is allocated in submission order against the snapshot just read.
+    remaining = {product.id: product.stock for product in products.values() if product.stock is not None}
+    results: list[OrderBatchItemResult] = []
+    priced_orders: list[tuple[int, OrderCreate, PricedOrder]] = []
+    demands: list[Counter[int]] = []
+    for index, order in enumerate(payload.orders):
+        try:
+            check_order_owner(order, current_user)
+            missing = {item.product_id for item in order.items} - products.keys()
+            if missing:
+                raise unavailable_products_error(missing)
+            priced = price_order(order, products)
+            demand = stock_demand(priced.stock_lines(), products)
+            short = [product_id for product_id, quantity in demand.items() if remaining[product_id] < quantity]
+            if short:
+                raise insufficient_stock_error(short)
+        except HTTPException as exc:
+            results.append(OrderBatchItemResult(index=index, status="rejected", error=str(exc.detail)))
+            continue
+        for product_id, quantity in demand.items():
+            remaining[product_id] -= quantity
+        priced_orders.append((index, order, priced))
+        demands.append(demand)
+
+    for start in range(0, len(priced_orders), BATCH_CHUNK_SIZE):
+        chunk = priced_orders[start : start + BATCH_CHUNK_SIZE]
+        chunk_demand = sum(demands[start : start + BATCH_CHUNK_SIZE], Counter())
+        try:
+            order_nos = next_order_numbers(db, len(chunk))
+            # One decrement per product for the whole chunk, in id order like single orders.
+            if reserve_stock(db, chunk_demand):
+                results.extend(_store_priced_orders(db, current_user.id, chunk, order_nos))
+                continue
+            error = "Stock changed while storing, retry"
+        except SQLAlchemyError:
+            error = "Could not store order, retry"
+        db.rollback()
+        results.extend(OrderBatchItemResult(index=index, status="failed", error=error) for index, _, _ in chunk)
+
+    results.sort(key=lambda result: result.index)
+    return OrderBatchResult(
+        created=sum(result.status == "created" for result in results),
+        rejected=sum(result.status == "rejected" for result in results),
+        failed=sum(result.status == "failed" for result in results),
+        results=results,
+    )
+
+
+def _order_response(body: bytes, replayed: bool) -> Response:
+    return Response(
+        content=body,
+        status_code=status.HTTP_201_CREATED,
+        media_type="application/json",
+        headers={IDEMPOTENT_REPLAY_HEADER: "true"} if replayed else None,
+    )
+
+
+def _serialize_order(order: Order) -> bytes:
+    return OrderRead.model_validate(order).model_dump_json().encode("utf-8")
+
+
+def _check_same_request(stored_hash: str, digest: str) -> None:
+    if stored_hash != digest:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="Idempotency-Key was already used for a different request",
+        )
+
+
+def place_idempotent_order(db: Session, payload: OrderCreate, current_user: User, key: str) -> Response:
+    """Create the order once per ``(user, key)``; repeats get the original response back."""
+
+    if not key or len(key) > idempotency.MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Idempotency-Key must be 1-{idempotency.MAX_KEY_LENGTH} characters",
+        )
+    digest = idempotency.request_hash(payload)
+    cache_key = (current_user.id, key)
+    cached = idempotency.response_cache.get(cache_key)
+    if cached is not None:
+        _check_same_request(cached[0], digest)
+        return _order_response(cached[1], replayed=True)
+
+    existing = idempotency.find_key(db, current_user.id, key)
+    if existing is None:
+        # Reserve the number first: a block refill must not wait behind this transaction's writes.
+        order_no = next_order_number(db)
+        claim = idempotency.claim_key(db, current_user.id, key, digest)
+        if claim is not None:
+            body = _serialize_order(place_order(db, payload, current_user, claim=claim, order_no=order_no))
+            idempotency.response_cache.set(cache_key, (digest, body))
+            return _order_response(body, replayed=False)
+        # A concurrent request with the same key committed first.
+        existing = idempotency.find_key(db, current_user.id, key)
+
+    _check_same_request(existing.request_hash, digest)
+    if existing.order_id is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Request with this Idempotency-Key in progress")
+    order = db.execute(
+        select(Order)
+        .options(selectinload(Order.items), selectinload(Order.payments))
+        .where(Order.id == existing.order_id)
+    ).scalar_one()
+    body = _serialize_order(order)
+    idempotency.response_cache.set(cache_key, (digest, body))
+    return _order_response(body, replayed=True)
+
+
+def create_order(
+    payload: OrderCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    idempotency_key: str | None = Header(default=None, alias=IDEMPOTENCY_KEY_HEADER),
+) -> OrderRead:
+    if idempotency_key is not None:
+        return place_idempotent_order(db, payload, current_user, idempotency_key)
+    return place_order(db, payload, current_user)
+
+
+async def create_order_async(
+    payload: OrderCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+    idempotency_key: str | None = Header(default=None, alias=IDEMPOTENCY_KEY_HEADER),
+) -> OrderRead:
+    if idempotency_key is not None:
+        return await db.run_sync(lambda session: place_idempotent_order(session, payload, current_user, idempotency_key))
+    # Serialise inside the greenlet so relationship loads never run on the event loop.
+    return await db.run_sync(lambda session: OrderRead.model_validate(place_order(session, payload, current_user)))
+
+
+router.post(
+    "/",
+    response_model=OrderRead,
+    status_code=status.HTTP_201_CREATED,
+    summary="Create order",
+    responses={
+        status.HTTP_409_CONFLICT: {"description": "Insufficient stock, or Idempotency-Key still being processed"},
+        status.HTTP_422_UNPROCESSABLE_CONTENT: {"description": "Idempotency-Key reused with a different body"},
+    },
+)(create_order_async if get_settings().database_async else create_order)
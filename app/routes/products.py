@@ -1,21 +1,136 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+import tempfile
+from dataclasses import asdict
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.config import get_settings
 from app.deps.auth import get_current_user
-from app.db import get_db
+from app.db import get_async_read_db, get_db, get_read_db
 from app.models.product import Product
+from app.models.product_name_gram import ProductNameGram
 from app.models.user import User
 from app.schemas.base import model_dump
-from app.schemas.product import ProductCreate, ProductRead, ProductUpdate
+from app.schemas.product import ProductCreate, ProductImportReport, ProductRead, ProductStock, ProductUpdate
+from app.services.catalog import bump_catalog_version, catalog_cache, catalog_etag, etag_matches
+from app.services.catalog_import import ImportFormat, import_products, iter_records
+from app.services.product_search import index_product_names, search_product_ids, sku_cache
+from app.utils import fastjson
+from app.utils.fields import FIELDS_DESCRIPTION, parse_fields
 
 router = APIRouter(prefix="/products", tags=["products"])
 
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+# Uploads larger than this are spooled to a temporary file instead of memory.
+IMPORT_SPOOL_BYTES = 1024 * 1024
 
-@router.get("/", response_model=list[ProductRead], summary="List active products")
-def list_products(db: Session = Depends(get_db)) -> list[ProductRead]:
-    products = db.execute(select(Product).where(Product.is_active.is_(True)).order_by(Product.id)).scalars().all()
-    return products
+product_list_adapter = TypeAdapter(list[ProductRead])
+
+
+# Columns in ProductRead field order, so projected rows serialise to the same document.
+PRODUCT_READ_FIELDS = tuple(ProductRead.model_fields)
+PRODUCT_READ_COLUMNS = tuple(getattr(Product, name) for name in PRODUCT_READ_FIELDS)
+
+
+def _active_products_body(db: Session, fields: tuple[str, ...] | None = None) -> bytes:
+    active = Product.is_active.is_(True)
+    if fields is not None or get_settings().fast_json:
+        # Sparse fieldsets are always projected: only the requested columns are read.
+        names = fields or PRODUCT_READ_FIELDS
+        columns = PRODUCT_READ_COLUMNS if fields is None else tuple(getattr(Product, name) for name in names)
+        rows = db.execute(select(*columns).where(active).order_by(Product.id)).all()
+        return fastjson.dumps([dict(zip(names, row)) for row in rows])
+    products = db.execute(select(Product).where(active).order_by(Product.id)).scalars().all()
+    return product_list_adapter.dump_json(product_list_adapter.validate_python(products, from_attributes=True))
+
+
+def _catalog_headers(
+    version: int, fields: tuple[str, ...] | None, if_none_match: str | None
+) -> tuple[dict[str, str], bool]:
+    etag = catalog_etag(version, fields)
+    return {"ETag": etag, "Cache-Control": "no-cache"}, etag_matches(if_none_match, etag)
+
+
+def list_products(
+    fields: str | None = Query(default=None, description=FIELDS_DESCRIPTION),
+    db: Session = Depends(get_read_db),
+    if_none_match: str | None = Header(default=None),
+) -> Response:
+    selected = parse_fields(fields, PRODUCT_READ_FIELDS)
+    version = catalog_cache.current_version(db)
+    headers, not_modified = _catalog_headers(version, selected, if_none_match)
+    if not_modified:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    body = catalog_cache.body(version, lambda: _active_products_body(db, selected), selected)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def list_products_async(
+    fields: str | None = Query(default=None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_read_db),
+    if_none_match: str | None = Header(default=None),
+) -> Response:
+    selected = parse_fields(fields, PRODUCT_READ_FIELDS)
+    version = await db.run_sync(catalog_cache.current_version)
+    headers, not_modified = _catalog_headers(version, selected, if_none_match)
+    if not_modified:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    body = catalog_cache.cached_body(version, selected)
+    if body is None:
+        body = await db.run_sync(_active_products_body, selected)
+        catalog_cache.store_body(version, body, selected)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+router.get(
+    "/",
+    response_model=list[ProductRead],
+    summary="List active products",
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "Catalog unchanged since the given ETag"}},
+)(list_products_async if get_settings().database_async else list_products)
+
+
+@router.get(
+    "/by-sku/{sku}",
+    response_model=ProductRead,
+    summary="Look up an active product by SKU",
+    responses={status.HTTP_404_NOT_FOUND: {"description": "No active product with this SKU"}},
+)
+def get_product_by_sku(sku: str, db: Session = Depends(get_read_db)) -> Response:
+    """Barcode scans: one unique-index probe per SKU and catalog version, then served from memory."""
+
+    key = (catalog_cache.current_version(db), sku)
+    body = sku_cache.get(key)
+    if body is None:
+        row = db.execute(
+            select(*PRODUCT_READ_COLUMNS).where(Product.sku == sku, Product.is_active.is_(True))
+        ).first()
+        body = fastjson.dumps(dict(zip(PRODUCT_READ_FIELDS, row))) if row is not None else b""
+        sku_cache.set(key, body)
+    if not body:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/search", response_model=list[ProductRead], summary="Search active products by SKU or name")
+def search_products(
+    q: str = Query(..., min_length=1, max_length=255, description="SKU prefix or part of the product name"),
+    limit: int = Query(default=DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+    db: Session = Depends(get_read_db),
+) -> Response:
+    """SKU prefix matches first, then name matches; width, case and kana type are ignored."""
+
+    ids = search_product_ids(db, q, limit)
+    rows = db.execute(select(*PRODUCT_READ_COLUMNS).where(Product.id.in_(ids))).all() if ids else []
+    by_id = {row.id: dict(zip(PRODUCT_READ_FIELDS, row)) for row in rows}
+    return Response(content=fastjson.dumps([by_id[product_id] for product_id in ids]), media_type="application/json")
 
 
 @router.post(
@@ -38,11 +153,35 @@ def create_product(
     data = model_dump(payload)
     product = Product(**data)
     db.add(product)
+    db.flush()
+    index_product_names(db, [(product.id, product.name)])
+    bump_catalog_version(db)
     db.commit()
+    catalog_cache.invalidate()
     db.refresh(product)
     return product
 
 
+@router.post("/import", response_model=ProductImportReport, summary="Bulk import products from CSV or NDJSON")
+async def import_product_file(
+    request: Request,
+    file_format: ImportFormat = Query(default="csv", alias="format"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> dict:
+    _ = current_user  # ensure dependency is used
+
+    # The user lookup may have checked out a connection; hand it back while a slow upload arrives.
+    await run_in_threadpool(db.close)
+    with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_BYTES) as upload:
+        async for chunk in request.stream():
+            upload.write(chunk)
+        upload.seek(0)
+        report = await run_in_threadpool(import_products, db, iter_records(upload, file_format))
+    catalog_cache.invalidate()
+    return asdict(report)
+
+
 @router.put("/{product_id}", response_model=ProductRead, summary="Update product")
 def update_product(
     product_id: int,
@@ -57,16 +196,37 @@ def update_product(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
 
     update_data = model_dump(payload)
+    renamed = update_data.get("name") not in (None, product.name)
     for field, value in update_data.items():
         if value is not None:
             setattr(product, field, value)
 
     db.add(product)
+    if renamed:
+        index_product_names(db, [(product.id, product.name)])
+    bump_catalog_version(db)
     db.commit()
+    catalog_cache.invalidate()
     db.refresh(product)
     return product
 
 
+@router.get("/{product_id}/stock", response_model=ProductStock, summary="Get product stock")
+def get_product_stock(
+    product_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> ProductStock:
+    """Read stock straight from the row; the cached catalog list deliberately leaves it out."""
+
+    _ = current_user
+
+    product = db.get(Product, product_id)
+    if not product:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+    return ProductStock(product_id=product.id, stock=product.stock)
+
+
 @router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Delete product")
 def delete_product(
     product_id: int,
@@ -79,6 +239,9 @@ def delete_product(
     if not product:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
 
+    db.execute(delete(ProductNameGram).where(ProductNameGram.product_id == product.id))
     db.delete(product)
+    bump_catalog_version(db)
     db.commit()
+    catalog_cache.invalidate()
     return None
@@ -1,26 +1,73 @@
+from datetime import datetime
 from decimal import Decimal
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db import get_db
-from app.models import Order, Payment, Product
-from app.schemas.report import ReportSummary
+from app.config import get_settings
+from app.db import get_async_read_db, get_read_db
+from app.models import DailySalesRollup, Product, SalesDimension
+from app.schemas.report import ReportSummary, SalesGranularity, SalesReport, SalesReportBucket
+from app.services.rollups import business_zone, query_sales_buckets
 
 router = APIRouter(prefix="/reports", tags=["reports"])
 
 
-@router.get("/", response_model=ReportSummary, summary="Get summary report")
-def get_summary_report(db: Session = Depends(get_db)) -> ReportSummary:
-    total_products = db.scalar(select(func.count(Product.id))) or 0
-    total_orders = db.scalar(select(func.count(Order.id))) or 0
-    total_revenue = db.scalar(select(func.coalesce(func.sum(Order.total), 0))) or Decimal("0")
-    total_payments = db.scalar(select(func.coalesce(func.sum(Payment.amount), 0))) or Decimal("0")
+def _summary_report(db: Session) -> ReportSummary:
+    total_products, total_orders, total_revenue, total_payments = db.execute(
+        select(
+            select(func.count(Product.id)).scalar_subquery(),
+            func.coalesce(func.sum(DailySalesRollup.order_count), 0),
+            func.coalesce(func.sum(DailySalesRollup.revenue_total), 0),
+            func.coalesce(func.sum(DailySalesRollup.payment_total), 0),
+        )
+    ).one()
 
     return ReportSummary(
-        total_products=total_products,
-        total_orders=total_orders,
-        total_revenue=Decimal(total_revenue),
-        total_payments=Decimal(total_payments),
+        total_products=total_products or 0,
+        total_orders=total_orders or 0,
+        total_revenue=Decimal(total_revenue or 0),
+        total_payments=Decimal(total_payments or 0),
+    )
+
+
+def get_summary_report(db: Session = Depends(get_read_db)) -> ReportSummary:
+    return _summary_report(db)
+
+
+async def get_summary_report_async(db: AsyncSession = Depends(get_async_read_db)) -> ReportSummary:
+    return await db.run_sync(_summary_report)
+
+
+router.get("/", response_model=ReportSummary, summary="Get summary report")(
+    get_summary_report_async if get_settings().database_async else get_summary_report
+)
+
+
+@router.get("/sales", response_model=SalesReport, summary="Get time-bucketed sales report")
+def get_sales_report(
+    start: datetime = Query(alias="from", description="Inclusive start; naive values use the business timezone"),
+    end: datetime = Query(alias="to", description="Exclusive end; naive values use the business timezone"),
+    granularity: SalesGranularity = Query(default=SalesGranularity.DAY),
+    group_by: SalesDimension = Query(default=SalesDimension.PRODUCT),
+    db: Session = Depends(get_read_db),
+) -> SalesReport:
+    zone = business_zone()
+    start = start if start.tzinfo else start.replace(tzinfo=zone)
+    end = end if end.tzinfo else end.replace(tzinfo=zone)
+    if start >= end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'from' must be before 'to'")
+
+    rows = query_sales_buckets(db, start, end, granularity, group_by)
+    return SalesReport(
+        granularity=granularity,
+        group_by=group_by,
+        start=start,
+        end=end,
+        buckets=[
+            SalesReportBucket(bucket_start=bucket_start, key=key, order_count=order_count, quantity=quantity, amount=amount)
+            for bucket_start, key, order_count, quantity, amount in rows
+        ],
     )
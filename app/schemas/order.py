@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 from decimal import Decimal
+from typing import Literal
 
 from pydantic import BaseModel, Field
 
@@ -28,6 +29,13 @@ class OrderCreate(BaseModel):
     memo: str | None = None
 
 
+MAX_BATCH_ORDERS = 500
+
+
+class OrderBatchCreate(BaseModel):
+    orders: list[OrderCreate] = Field(..., min_length=1, max_length=MAX_BATCH_ORDERS)
+
+
 class OrderItemRead(ORMModel):
     id: int
     product_id: int
@@ -59,3 +67,19 @@ class OrderRead(ORMModel):
     updated_at: datetime
     items: list[OrderItemRead]
     payments: list[PaymentRead]
+
+
+class OrderBatchItemResult(BaseModel):
+    index: int
+    status: Literal["created", "rejected", "failed"]
+    order_id: int | None = None
+    order_no: str | None = None
+    total: Decimal | None = None
+    error: str | None = None
+
+
+class OrderBatchResult(BaseModel):
+    created: int
+    rejected: int
+    failed: int
+    results: list[OrderBatchItemResult]
@@ -14,6 +14,7 @@ class ProductBase(BaseModel):
     unit_price: Decimal = Field(..., gt=Decimal("0"))
     tax_rate: Decimal = Field(default=Decimal("10"), ge=Decimal("0"), le=Decimal("100"))
     is_active: bool = True
+    stock: int | None = Field(default=None, ge=0)
 
 
 class ProductCreate(ProductBase):
@@ -26,6 +27,7 @@ class ProductUpdate(BaseModel):
     unit_price: Decimal | None = Field(default=None, gt=Decimal("0"))
     tax_rate: Decimal | None = Field(default=None, ge=Decimal("0"), le=Decimal("100"))
     is_active: bool | None = None
+    stock: int | None = Field(default=None, ge=0)
 
 
 class ProductRead(ORMModel):
@@ -36,3 +38,23 @@ class ProductRead(ORMModel):
     unit_price: Decimal
     tax_rate: Decimal
     is_active: bool
+
+
+class ProductStock(BaseModel):
+    product_id: int
+    stock: int | None
+
+
+class ProductImportError(BaseModel):
+    row: int
+    sku: str | None
+    errors: list[str]
+
+
+class ProductImportReport(BaseModel):
+    rows: int
+    created: int
+    updated: int
+    failed: int
+    errors: list[ProductImportError]
+    errors_truncated: bool
@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+from datetime import datetime
 from decimal import Decimal
 
+from pydantic import Field
+
+from app.models.report import SalesDimension, SalesGranularity
 from app.schemas.base import ORMModel
 
 
@@ -10,3 +14,19 @@ class ReportSummary(ORMModel):
     total_orders: int
     total_revenue: Decimal
     total_payments: Decimal
+
+
+class SalesReportBucket(ORMModel):
+    bucket_start: datetime
+    key: str
+    order_count: int
+    quantity: int
+    amount: Decimal
+
+
+class SalesReport(ORMModel):
+    granularity: SalesGranularity
+    group_by: SalesDimension
+    start: datetime = Field(serialization_alias="from")
+    end: datetime = Field(serialization_alias="to")
+    buckets: list[SalesReportBucket]
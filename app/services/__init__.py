@@ -0,0 +1 @@
+"""Service modules shared by the POS API routes."""
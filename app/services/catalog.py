@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable, Hashable, Sequence
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.catalog import CatalogState
+
+CATALOG_STATE_ID = 1
+
+
+def read_catalog_version(db: Session) -> int:
+    """Return the persisted catalog version (0 when no product was ever written)."""
+
+    return db.scalar(select(CatalogState.version).where(CatalogState.id == CATALOG_STATE_ID)) or 0
+
+
+def bump_catalog_version(db: Session) -> None:
+    """Increment the catalog version inside the caller's transaction."""
+
+    result = db.execute(
+        update(CatalogState)
+        .where(CatalogState.id == CATALOG_STATE_ID)
+        .values(version=CatalogState.version + 1)
+    )
+    if result.rowcount == 0:
+        db.add(CatalogState(id=CATALOG_STATE_ID, version=1))
+
+
+def catalog_etag(version: int, fields: Sequence[str] | None = None) -> str:
+    """Strong ETag of one catalog representation: the version plus the normalised field selection."""
+
+    # Fields are joined with "." because If-None-Match lists are split on commas.
+    return f'"catalog-v{version}"' if fields is None else f'"catalog-v{version}-{".".join(fields)}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return any(candidate == "*" or candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+class CatalogCache:
+    """Per-process cache of the catalog version and its serialised bodies.
+
+    The version is re-read from the database at most once per TTL, so all
+    workers converge on a product write within that window. Only bodies for
+    the newest version are retained, one per field selection (``None`` is the
+    full document).
+    """
+
+    def __init__(self, version_ttl: float) -> None:
+        self.version_ttl = version_ttl
+        self._lock = threading.Lock()
+        self._version: int | None = None
+        self._checked_at = 0.0
+        self._body_version: int | None = None
+        self._bodies: dict[Hashable, bytes] = {}
+
+    def current_version(self, db: Session) -> int:
+        now = time.monotonic()
+        with self._lock:
+            if self._version is not None and now - self._checked_at < self.version_ttl:
+                return self._version
+        version = read_catalog_version(db)
+        with self._lock:
+            self._version = version
+            self._checked_at = now
+        return version
+
+    def cached_body(self, version: int, key: Hashable = None) -> bytes | None:
+        with self._lock:
+            if self._body_version == version:
+                return self._bodies.get(key)
+        return None
+
+    def store_body(self, version: int, body: bytes, key: Hashable = None) -> None:
+        with self._lock:
+            if self._body_version is None or version > self._body_version:
+                self._body_version = version
+                self._bodies = {}
+            if version == self._body_version:
+                self._bodies[key] = body
+
+    def body(self, version: int, render: Callable[[], bytes], key: Hashable = None) -> bytes:
+        body = self.cached_body(version, key)
+        if body is None:
+            body = render()
+            self.store_body(version, body, key)
+        return body
+
+    def invalidate(self) -> None:
+        """Force the next request in this process to re-read the version."""
+
+        with self._lock:
+            self._version = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._version = None
+            self._checked_at = 0.0
+            self._body_version = None
+            self._bodies = {}
+
+
+catalog_cache = CatalogCache(version_ttl=get_settings().catalog_version_ttl_seconds)
+
+
+__all__ = [
+    "CatalogCache",
+    "bump_catalog_version",
+    "catalog_cache",
+    "catalog_etag",
+    "etag_matches",
+    "read_catalog_version",
+]
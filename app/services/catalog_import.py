@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import codecs
+import csv
+import json
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import IO, Any, Literal
+
+from pydantic import ValidationError
+from sqlalchemy import Executable, func, insert, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models import Product
+from app.schemas.base import model_dump
+from app.schemas.product import ProductCreate
+from app.services.catalog import bump_catalog_version
+from app.services.product_search import index_product_names
+
+ImportFormat = Literal["csv", "ndjson"]
+
+# The report lists at most this many failed rows; the failed count stays exact.
+MAX_REPORTED_ERRORS = 1000
+_UPSERT_DIALECTS = {"mysql": mysql.insert, "mariadb": mysql.insert, "sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+@dataclass
+class RowError:
+    row: int
+    sku: str | None
+    errors: list[str]
+
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: list[RowError] = field(default_factory=list)
+    errors_truncated: bool = False
+
+    def add_error(self, row: int, sku: str | None, errors: list[str]) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(RowError(row=row, sku=sku, errors=errors))
+        else:
+            self.errors_truncated = True
+
+
+def iter_records(stream: IO[bytes], file_format: ImportFormat) -> Iterator[tuple[int, dict[str, Any] | str]]:
+    """Yield ``(row_number, record)`` from a binary file, or ``(row_number, message)`` for unparsable rows.
+
+    Rows are numbered from 1, excluding a CSV header. Decoding is incremental,
+    so only the current line is held in memory.
+    """
+
+    text = codecs.getreader("utf-8-sig")(stream, errors="replace")
+    if file_format == "csv":
+        reader = csv.DictReader(text)
+        for number, record in enumerate(reader, 1):
+            if None in record:
+                yield number, "more fields than the header"
+                continue
+            # Empty cells mean "not given", so optional columns keep their defaults.
+            yield number, {key: value for key, value in record.items() if value not in ("", None)}
+        return
+
+    for number, line in enumerate(text, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield number, f"invalid JSON: {exc}"
+            continue
+        yield number, record if isinstance(record, dict) else "expected a JSON object"
+
+
+def _validation_messages(exc: ValidationError) -> list[str]:
+    return [f"{'.'.join(map(str, error['loc'])) or 'row'}: {error['msg']}" for error in exc.errors()]
+
+
+@lru_cache(maxsize=None)
+def _upsert_statement(dialect: str, assignments: tuple[str, ...]) -> Executable | None:
+    """Upsert on ``sku`` overwriting only ``assignments``; built once per shape so its compilation is cached."""
+
+    dialect_insert = _UPSERT_DIALECTS.get(dialect)
+    if dialect_insert is None:
+        return None
+    products = Product.__table__
+    stmt = dialect_insert(products)
+    if dialect_insert is mysql.insert:
+        return stmt.on_duplicate_key_update(updated_at=func.now(), **{name: stmt.inserted[name] for name in assignments})
+    changes = {name: stmt.excluded[name] for name in assignments}
+    return stmt.on_conflict_do_update(index_elements=[products.c.sku], set_={"updated_at": func.now(), **changes})
+
+
+def _upsert(db: Session, columns: frozenset[str], rows: list[dict[str, Any]]) -> None:
+    """Insert ``rows`` or, per conflicting SKU, overwrite only ``columns`` (those the file supplied)."""
+
+    assignments = tuple(sorted(columns - {"sku"}))
+    stmt = _upsert_statement(db.get_bind().dialect.name, assignments)
+    if stmt is not None:
+        # An executemany of one statement: the drivers send it as multi-row VALUES batches
+        # (insertmanyvalues on PostgreSQL, the PyMySQL/mysqlclient rewrite on MySQL).
+        db.execute(stmt, rows)
+        return
+    products = Product.__table__
+    existing = set(db.scalars(select(products.c.sku).where(products.c.sku.in_([row["sku"] for row in rows]))))
+    fresh = [row for row in rows if row["sku"] not in existing]
+    if fresh:
+        db.execute(insert(products), fresh)
+    for row in rows:
+        if row["sku"] in existing:
+            values = {name: row[name] for name in assignments}
+            db.execute(update(products).where(products.c.sku == row["sku"]).values(updated_at=func.now(), **values))
+
+
+def _write_chunk(db: Session, chunk: list[tuple[int, ProductCreate]], report: ImportReport) -> None:
+    # The last occurrence of a SKU in a chunk wins, as if the rows had been applied in order.
+    latest = {payload.sku: (number, payload) for number, payload in chunk}
+    skus = list(latest)
+    try:
+        existing = set(db.scalars(select(Product.sku).where(Product.sku.in_(skus))))
+        groups: dict[frozenset[str], list[dict[str, Any]]] = {}
+        for _, payload in latest.values():
+            # Multi-row statements need one column list; files normally supply the same columns on every row.
+            groups.setdefault(frozenset(payload.model_fields_set), []).append(model_dump(payload))
+        for columns, rows in groups.items():
+            _upsert(db, columns, rows)
+        index_product_names(db, db.execute(select(Product.id, Product.name).where(Product.sku.in_(skus))).tuples())
+        bump_catalog_version(db)
+        db.commit()
+    except SQLAlchemyError as exc:
+        db.rollback()
+        cause = getattr(exc, "orig", None) or exc
+        message = f"database error: {type(cause).__name__}: {cause}"
+        for number, payload in latest.values():
+            report.add_error(number, payload.sku, [message])
+        return
+    report.updated += len(existing)
+    report.created += len(skus) - len(existing)
+
+
+def import_products(
+    db: Session, records: Iterable[tuple[int, dict[str, Any] | str]], chunk_size: int | None = None
+) -> ImportReport:
+    """Validate records with ``ProductCreate`` and upsert them by SKU, one transaction per chunk.
+
+    Only one chunk of validated rows is held at a time. Rows that fail validation
+    are reported and skipped; a chunk the database rejects is rolled back and all
+    its rows are reported, while other chunks still apply.
+    """
+
+    chunk_size = chunk_size or get_settings().import_chunk_size
+    report = ImportReport()
+    chunk: list[tuple[int, ProductCreate]] = []
+    for number, record in records:
+        report.rows += 1
+        if isinstance(record, str):
+            report.add_error(number, None, [record])
+            continue
+        try:
+            chunk.append((number, ProductCreate.model_validate(record)))
+        except ValidationError as exc:
+            sku = record.get("sku")
+            report.add_error(number, sku if isinstance(sku, str) else None, _validation_messages(exc))
+            continue
+        if len(chunk) >= chunk_size:
+            _write_chunk(db, chunk, report)
+            chunk = []
+    if chunk:
+        _write_chunk(db, chunk, report)
+    return report
+
+
+__all__ = [
+    "ImportFormat",
+    "ImportReport",
+    "RowError",
+    "import_products",
+    "iter_records",
+]
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, timedelta, timezone
+
+from pydantic import BaseModel
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.idempotency import IdempotencyKey
+from app.utils.cache import TTLCache
+
+MAX_KEY_LENGTH = 128
+PURGE_BATCH_SIZE = 1000
+# Retries arrive within seconds of the original; keep their serialized responses briefly.
+RESPONSE_CACHE_TTL_SECONDS = 300.0
+
+response_cache: TTLCache[tuple[str, bytes]] = TTLCache(
+    get_settings().idempotency_cache_size, RESPONSE_CACHE_TTL_SECONDS
+)
+
+
+def request_hash(payload: BaseModel) -> str:
+    """Hash of the request body, used to reject a key reused for a different request."""
+
+    return hashlib.sha256(payload.model_dump_json().encode("utf-8")).hexdigest()
+
+
+def find_key(db: Session, user_id: int, key: str) -> IdempotencyKey | None:
+    return db.get(IdempotencyKey, (user_id, key))
+
+
+def claim_key(db: Session, user_id: int, key: str, digest: str) -> IdempotencyKey | None:
+    """Insert the key row in the caller's transaction, or return ``None`` if another request owns it.
+
+    The primary key is the only lock: a concurrent duplicate blocks on the
+    unique index until the owner commits (then fails here) or rolls back.
+    """
+
+    claim = IdempotencyKey(user_id=user_id, key=key, request_hash=digest, created_at=datetime.now(timezone.utc))
+    db.add(claim)
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        return None
+    return claim
+
+
+def purge_expired_keys(db: Session, now: datetime | None = None, batch_size: int = PURGE_BATCH_SIZE) -> int:
+    """Delete keys older than the retention window in short batches, committing after each."""
+
+    ttl = timedelta(hours=get_settings().idempotency_key_ttl_hours)
+    cutoff = (now or datetime.now(timezone.utc)) - ttl
+    purged = 0
+    while True:
+        batch = db.execute(
+            select(IdempotencyKey.user_id, IdempotencyKey.key)
+            .where(IdempotencyKey.created_at < cutoff)
+            .order_by(IdempotencyKey.created_at)
+            .limit(batch_size)
+        ).all()
+        if not batch:
+            return purged
+        db.execute(delete(IdempotencyKey).where(tuple_(IdempotencyKey.user_id, IdempotencyKey.key).in_(batch)))
+        db.commit()
+        purged += len(batch)
+
+
+__all__ = [
+    "MAX_KEY_LENGTH",
+    "PURGE_BATCH_SIZE",
+    "claim_key",
+    "find_key",
+    "purge_expired_keys",
+    "request_hash",
+    "response_cache",
+]
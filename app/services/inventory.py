@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Iterable, Mapping
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+
+from app.models import Product
+
+_products = Product.__table__
+# One conditional decrement per product; rows without enough stock are left untouched.
+_DECREMENT_STOCK = (
+    update(_products)
+    .where(_products.c.id == bindparam("product_id"), _products.c.stock >= bindparam("quantity"))
+    # A sale is not a catalog edit: keep updated_at as it was.
+    .values(stock=_products.c.stock - bindparam("quantity"), updated_at=_products.c.updated_at)
+)
+
+
+def stock_demand(lines: Iterable[tuple[int, int]], products: Mapping[int, Product]) -> Counter[int]:
+    """Sum ``(product_id, quantity)`` lines for the products whose stock is tracked."""
+
+    demand: Counter[int] = Counter()
+    for product_id, quantity in lines:
+        if products[product_id].stock is not None:
+            demand[product_id] += quantity
+    return demand
+
+
+def reserve_stock(db: Session, demand: Mapping[int, int]) -> bool:
+    """Decrement stock for ``demand`` in the caller's transaction; ``False`` if any row lacked stock.
+
+    Rows are updated in product id order so concurrent orders lock them in
+    the same sequence and cannot deadlock. On ``False`` the caller must roll
+    back, since the decrements that did succeed are still pending.
+    """
+
+    if not demand:
+        return True
+    params = [{"product_id": product_id, "quantity": demand[product_id]} for product_id in sorted(demand)]
+    return db.execute(_DECREMENT_STOCK, params).rowcount == len(params)
+
+
+def short_products(db: Session, demand: Mapping[int, int]) -> list[int]:
+    """Ids in ``demand`` whose committed stock cannot cover it; read after the rollback."""
+
+    rows = db.execute(select(Product.id, Product.stock).where(Product.id.in_(demand)))
+    return sorted(product_id for product_id, stock in rows if stock is not None and stock < demand[product_id])
+
+
+__all__ = ["reserve_stock", "short_products", "stock_demand"]
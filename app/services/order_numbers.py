@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import os
+import threading
+import uuid
+import weakref
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Protocol
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.order_sequence import OrderSequence
+
+ORDER_NO_SEQUENCE = "order_no"
+
+
+def _timestamp() -> str:
+    return datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+
+
+class OrderNumberGenerator(Protocol):
+    def take(self, db: Session, count: int) -> list[str]:
+        """Return ``count`` distinct order numbers; call before the order's first write."""
+
+
+class RandomSuffixOrderNumbers:
+    """Legacy ``YYYYmmddHHMMSS-XXXX`` numbers: 65,536 values per second, collisions possible."""
+
+    def take(self, db: Session, count: int) -> list[str]:
+        _ = db
+        numbers: list[str] = []
+        while len(numbers) < count:
+            number = f"{_timestamp()}-{uuid.uuid4().hex[:4].upper()}"
+            if number not in numbers:
+                numbers.append(number)
+        return numbers
+
+
+class _Block:
+    __slots__ = ("next", "end", "pid")
+
+    def __init__(self, start: int, end: int) -> None:
+        self.next = start
+        self.end = end
+        self.pid = os.getpid()
+
+
+class BlockSequenceOrderNumbers:
+    """``YYYYmmddHHMMSS-<sequence>`` numbers drawn from ranges reserved in ``order_sequences``.
+
+    Each process reserves ``block_size`` values at a time with one short
+    UPDATE on its own connection, then hands them out from memory. Values are
+    unique across processes by construction; the timestamp prefix keeps them
+    roughly time-ordered. Numbers of a crashed process are skipped, never reused.
+    """
+
+    def __init__(self, block_size: int) -> None:
+        self.block_size = max(1, block_size)
+        self._lock = threading.Lock()
+        # One block per database, so tests and tools that swap engines never mix ranges.
+        self._blocks: weakref.WeakKeyDictionary[Engine, _Block] = weakref.WeakKeyDictionary()
+
+    def take(self, db: Session, count: int) -> list[str]:
+        engine = db.get_bind()
+        if not isinstance(engine, Engine):
+            engine = engine.engine
+        values: list[int] = []
+        with self._lock:
+            while len(values) < count:
+                block = self._blocks.get(engine)
+                if block is None or block.next > block.end or block.pid != os.getpid():
+                    block = self._blocks[engine] = self._reserve(engine, max(self.block_size, count - len(values)))
+                taken = min(count - len(values), block.end - block.next + 1)
+                values.extend(range(block.next, block.next + taken))
+                block.next += taken
+        prefix = _timestamp()
+        return [f"{prefix}-{value:09d}" for value in values]
+
+    @staticmethod
+    def _reserve(engine: Engine, size: int) -> _Block:
+        # Own short transactions: the row lock is released at once, and a rolled back
+        # order cannot hand its range to another process.
+        table = OrderSequence.__table__
+        row = table.c.name == ORDER_NO_SEQUENCE
+        for _ in range(2):
+            with engine.begin() as connection:
+                if connection.execute(update(table).where(row).values(next_value=table.c.next_value + size)).rowcount:
+                    end = connection.scalar(select(table.c.next_value).where(row)) - 1
+                    return _Block(end - size + 1, end)
+            try:  # only databases created without the migration lack the row
+                with engine.begin() as connection:
+                    connection.execute(insert(table).values(name=ORDER_NO_SEQUENCE, next_value=1))
+            except IntegrityError:
+                pass
+        raise RuntimeError("order number sequence row could not be created")
+
+
+@lru_cache()
+def get_order_number_generator() -> OrderNumberGenerator:
+    settings = get_settings()
+    if settings.order_number_strategy == "random":
+        return RandomSuffixOrderNumbers()
+    return BlockSequenceOrderNumbers(settings.order_number_block_size)
+
+
+def reset_order_number_generator() -> None:
+    get_order_number_generator.cache_clear()
+
+
+def next_order_numbers(db: Session, count: int) -> list[str]:
+    return get_order_number_generator().take(db, count)
+
+
+def next_order_number(db: Session) -> str:
+    return next_order_numbers(db, 1)[0]
+
+
+__all__ = [
+    "BlockSequenceOrderNumbers",
+    "OrderNumberGenerator",
+    "RandomSuffixOrderNumbers",
+    "get_order_number_generator",
+    "next_order_number",
+    "next_order_numbers",
+    "reset_order_number_generator",
+]
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from decimal import ROUND_HALF_UP, Decimal
+from functools import lru_cache
+
+# Prices are stored as Numeric(10, 2) and tax rates as Numeric(5, 2) percent, so
+# both are exact integers once scaled by 100: yen-sen (or cents) and basis points.
+MINOR_PER_UNIT = 100
+RATE_SCALE = 100 * 100  # basis points per 1 (100%)
+_MINOR_EXPONENT = -2
+# Catalog prices, tax rates and common totals repeat across baskets; converting a
+# Decimal costs several times more than a cache hit.
+CONVERSION_CACHE_SIZE = 8192
+
+
+@lru_cache(maxsize=CONVERSION_CACHE_SIZE)
+def to_minor(amount: Decimal | int | str) -> int:
+    """Convert a money amount to integer minor units, rounding half away from zero like ``quantize``."""
+
+    return int((Decimal(amount) * MINOR_PER_UNIT).to_integral_value(ROUND_HALF_UP))
+
+
+@lru_cache(maxsize=CONVERSION_CACHE_SIZE)
+def from_minor(minor: int) -> Decimal:
+    """Decimal with exactly two places, as the quantized values stored in the database."""
+
+    return Decimal(minor).scaleb(_MINOR_EXPONENT)
+
+
+@lru_cache(maxsize=CONVERSION_CACHE_SIZE)
+def rate_to_basis_points(rate_percent: Decimal | int | str) -> int:
+    """``Decimal("8.00")`` percent -> ``800``."""
+
+    return int((Decimal(rate_percent) * 100).to_integral_value(ROUND_HALF_UP))
+
+
+def _div_half_up(numerator: int, denominator: int) -> int:
+    if numerator >= 0:
+        return (numerator * 2 + denominator) // (denominator * 2)
+    return -((-numerator * 2 + denominator) // (denominator * 2))
+
+
+@dataclass(slots=True)
+class PriceLine:
+    """One basket line in minor units; ``unit_price`` includes tax when ``tax_inclusive``."""
+
+    product_id: int
+    quantity: int
+    unit_price: int
+    tax_rate: int
+    tax_inclusive: bool = False
+
+
+@dataclass(slots=True)
+class PricedLine:
+    product_id: int
+    quantity: int
+    unit_price: int
+    tax_rate: int
+    net: int
+    tax: int
+    total: int
+
+
+@dataclass(slots=True)
+class PricedBasket:
+    """Totals in minor units. Tax is rounded per line, as orders have always been priced."""
+
+    lines: list[PricedLine]
+    subtotal: int = 0
+    tax_total: int = 0
+    total: int = 0
+    tax_by_rate: dict[int, int] = field(default_factory=dict)
+
+
+def price_line(line: PriceLine) -> PricedLine:
+    amount = line.unit_price * line.quantity
+    rate = line.tax_rate
+    if line.tax_inclusive:
+        tax = _div_half_up(amount * rate, RATE_SCALE + rate)
+        return PricedLine(line.product_id, line.quantity, line.unit_price, rate, amount - tax, tax, amount)
+    tax = _div_half_up(amount * rate, RATE_SCALE)
+    return PricedLine(line.product_id, line.quantity, line.unit_price, rate, amount, tax, amount + tax)
+
+
+def price_basket(lines: Iterable[PriceLine]) -> PricedBasket:
+    # price_line inlined: this loop runs for every checkout line.
+    priced: list[PricedLine] = []
+    subtotal = tax_total = 0
+    tax_by_rate: dict[int, int] = {}
+    for line in lines:
+        amount = line.unit_price * line.quantity
+        rate = line.tax_rate
+        if line.tax_inclusive:
+            tax = _div_half_up(amount * rate, RATE_SCALE + rate)
+            net = amount - tax
+        else:
+            net = amount
+            tax = _div_half_up(amount * rate, RATE_SCALE)
+        priced.append(PricedLine(line.product_id, line.quantity, line.unit_price, rate, net, tax, net + tax))
+        subtotal += net
+        tax_total += tax
+        tax_by_rate[rate] = tax_by_rate.get(rate, 0) + tax
+    return PricedBasket(priced, subtotal, tax_total, subtotal + tax_total, tax_by_rate)
+
+
+def price_baskets(baskets: Iterable[Sequence[PriceLine]]) -> list[PricedBasket]:
+    """Price many baskets (batch uploads, imports, previews) in one call."""
+
+    return [price_basket(lines) for lines in baskets]
+
+
+def settle(total: int, tendered: Iterable[int]) -> tuple[int, int]:
+    """Return ``(paid, change)`` for payments against ``total``; change is never negative."""
+
+    paid = sum(tendered)
+    return paid, max(paid - total, 0)
+
+
+__all__ = [
+    "MINOR_PER_UNIT",
+    "PriceLine",
+    "PricedBasket",
+    "PricedLine",
+    "from_minor",
+    "price_basket",
+    "price_baskets",
+    "price_line",
+    "rate_to_basis_points",
+    "settle",
+    "to_minor",
+]
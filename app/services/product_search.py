@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import unicodedata
+from collections.abc import Iterable, Sequence
+from functools import lru_cache
+
+from sqlalchemy import Select, and_, bindparam, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models import Product, ProductNameGram
+from app.utils.cache import TTLCache
+
+GRAM_SIZE = 2
+# Appended to every indexed name so its last character also starts a bigram; a
+# one-character query is then a range scan over the grams beginning with it.
+NAME_END = " "
+_MAX_CHAR = "\U0010ffff"
+_HIRAGANA_TO_KATAKANA = {code: code + 0x60 for code in range(0x3041, 0x3097)}
+INDEX_CHUNK_SIZE = 1000
+# Long queries join only their rarest grams; the substring check filters the rest.
+MAX_JOINED_GRAMS = 6
+# Candidate rows are streamed in batches so a scan stops soon after ``limit`` matches.
+SCAN_BATCH_SIZE = 100
+# Posting-list sizes only steer which gram drives the join (never whether anything matches),
+# so they may be minutes stale.
+GRAM_COUNT_CACHE_SIZE = 8192
+GRAM_COUNT_TTL_SECONDS = 300.0
+
+_settings = get_settings()
+gram_counts: TTLCache[int] = TTLCache(maxsize=GRAM_COUNT_CACHE_SIZE, ttl=GRAM_COUNT_TTL_SECONDS)
+# Serialised ProductRead per (catalog version, sku); b"" records an unknown SKU.
+sku_cache: TTLCache[bytes] = TTLCache(
+    maxsize=_settings.product_lookup_cache_size, ttl=_settings.product_lookup_cache_ttl_seconds
+)
+
+
+def normalize(text: str) -> str:
+    """Fold width (NFKC), case and hiragana/katakana, and collapse whitespace, for matching."""
+
+    folded = unicodedata.normalize("NFKC", text).casefold().translate(_HIRAGANA_TO_KATAKANA)
+    return " ".join(folded.split())
+
+
+def name_grams(name: str) -> set[str]:
+    text = normalize(name) + NAME_END
+    return {text[index : index + GRAM_SIZE] for index in range(len(text) - 1)}
+
+
+def index_product_names(db: Session, products: Iterable[tuple[int, str]]) -> None:
+    """Replace the name grams of ``(product_id, name)`` pairs inside the caller's transaction."""
+
+    products = list(products)
+    for start in range(0, len(products), INDEX_CHUNK_SIZE):
+        chunk = products[start : start + INDEX_CHUNK_SIZE]
+        db.execute(delete(ProductNameGram).where(ProductNameGram.product_id.in_([product_id for product_id, _ in chunk])))
+        rows = [{"gram": gram, "product_id": product_id} for product_id, name in chunk for gram in name_grams(name)]
+        if rows:
+            # The Core table skips the ORM bulk-insert bookkeeping, which dominated large imports.
+            db.execute(insert(ProductNameGram.__table__), rows)
+
+
+def _gram_counts(db: Session, grams: Sequence[str]) -> dict[str, int]:
+    counts = {gram: gram_counts.get(gram) for gram in grams}
+    missing = [gram for gram, count in counts.items() if count is None]
+    if missing:
+        found = dict(
+            db.execute(
+                select(ProductNameGram.gram, func.count())
+                .where(ProductNameGram.gram.in_(missing))
+                .group_by(ProductNameGram.gram)
+            ).all()
+        )
+        for gram in missing:
+            counts[gram] = found.get(gram, 0)
+            gram_counts.set(gram, counts[gram])
+    return counts  # type: ignore[return-value]
+
+
+def _sku_prefix_ids(db: Session, query: str, limit: int) -> list[int]:
+    prefix = unicodedata.normalize("NFKC", query).strip()
+    if not prefix:
+        return []
+    # A range rather than LIKE so every dialect can walk the unique sku index.
+    stmt = (
+        select(Product.id)
+        .where(Product.is_active.is_(True), Product.sku >= prefix, Product.sku < prefix + _MAX_CHAR)
+        .order_by(Product.sku)
+        .limit(limit)
+    )
+    return list(db.scalars(stmt))
+
+
+@lru_cache(maxsize=None)
+def _single_char_statement() -> Select:
+    products, ngrams = Product.__table__, ProductNameGram.__table__
+    return (
+        select(ngrams.c.product_id)
+        .join(products, products.c.id == ngrams.c.product_id)
+        .where(products.c.is_active.is_(True), ngrams.c.gram >= bindparam("low"), ngrams.c.gram < bindparam("high"))
+        .distinct()
+        # The lowest ids first, like the multi-gram path, instead of whatever order the gram range is read in.
+        .order_by(ngrams.c.product_id)
+    )
+
+
+@lru_cache(maxsize=MAX_JOINED_GRAMS)
+def _all_grams_statement(gram_count: int) -> Select:
+    """Products having grams ``g0``..``g{n-1}``, driven by ``g0`` (pass the rarest gram as ``g0``)."""
+
+    products, ngrams = Product.__table__, ProductNameGram.__table__
+    driver = ngrams.alias("g0")
+    joined = driver.join(products, products.c.id == driver.c.product_id)
+    for index in range(1, gram_count):
+        probe = ngrams.alias(f"g{index}")
+        joined = joined.join(
+            probe, and_(probe.c.product_id == driver.c.product_id, probe.c.gram == bindparam(f"g{index}"))
+        )
+    return (
+        select(products.c.id, products.c.name)
+        .select_from(joined)
+        .where(driver.c.gram == bindparam("g0"), products.c.is_active.is_(True))
+        .order_by(driver.c.product_id)
+    )
+
+
+def _name_match_ids(db: Session, needle: str, limit: int, exclude: set[int]) -> list[int]:
+    # Statements are built once per shape with bound grams: building them was most of a short search.
+    options = {"yield_per": SCAN_BATCH_SIZE}
+    found: list[int] = []
+    if len(needle) == 1:
+        result = db.execute(_single_char_statement(), {"low": needle, "high": needle + _MAX_CHAR}, execution_options=options)
+        for (product_id,) in result:
+            if product_id not in exclude:
+                exclude.add(product_id)
+                found.append(product_id)
+                if len(found) == limit:
+                    break
+        result.close()
+        return found
+
+    grams = sorted({needle[index : index + GRAM_SIZE] for index in range(len(needle) - 1)})
+    counts = _gram_counts(db, grams)
+    # Drive the join from the rarest gram; every other gram is a primary-key probe. A cached
+    # zero is never trusted as "no match": that gram simply drives, so a stale count costs one
+    # empty (or fresh) index range instead of hiding products named since it was cached.
+    grams = sorted(grams, key=counts.__getitem__)[:MAX_JOINED_GRAMS]
+    params = {f"g{index}": gram for index, gram in enumerate(grams)}
+    result = db.execute(_all_grams_statement(len(grams)), params, execution_options=options)
+    for product_id, name in result:
+        # Shared bigrams are necessary, not sufficient: confirm the contiguous match.
+        if product_id not in exclude and needle in normalize(name):
+            found.append(product_id)
+            if len(found) == limit:
+                break
+    result.close()
+    return found
+
+
+def search_product_ids(db: Session, query: str, limit: int) -> list[int]:
+    """Active products whose SKU starts with ``query`` (first, by SKU), then whose name contains it."""
+
+    ids = _sku_prefix_ids(db, query, limit)
+    needle = normalize(query)
+    if len(ids) < limit and needle:
+        ids += _name_match_ids(db, needle, limit - len(ids), set(ids))
+    return ids
+
+
+__all__ = [
+    "gram_counts",
+    "index_product_names",
+    "name_grams",
+    "normalize",
+    "search_product_ids",
+    "sku_cache",
+]
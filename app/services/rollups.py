@@ -0,0 +1,437 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
+from typing import Any
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import Table, delete, func, insert, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models import (
+    DailySalesRollup,
+    Order,
+    OrderItem,
+    Payment,
+    PaymentMethod,
+    SalesBucket,
+    SalesDimension,
+    SalesGranularity,
+)
+
+ROLLUP_CHUNK_SIZE = 1000
+ROLLUP_COUNTERS = ("order_count", "revenue_total", "payment_total")
+SALES_BUCKET_KEY = ("granularity", "dimension", "bucket_start", "dimension_key")
+SALES_BUCKET_COUNTERS = ("order_count", "quantity", "amount")
+
+SalesBucketKey = tuple[SalesGranularity, SalesDimension, datetime, str]
+
+
+@dataclass
+class RollupTotals:
+    order_count: int = 0
+    revenue_total: Decimal = Decimal("0")
+    payment_total: Decimal = Decimal("0")
+
+
+@dataclass(frozen=True)
+class RollupDrift:
+    business_day: date
+    expected: RollupTotals
+    actual: RollupTotals
+
+
+@lru_cache()
+def _zone(name: str) -> ZoneInfo:
+    return ZoneInfo(name)
+
+
+def business_zone() -> ZoneInfo:
+    return _zone(get_settings().business_timezone)
+
+
+def business_day(moment: datetime) -> date:
+    """Map a timestamp (naive values are UTC) to the store's business day."""
+
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(business_zone()).date()
+
+
+def upsert_increment(
+    db: Session,
+    table: Table,
+    rows: Sequence[dict[str, Any]],
+    conflict_columns: Sequence[str],
+    counters: Sequence[str],
+) -> None:
+    """Insert ``rows`` or add their ``counters`` onto existing rows, in one statement where supported."""
+
+    if not rows:
+        return
+    # Upsert statements skip Column.onupdate, so refresh updated_at explicitly.
+    touch = {"updated_at": func.now()} if "updated_at" in table.c else {}
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        stmt = mysql.insert(table).values(list(rows))
+        db.execute(
+            stmt.on_duplicate_key_update({name: table.c[name] + stmt.inserted[name] for name in counters} | touch)
+        )
+    elif dialect in ("sqlite", "postgresql"):
+        dialect_insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        stmt = dialect_insert(table).values(list(rows))
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[table.c[name] for name in conflict_columns],
+                set_={name: table.c[name] + stmt.excluded[name] for name in counters} | touch,
+            )
+        )
+    else:
+        for row in rows:
+            match = [table.c[name] == row[name] for name in conflict_columns]
+            increments = {name: table.c[name] + row[name] for name in counters}
+            if not db.execute(update(table).where(*match).values(**increments)).rowcount:
+                db.execute(insert(table).values(**row))
+
+
+def record_order_sales(db: Session, sales: Iterable[tuple[datetime, Decimal, Decimal]]) -> None:
+    """Add ``(created_at, total, payment_total)`` orders to their business day rollups in one upsert."""
+
+    rows: dict[date, dict[str, Any]] = {}
+    for created_at, total, payment_total in sales:
+        day = business_day(created_at)
+        row = rows.get(day)
+        if row is None:
+            row = rows[day] = {
+                "business_day": day,
+                "order_count": 0,
+                "revenue_total": Decimal("0"),
+                "payment_total": Decimal("0"),
+            }
+        row["order_count"] += 1
+        row["revenue_total"] += total
+        row["payment_total"] += payment_total
+    upsert_increment(
+        db,
+        DailySalesRollup.__table__,
+        [rows[day] for day in sorted(rows)],
+        conflict_columns=("business_day",),
+        counters=ROLLUP_COUNTERS,
+    )
+
+
+def record_order_sale(db: Session, created_at: datetime, total: Decimal, payment_total: Decimal) -> None:
+    """Add one order to its business day rollup inside the caller's transaction."""
+
+    record_order_sales(db, [(created_at, total, payment_total)])
+
+
+def _as_utc(moment: datetime) -> datetime:
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def _bucket_starts(moment: datetime) -> dict[SalesGranularity, datetime]:
+    """UTC start of the hour and of the business day containing ``moment``."""
+
+    moment = _as_utc(moment)
+    local_midnight = datetime.combine(business_day(moment), time.min, tzinfo=business_zone())
+    return {
+        SalesGranularity.HOUR: moment.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0),
+        SalesGranularity.DAY: local_midnight.astimezone(timezone.utc),
+    }
+
+
+def net_payment_lines(
+    payment_lines: Iterable[tuple[str, Decimal]], change_amount: Decimal
+) -> list[tuple[str, Decimal]]:
+    """Split what an order collected across its payments: tendered amounts net of the change given.
+
+    Change is handed back in cash, so it comes off cash payments first and then off
+    the other payments, latest first. Payments left at zero are dropped.
+    """
+
+    lines = list(payment_lines)
+    net = [amount for _, amount in lines]
+    cash_first = sorted(reversed(range(len(lines))), key=lambda index: lines[index][0] != PaymentMethod.CASH)
+    remaining = change_amount
+    for index in cash_first:
+        taken = min(net[index], remaining)
+        net[index] -= taken
+        remaining -= taken
+    return [(method, amount) for (method, _), amount in zip(lines, net) if amount > 0]
+
+
+def _bucket_rows(
+    created_at: datetime,
+    product_lines: Iterable[tuple[int, int, Decimal]],
+    payment_lines: Iterable[tuple[str, Decimal]],
+) -> dict[SalesBucketKey, dict[str, Any]]:
+    """Fold one order into bucket rows, keyed by the bucket primary key.
+
+    ``payment_lines`` are net of change (see :func:`net_payment_lines`), so the
+    payment method buckets of an order add up to its total.
+    """
+
+    starts = _bucket_starts(created_at)
+    rows: dict[SalesBucketKey, dict[str, Any]] = {}
+
+    def add(dimension: SalesDimension, key: str, quantity: int, amount: Decimal) -> None:
+        for granularity, bucket_start in starts.items():
+            row = rows.get((granularity, dimension, bucket_start, key))
+            if row is None:
+                row = rows[(granularity, dimension, bucket_start, key)] = {
+                    "granularity": granularity,
+                    "dimension": dimension,
+                    "bucket_start": bucket_start,
+                    "dimension_key": key,
+                    "order_count": 1,
+                    "quantity": 0,
+                    "amount": Decimal("0"),
+                }
+            row["quantity"] += quantity
+            row["amount"] += amount
+
+    for product_id, quantity, line_total in product_lines:
+        add(SalesDimension.PRODUCT, str(product_id), quantity, line_total)
+    for method, amount in payment_lines:
+        add(SalesDimension.PAYMENT_METHOD, str(method), 1, amount)
+    return rows
+
+
+def record_orders_buckets(
+    db: Session,
+    orders: Iterable[tuple[datetime, Iterable[tuple[int, int, Decimal]], Iterable[tuple[str, Decimal]]]],
+) -> None:
+    """Add ``(created_at, product_lines, payment_lines)`` orders to their sales buckets in one upsert.
+
+    Rows are written in primary-key order so concurrent checkouts lock shared
+    buckets in the same sequence and cannot deadlock each other.
+    """
+
+    rows: dict[SalesBucketKey, dict[str, Any]] = {}
+    for created_at, product_lines, payment_lines in orders:
+        _merge_bucket_rows(rows, _bucket_rows(created_at, product_lines, payment_lines))
+    upsert_increment(
+        db,
+        SalesBucket.__table__,
+        [rows[key] for key in sorted(rows)],
+        conflict_columns=SALES_BUCKET_KEY,
+        counters=SALES_BUCKET_COUNTERS,
+    )
+
+
+def record_order_buckets(
+    db: Session,
+    created_at: datetime,
+    product_lines: Iterable[tuple[int, int, Decimal]],
+    payment_lines: Iterable[tuple[str, Decimal]],
+) -> None:
+    """Add one order's lines and payments to its hourly and daily sales buckets."""
+
+    record_orders_buckets(db, [(created_at, product_lines, payment_lines)])
+
+
+def query_sales_buckets(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    granularity: SalesGranularity,
+    dimension: SalesDimension,
+) -> list[tuple[datetime, str, int, int, Decimal]]:
+    """Return ``(bucket_start, key, order_count, quantity, amount)`` for buckets starting in ``[start, end)``.
+
+    This is a single range scan over the bucket primary key; bucket starts are
+    returned in the business timezone.
+    """
+
+    rows = db.execute(
+        select(
+            SalesBucket.bucket_start,
+            SalesBucket.dimension_key,
+            SalesBucket.order_count,
+            SalesBucket.quantity,
+            SalesBucket.amount,
+        )
+        .where(
+            SalesBucket.granularity == granularity,
+            SalesBucket.dimension == dimension,
+            SalesBucket.bucket_start >= start.astimezone(timezone.utc),
+            SalesBucket.bucket_start < end.astimezone(timezone.utc),
+        )
+        .order_by(SalesBucket.bucket_start, SalesBucket.dimension_key)
+    )
+    zone = business_zone()
+    return [
+        (_as_utc(bucket_start).astimezone(zone), key, order_count, quantity, Decimal(amount))
+        for bucket_start, key, order_count, quantity, amount in rows
+    ]
+
+
+def recompute_daily_totals(db: Session) -> dict[date, RollupTotals]:
+    """Rebuild per-day totals from the raw orders and payments tables."""
+
+    totals: dict[date, RollupTotals] = defaultdict(RollupTotals)
+    orders = db.execute(
+        select(Order.created_at, Order.total), execution_options={"yield_per": ROLLUP_CHUNK_SIZE}
+    )
+    for created_at, total in orders:
+        day_totals = totals[business_day(created_at)]
+        day_totals.order_count += 1
+        day_totals.revenue_total += Decimal(total)
+
+    payments = db.execute(
+        select(Order.created_at, Payment.amount).join(Payment, Payment.order_id == Order.id),
+        execution_options={"yield_per": ROLLUP_CHUNK_SIZE},
+    )
+    for created_at, amount in payments:
+        totals[business_day(created_at)].payment_total += Decimal(amount)
+    return dict(totals)
+
+
+def read_daily_rollups(db: Session) -> dict[date, RollupTotals]:
+    rows = db.execute(
+        select(
+            DailySalesRollup.business_day,
+            DailySalesRollup.order_count,
+            DailySalesRollup.revenue_total,
+            DailySalesRollup.payment_total,
+        )
+    )
+    return {
+        day: RollupTotals(order_count, Decimal(revenue_total), Decimal(payment_total))
+        for day, order_count, revenue_total, payment_total in rows
+    }
+
+
+def _merge_bucket_rows(totals: dict[SalesBucketKey, dict[str, Any]], rows: dict[SalesBucketKey, dict[str, Any]]) -> None:
+    for key, row in rows.items():
+        existing = totals.get(key)
+        if existing is None:
+            totals[key] = dict(row)
+            continue
+        for name in SALES_BUCKET_COUNTERS:
+            existing[name] += row[name]
+
+
+def recompute_sales_buckets(db: Session) -> dict[SalesBucketKey, dict[str, Any]]:
+    """Rebuild hourly and daily sales buckets from raw order items and payments."""
+
+    totals: dict[SalesBucketKey, dict[str, Any]] = {}
+    items = db.execute(
+        select(Order.id, Order.created_at, OrderItem.product_id, OrderItem.quantity, OrderItem.line_total)
+        .join(OrderItem, OrderItem.order_id == Order.id)
+        .order_by(Order.id),
+        execution_options={"yield_per": ROLLUP_CHUNK_SIZE},
+    )
+    for _, lines in groupby(items, key=itemgetter(0)):
+        lines = list(lines)
+        product_lines = [(product_id, quantity, Decimal(line_total)) for _, _, product_id, quantity, line_total in lines]
+        _merge_bucket_rows(totals, _bucket_rows(lines[0][1], product_lines, []))
+
+    payments = db.execute(
+        select(Order.id, Order.created_at, Order.change_amount, Payment.method, Payment.amount)
+        .join(Payment, Payment.order_id == Order.id)
+        .order_by(Order.id, Payment.id),
+        execution_options={"yield_per": ROLLUP_CHUNK_SIZE},
+    )
+    for _, lines in groupby(payments, key=itemgetter(0)):
+        lines = list(lines)
+        payment_lines = net_payment_lines(
+            [(method, Decimal(amount)) for _, _, _, method, amount in lines], Decimal(lines[0][2])
+        )
+        _merge_bucket_rows(totals, _bucket_rows(lines[0][1], [], payment_lines))
+    return totals
+
+
+def find_bucket_drift(db: Session) -> list[SalesBucketKey]:
+    """Return the keys of sales buckets whose stored counters differ from raw rows."""
+
+    expected = {
+        key: tuple(row[name] for name in SALES_BUCKET_COUNTERS) for key, row in recompute_sales_buckets(db).items()
+    }
+    actual = {
+        (granularity, dimension, _as_utc(bucket_start), key): (order_count, quantity, Decimal(amount))
+        for granularity, dimension, bucket_start, key, order_count, quantity, amount in db.execute(
+            select(
+                SalesBucket.granularity,
+                SalesBucket.dimension,
+                SalesBucket.bucket_start,
+                SalesBucket.dimension_key,
+                SalesBucket.order_count,
+                SalesBucket.quantity,
+                SalesBucket.amount,
+            )
+        )
+    }
+    return sorted(key for key in expected.keys() | actual.keys() if expected.get(key) != actual.get(key))
+
+
+def find_rollup_drift(db: Session) -> list[RollupDrift]:
+    """Compare stored rollups with freshly recomputed ones and return mismatching days."""
+
+    expected = recompute_daily_totals(db)
+    actual = read_daily_rollups(db)
+    drift = []
+    for day in sorted(expected.keys() | actual.keys()):
+        want = expected.get(day, RollupTotals())
+        have = actual.get(day, RollupTotals())
+        if want != have:
+            drift.append(RollupDrift(business_day=day, expected=want, actual=have))
+    return drift
+
+
+def rebuild_rollups(db: Session) -> int:
+    """Replace every stored rollup and sales bucket with recomputed values.
+
+    Returns the number of business days written.
+    """
+
+    buckets = recompute_sales_buckets(db)
+    db.execute(delete(SalesBucket))
+    if buckets:
+        db.execute(insert(SalesBucket), list(buckets.values()))
+
+    totals = recompute_daily_totals(db)
+    db.execute(delete(DailySalesRollup))
+    if totals:
+        db.execute(
+            insert(DailySalesRollup),
+            [
+                {
+                    "business_day": day,
+                    "order_count": day_totals.order_count,
+                    "revenue_total": day_totals.revenue_total,
+                    "payment_total": day_totals.payment_total,
+                }
+                for day, day_totals in totals.items()
+            ],
+        )
+    return len(totals)
+
+
+__all__ = [
+    "RollupDrift",
+    "RollupTotals",
+    "business_day",
+    "business_zone",
+    "find_bucket_drift",
+    "find_rollup_drift",
+    "net_payment_lines",
+    "query_sales_buckets",
+    "rebuild_rollups",
+    "recompute_daily_totals",
+    "recompute_sales_buckets",
+    "record_order_buckets",
+    "record_order_sale",
+    "record_order_sales",
+    "record_orders_buckets",
+    "upsert_increment",
+]
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+
+class PoolStats:
+    """Counters fed by SQLAlchemy pool events for one engine in this worker."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._engine: Engine | None = None
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.connects = 0
+            self.disconnects = 0
+            self.checkouts = 0
+            self.invalidations = 0
+            self.pre_ping_failures = 0
+            self.checkout_timeouts = 0
+            self.wait_count = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+
+    def _incr(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def record_timeout(self) -> None:
+        self._incr("checkout_timeouts")
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def attach(self, engine: Engine) -> None:
+        """Subscribe to the pool and error events of ``engine`` (use ``AsyncEngine.sync_engine`` for async)."""
+
+        self._engine = engine
+        event.listen(engine.pool, "connect", lambda *_: self._incr("connects"))
+        event.listen(engine.pool, "close", lambda *_: self._incr("disconnects"))
+        event.listen(engine.pool, "checkout", lambda *_: self._incr("checkouts"))
+        event.listen(engine.pool, "invalidate", lambda *_: self._incr("invalidations"))
+        event.listen(engine, "handle_error", self._on_error)
+
+    def _on_error(self, context: Any) -> None:
+        if context.is_pre_ping:
+            self._incr("pre_ping_failures")
+
+    def snapshot(self) -> dict[str, Any]:
+        pool = self._engine.pool if self._engine is not None else None
+        live: dict[str, Any] = {"pool": type(pool).__name__ if pool is not None else None}
+        if isinstance(pool, QueuePool):
+            live.update(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=pool.overflow(),
+                timeout_seconds=pool.timeout(),
+            )
+        with self._lock:
+            return {
+                **live,
+                "connects": self.connects,
+                "disconnects": self.disconnects,
+                "checkouts": self.checkouts,
+                "invalidations": self.invalidations,
+                "pre_ping_failures": self.pre_ping_failures,
+                "checkout_timeouts": self.checkout_timeouts,
+                "wait_ms_avg": round(self.wait_total / self.wait_count * 1000, 3) if self.wait_count else 0.0,
+                "wait_ms_max": round(self.wait_max * 1000, 3),
+            }
+
+
+def timed_pool_class(base: type[QueuePool], stats: PoolStats) -> type[QueuePool]:
+    """Subclass ``base`` so every checkout records how long it waited for a connection.
+
+    SQLAlchemy has no event for the wait itself, so the timing wraps the
+    pool's internal ``_do_get``; time to open a new overflow connection is
+    included.
+    """
+
+    class TimedPool(base):  # type: ignore[valid-type, misc]
+        def _do_get(self):  # noqa: ANN202
+            began = time.perf_counter()
+            try:
+                return super()._do_get()
+            except exc.TimeoutError:
+                stats.record_timeout()
+                raise
+            finally:
+                stats.record_wait(time.perf_counter() - began)
+
+    TimedPool.__name__ = TimedPool.__qualname__ = f"Timed{base.__name__}"
+    return TimedPool
+
+
+__all__ = ["PoolStats", "timed_pool_class"]
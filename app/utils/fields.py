@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+from fastapi import HTTPException, status
+
+FIELDS_DESCRIPTION = "Comma-separated response fields to return (sparse fieldset); omit for the full document"
+
+
+def parse_fields(raw: str | None, allowed: Sequence[str]) -> tuple[str, ...] | None:
+    """Parse a ``?fields=a,b`` value into names from ``allowed``, in ``allowed`` order.
+
+    Returns ``None`` when the parameter is absent, so callers keep their full
+    document path. Normalising the order and dropping duplicates makes equal
+    selections share one cache key and one SQL statement.
+    """
+
+    if raw is None:
+        return None
+    requested = {name.strip() for name in raw.split(",")} - {""}
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown field(s): {', '.join(sorted(unknown))}",
+        )
+    if not requested:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="fields must name at least one field")
+    return tuple(name for name in allowed if name in requested)
+
+
+__all__ = ["FIELDS_DESCRIPTION", "parse_fields"]
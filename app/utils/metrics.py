@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import os
+import time
+from typing import Any
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# With PROMETHEUS_MULTIPROC_DIR set (before this module is imported) every
+# worker writes its samples to mmap files there and /metrics sums them.
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+UNMATCHED_ROUTE = "<unmatched>"
+KNOWN_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from request start until the last response byte was sent.",
+    ("method", "route", "status"),
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Response body size.",
+    ("method", "route", "status"),
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requests currently being served.",
+    ("method",),
+    multiprocess_mode="livesum",
+)
+
+
+# Label children resolved once per (method, route, status): a plain dict read skips the
+# metric's own label lock and validation on the hot path.
+_children: dict[tuple[str, str, str], tuple[Any, Any]] = {}
+
+
+def _observers(method: str, route: str, status: str) -> tuple[Any, Any]:
+    key = (method, route, status)
+    observers = _children.get(key)
+    if observers is None:
+        observers = _children[key] = (REQUEST_DURATION.labels(*key), RESPONSE_SIZE.labels(*key))
+    return observers
+
+
+def _route_label(scope: Scope) -> str:
+    # FastAPI stores the matched APIRoute in the scope; its template keeps label cardinality bounded.
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency, response size and in-flight requests."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"] if scope["method"] in KNOWN_METHODS else "OTHER"
+        in_progress = IN_PROGRESS.labels(method)
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        began = time.perf_counter()
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            duration, response_size = _observers(method, _route_label(scope), str(status_code))
+            duration.observe(time.perf_counter() - began)
+            response_size.observe(size)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Return the text exposition for this process, or for all workers in multiprocess mode."""
+
+    registry: Any = REGISTRY
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+__all__ = ["MetricsMiddleware", "render_metrics"]
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+from collections.abc import Mapping, Sequence
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Generic, TypeVar
+
+from jose import JWTError, jwt
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.cache import TTLCache
+
+T = TypeVar("T")
+
+# Sent on every response to a write that committed; clients may echo it on later reads.
+LAST_WRITE_HEADER = "X-Last-Write"
+RECENT_WRITERS_SIZE = 4096
+# Token subjects that committed a write within READ_AFTER_WRITE_SECONDS (stored per entry).
+recent_writers: TTLCache[float] = TTLCache(maxsize=RECENT_WRITERS_SIZE, ttl=60.0)
+
+
+class ReplicaSet(Generic[T]):
+    """Round-robin over read replicas that skips any replica which recently failed.
+
+    A replica is marked down when a connection to it cannot be checked out (or
+    is lost mid-request) and is offered again after ``retry_after`` seconds;
+    callers fall back to the primary when no replica is available.
+    """
+
+    def __init__(self, replicas: Sequence[tuple[str, T]], retry_after: float) -> None:
+        self.retry_after = retry_after
+        self._replicas = list(replicas)
+        self._lock = threading.Lock()
+        self._down_until: dict[str, float] = {}
+        self._failures: dict[str, int] = {}
+        self._turn = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._replicas)
+
+    def members(self) -> list[tuple[str, T]]:
+        return list(self._replicas)
+
+    def candidates(self) -> list[tuple[str, T]]:
+        """Replicas to try for one request, healthy ones only, rotated for load spreading."""
+
+        if not self._replicas:
+            return []
+        now = time.monotonic()
+        start = next(self._turn) % len(self._replicas)
+        rotated = self._replicas[start:] + self._replicas[:start]
+        with self._lock:
+            return [(name, target) for name, target in rotated if self._down_until.get(name, 0.0) <= now]
+
+    def mark_down(self, name: str) -> None:
+        with self._lock:
+            self._down_until[name] = time.monotonic() + self.retry_after
+            self._failures[name] = self._failures.get(name, 0) + 1
+
+    def status(self) -> list[dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "name": name,
+                    "healthy": self._down_until.get(name, 0.0) <= now,
+                    "failures": self._failures.get(name, 0),
+                }
+                for name, _ in self._replicas
+            ]
+
+
+def bearer_subject(headers: Mapping[str, str]) -> str | None:
+    """The ``sub`` claim of the request's bearer token, read without verifying the token.
+
+    It only picks primary or replica for a read and never grants access: a forged
+    subject can at most send its own reads to the primary.
+    """
+
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        subject = jwt.get_unverified_claims(token).get("sub")
+    except JWTError:
+        return None
+    return None if subject is None else str(subject)
+
+
+def wrote_recently(headers: Mapping[str, str], window: float) -> bool:
+    """True while the caller's last committed write is younger than ``window`` seconds.
+
+    The user is looked up by token subject on this worker; a client that echoes
+    ``X-Last-Write`` is also recognised by workers that did not serve its write.
+    """
+
+    subject = bearer_subject(headers)
+    if subject is not None and recent_writers.get(subject) is not None:
+        return True
+    raw = headers.get(LAST_WRITE_HEADER)
+    if not raw:
+        return False
+    try:
+        return time.time() - float(raw) < window
+    except ValueError:
+        return False
+
+
+@dataclass
+class _RequestWrites:
+    committed: bool = False
+
+
+_current_writes: ContextVar[_RequestWrites | None] = ContextVar("current_writes", default=None)
+
+
+@event.listens_for(Session, "after_commit")
+def _record_commit(session: Session) -> None:  # noqa: ARG001
+    writes = _current_writes.get()
+    if writes is not None:
+        writes.committed = True
+
+
+class ReadAfterWriteMiddleware:
+    """Remember which user committed a write, so their reads go to the primary for a while.
+
+    Writes are tracked per bearer token subject rather than with a cookie: the
+    terminals are a cross-site SPA using bearer auth and never send cookies back.
+    ``get_read_db`` then serves a user who just wrote from the primary, so a terminal
+    reads its own order or product update even while replicas lag.
+    """
+
+    def __init__(self, app: ASGIApp, window: float) -> None:
+        self.app = app
+        self.window = window
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in ("GET", "HEAD", "OPTIONS"):
+            await self.app(scope, receive, send)
+            return
+
+        writes = _RequestWrites()
+        token = _current_writes.set(writes)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and writes.committed:
+                now = time.time()
+                subject = bearer_subject(Headers(scope=scope))
+                if subject is not None:
+                    recent_writers.set(subject, now, ttl=self.window)
+                MutableHeaders(scope=message)[LAST_WRITE_HEADER] = f"{now:.3f}"
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_writes.reset(token)
+
+
+__all__ = [
+    "LAST_WRITE_HEADER",
+    "ReadAfterWriteMiddleware",
+    "ReplicaSet",
+    "bearer_subject",
+    "recent_writers",
+    "wrote_recently",
+]
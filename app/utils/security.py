@@ -1,33 +1,161 @@
 from __future__ import annotations
 
+import asyncio
+import base64
 import hashlib
 import hmac
 import secrets
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict
+from functools import lru_cache
+from typing import Any, Callable, Dict, TypeVar
 
 from jose import JWTError, jwt
 
 from app.config import get_settings
 
 ALGORITHM = "HS256"
+SCRYPT_PREFIX = "scrypt"
+SCRYPT_R = 8
+SCRYPT_P = 1
+SCRYPT_SALT_BYTES = 16
+SCRYPT_KEY_BYTES = 32
+
+T = TypeVar("T")
 
 
 class TokenError(Exception):
     """Raised when JWT validation fails."""
 
 
-def hash_password(password: str) -> str:
-    """Generate a deterministic SHA-256 hash for the given password."""
+class PasswordPoolBusy(Exception):
+    """Raised when the password hashing pool has no free worker or queue slot."""
+
+
+def _b64(raw: bytes) -> str:
+    return base64.b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _unb64(text: str) -> bytes:
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def _scrypt(password: str, salt: bytes, n: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode("utf-8"),
+        salt=salt,
+        n=n,
+        r=SCRYPT_R,
+        p=SCRYPT_P,
+        maxmem=256 * n * SCRYPT_R,
+        dklen=SCRYPT_KEY_BYTES,
+    )
 
-    return hashlib.sha256(password.encode("utf-8")).hexdigest()
+
+def _is_legacy_hash(password_hash: str) -> bool:
+    return len(password_hash) == 64 and "$" not in password_hash
+
+
+def hash_password(password: str, cost: int | None = None) -> str:
+    """Derive a salted scrypt hash encoded as ``scrypt$n$salt$key``."""
+
+    n = cost or get_settings().password_scrypt_n
+    salt = secrets.token_bytes(SCRYPT_SALT_BYTES)
+    return f"{SCRYPT_PREFIX}${n}${_b64(salt)}${_b64(_scrypt(password, salt, n))}"
 
 
 def verify_password(password: str, password_hash: str) -> bool:
-    """Compare a raw password against a stored hash in constant time."""
+    """Compare a raw password against a stored scrypt or legacy SHA-256 hash in constant time."""
+
+    if _is_legacy_hash(password_hash):
+        candidate = hashlib.sha256(password.encode("utf-8")).hexdigest()
+        return hmac.compare_digest(candidate, password_hash)
+
+    try:
+        prefix, n, salt, key = password_hash.split("$")
+        if prefix != SCRYPT_PREFIX:
+            return False
+        return hmac.compare_digest(_scrypt(password, _unb64(salt), int(n)), _unb64(key))
+    except ValueError:
+        return False
+
+
+@lru_cache()
+def _dummy_hash(n: int) -> str:
+    return hash_password(secrets.token_urlsafe(), n)
+
+
+def dummy_password_hash() -> str:
+    """A fixed scrypt hash at the configured cost that no password matches.
+
+    Verifying against it when an account does not exist makes a failed login take
+    as long as a wrong password, so response times do not reveal registered emails.
+    """
+
+    return _dummy_hash(get_settings().password_scrypt_n)
+
+
+def needs_rehash(password_hash: str) -> bool:
+    """Whether a stored hash is legacy SHA-256 or uses a weaker scrypt cost than configured."""
+
+    if _is_legacy_hash(password_hash):
+        return True
+    try:
+        prefix, n, _, _ = password_hash.split("$")
+        return prefix != SCRYPT_PREFIX or int(n) < get_settings().password_scrypt_n
+    except ValueError:
+        return True
+
+
+class PasswordHashPool:
+    """Bounded executor that keeps slow KDF work off the request threadpool.
+
+    At most ``size`` hashes run at once and ``queue_depth`` more may wait;
+    further submissions fail fast with :class:`PasswordPoolBusy` instead of
+    piling up behind a login storm.
+    """
+
+    def __init__(self, size: int, queue_depth: int, kind: str = "thread") -> None:
+        self.size = max(1, size)
+        self.queue_depth = max(0, queue_depth)
+        self._slots = threading.BoundedSemaphore(self.size + self.queue_depth)
+        executor_class = ProcessPoolExecutor if kind == "process" else ThreadPoolExecutor
+        self._executor: Executor = executor_class(max_workers=self.size)
+
+    async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        if not self._slots.acquire(blocking=False):
+            raise PasswordPoolBusy("Password hashing pool is saturated")
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password, get_settings().password_scrypt_n)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._run(verify_password, password, password_hash)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+@lru_cache()
+def get_password_pool() -> PasswordHashPool:
+    settings = get_settings()
+    return PasswordHashPool(
+        settings.password_pool_size, settings.password_pool_queue_depth, settings.password_pool_kind
+    )
+
 
-    candidate = hash_password(password)
-    return hmac.compare_digest(candidate, password_hash)
+def reset_password_pool() -> None:
+    if get_password_pool.cache_info().currsize:
+        get_password_pool().shutdown()
+    get_password_pool.cache_clear()
 
 
 def create_access_token(user_id: int, expires_minutes: int | None = None) -> str:
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import get_settings
+
+logger = logging.getLogger("app.sql")
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%s|:\w+)(?:\s*,\s*(?:\?|%s|:\w+))+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+MAX_LOGGED_PARAMETERS = 500
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """Normalise a statement so calls differing only in literals or IN-list length compare equal."""
+
+    text = _STRING_LITERAL.sub("?", statement)
+    text = _NUMBER_LITERAL.sub("?", text)
+    text = _PLACEHOLDER_LIST.sub("(?+)", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class RepeatedQueryError(AssertionError):
+    """Raised in strict mode when one request runs the same statement more than the allowed times."""
+
+
+@dataclass
+class QueryGuard:
+    """Tunable thresholds; tests tighten these at runtime."""
+
+    slow_query_ms: float
+    log_parameters: bool
+    repeat_limit: int
+    strict: bool
+
+
+@dataclass
+class RequestQueries:
+    count: int = 0
+    seconds: float = 0.0
+    fingerprints: Counter[str] = field(default_factory=Counter)
+
+    def most_repeated(self) -> tuple[str, int] | None:
+        return self.fingerprints.most_common(1)[0] if self.fingerprints else None
+
+
+_settings = get_settings()
+guard = QueryGuard(
+    slow_query_ms=_settings.slow_query_ms,
+    log_parameters=_settings.slow_query_log_parameters,
+    repeat_limit=_settings.sql_repeat_limit,
+    strict=_settings.sql_repeat_strict,
+)
+current_queries: ContextVar[RequestQueries | None] = ContextVar("current_queries", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:  # noqa: ANN001
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:  # noqa: ANN001
+    started = getattr(context, "_query_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    stats = current_queries.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += elapsed
+        # A flush inserts one row per statement when the driver cannot return generated keys in
+        # bulk (MySQL); only reads and updates are treated as candidate N+1 patterns.
+        if statement.lstrip()[:6].upper() != "INSERT":
+            stats.fingerprints[fingerprint(statement)] += 1
+    if guard.slow_query_ms and elapsed * 1000 >= guard.slow_query_ms:
+        shown = repr(parameters)[:MAX_LOGGED_PARAMETERS] if guard.log_parameters else "<hidden>"
+        logger.warning("slow query %.1f ms: %s params=%s", elapsed * 1000, fingerprint(statement), shown)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Feed per-request accounting and the slow-query log from ``engine`` (``sync_engine`` for async)."""
+
+    if not event.contains(engine, "after_cursor_execute", _after_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _server_timing(stats: RequestQueries) -> str:
+    return f'db;dur={stats.seconds * 1000:.2f};desc="{stats.count} queries"'
+
+
+class QueryAccountingMiddleware:
+    """Count SQL per request, report it in ``Server-Timing`` and flag repeated statements."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueries()
+        token = current_queries.set(stats)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("Server-Timing", _server_timing(stats))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_queries.reset(token)
+        self._check_repeats(scope, stats)
+
+    @staticmethod
+    def _check_repeats(scope: Scope, stats: RequestQueries) -> None:
+        worst = stats.most_repeated()
+        if not guard.repeat_limit or worst is None or worst[1] <= guard.repeat_limit:
+            return
+        statement, times = worst
+        message = f"{scope['method']} {scope['path']} ran one statement {times} times: {statement}"
+        if guard.strict:
+            raise RepeatedQueryError(message)
+        logger.warning("possible N+1: %s", message)
+
+
+__all__ = [
+    "QueryAccountingMiddleware",
+    "QueryGuard",
+    "RepeatedQueryError",
+    "RequestQueries",
+    "current_queries",
+    "fingerprint",
+    "guard",
+    "instrument_engine",
+]
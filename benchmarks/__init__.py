@@ -0,0 +1 @@
+"""Benchmarks for the POS API hot paths."""
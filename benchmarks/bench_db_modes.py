@@ -0,0 +1,124 @@
+"""Compare concurrent throughput of the sync and async database modes.
+
+Each mode runs in its own interpreter because the route handlers are chosen
+from DATABASE_MODE at import time. The workload mixes checkouts (POST /orders)
+with summary reads (GET /reports). SQLite understates the gap: point
+--database-url at a scratch MySQL database to measure network wait.
+
+Usage: python -m benchmarks.bench_db_modes [--requests 2000] [--concurrency 100] [--database-url URL]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+
+MODES = ("sync", "async")
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 2)
+
+
+def seed(database_url: str) -> tuple[int, int]:
+    from sqlalchemy import create_engine, delete
+    from sqlalchemy.orm import sessionmaker
+
+    from app.models import Base, Product, User, UserRole
+    from app.utils.security import hash_password
+
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        for table in reversed(Base.metadata.sorted_tables):
+            session.execute(delete(table))
+        user = User(email="bench@example.com", password_hash=hash_password("secret"), role=UserRole.CLERK)
+        product = Product(sku="BENCH-001", name="Coffee", unit_price=Decimal("300.00"), tax_rate=Decimal("8.00"))
+        session.add_all([user, product])
+        session.commit()
+        ids = user.id, product.id
+    engine.dispose()
+    return ids
+
+
+async def run_mode(requests: int, concurrency: int, user_id: int, product_id: int) -> dict:
+    import httpx
+
+    from app.db import dispose_async_engine
+    from app.main import app
+    from app.utils.security import create_access_token
+
+    headers = {"Authorization": f"Bearer {create_access_token(user_id, 30)}"}
+    order = {"items": [{"product_id": product_id, "quantity": 1}], "payments": [{"amount": "500.00"}]}
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    gate = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+
+        async def one(index: int) -> None:
+            async with gate:
+                began = time.perf_counter()
+                if index % 2:
+                    resp = await client.get("/reports/")
+                else:
+                    resp = await client.post("/orders/", headers=headers, json=order)
+                latencies.append((time.perf_counter() - began) * 1000)
+                statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+
+        began = time.perf_counter()
+        await asyncio.gather(*(one(index) for index in range(requests)))
+        elapsed = time.perf_counter() - began
+    await dispose_async_engine()  # ASGITransport does not run the lifespan shutdown
+
+    return {
+        "requests_per_s": round(requests / elapsed, 1),
+        "p50_ms": percentile(latencies, 0.50),
+        "p99_ms": percentile(latencies, 0.99),
+        "statuses": statuses,
+    }
+
+
+def child(args: argparse.Namespace) -> None:
+    user_id, product_id = seed(os.environ["DATABASE_URL"])
+    print(json.dumps(asyncio.run(run_mode(args.requests, args.concurrency, user_id, product_id))))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--database-url", help="sync SQLAlchemy URL of a scratch database; it is wiped per mode")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child(args)
+        return
+
+    database_url = args.database_url or f"sqlite+pysqlite:///{Path(tempfile.mkdtemp()) / 'bench_db_modes.db'}"
+    results = []
+    for mode in MODES:
+        env = {**os.environ, "DATABASE_MODE": mode, "DATABASE_URL": database_url}
+        completed = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_db_modes", "--child",
+             "--requests", str(args.requests), "--concurrency", str(args.concurrency)],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        results.append({"mode": mode, **json.loads(completed.stdout.strip().splitlines()[-1])})
+    print(json.dumps({"requests": args.requests, "concurrency": args.concurrency, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Time GET /products/ and a full walk of GET /orders/ at 10k rows with FAST_JSON on and off.
+
+The catalog cache is cleared before every product request so each one
+rebuilds the body; orders are walked page by page at the maximum page size.
+
+Usage: python -m benchmarks.bench_list_endpoints [--rows 10000] [--repeat 5]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+import httpx
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.config import get_settings
+from app.db import get_db
+from app.main import app
+from app.models import Base, Order, OrderItem, OrderStatus, Payment, PaymentMethod, Product, User
+from app.routes.orders import MAX_PAGE_SIZE
+from app.services.catalog import catalog_cache
+
+SEED_CHUNK_SIZE = 5000
+
+
+def seed(session_factory: sessionmaker, rows: int) -> None:
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    with session_factory() as session:
+        session.execute(insert(User), [{"id": 1, "email": "bench@example.com", "password_hash": "x"}])
+        session.execute(
+            insert(Product),
+            [{"id": i, "sku": f"SKU-{i:05d}", "name": f"Item {i}", "description": f"Description of item {i}",
+              "unit_price": Decimal(100 + i % 900).scaleb(-1), "tax_rate": Decimal("8.00")}
+             for i in range(1, rows + 1)],
+        )
+        for chunk_start in range(1, rows + 1, SEED_CHUNK_SIZE):
+            ids = range(chunk_start, min(chunk_start + SEED_CHUNK_SIZE, rows + 1))
+            created = {order_id: start + timedelta(minutes=order_id) for order_id in ids}
+            session.execute(insert(Order), [
+                {"id": order_id, "order_no": f"20260101000000-{order_id:09d}", "user_id": 1, "subtotal": Decimal("300.00"),
+                 "tax_total": Decimal("24.00"), "total": Decimal("324.00"), "paid_amount": Decimal("500.00"),
+                 "change_amount": Decimal("176.00"), "status": OrderStatus.PAID, "memo": None,
+                 "created_at": created[order_id]}
+                for order_id in ids
+            ])
+            session.execute(insert(OrderItem), [
+                {"order_id": order_id, "product_id": (order_id + line) % rows + 1, "quantity": 1,
+                 "unit_price": Decimal("150.00"), "line_total": Decimal("162.00"), "created_at": created[order_id]}
+                for order_id in ids for line in range(2)
+            ])
+            session.execute(insert(Payment), [
+                {"order_id": order_id, "method": PaymentMethod.CASH, "amount": Decimal("500.00"),
+                 "created_at": created[order_id]}
+                for order_id in ids
+            ])
+        session.commit()
+
+
+async def measure(repeat: int) -> dict:
+    products_ms: list[float] = []
+    orders_ms: list[float] = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for _ in range(repeat):
+            catalog_cache.clear()
+            began = time.perf_counter()
+            resp = await client.get("/products/")
+            products_ms.append((time.perf_counter() - began) * 1000)
+            assert resp.status_code == 200
+            product_rows = len(resp.json())
+
+            order_rows = 0
+            params: dict[str, object] = {"limit": MAX_PAGE_SIZE}
+            began = time.perf_counter()
+            while True:
+                resp = await client.get("/orders/", params=params)
+                order_rows += len(resp.json())
+                cursor = resp.headers.get("X-Next-Cursor")
+                if not cursor:
+                    break
+                params = {"limit": MAX_PAGE_SIZE, "cursor": cursor}
+            orders_ms.append((time.perf_counter() - began) * 1000)
+    return {"product_rows": product_rows, "products_best_ms": round(min(products_ms), 1),
+            "order_rows": order_rows, "orders_walk_best_ms": round(min(orders_ms), 1)}
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    db_path = Path(tempfile.mkdtemp()) / "bench_list_endpoints.db"
+    engine = create_engine(f"sqlite+pysqlite:///{db_path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    seed(SessionLocal, args.rows)
+
+    def override_get_db():
+        session = SessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    settings = get_settings()
+    results = {}
+    try:
+        for fast_json in (False, True):
+            settings.fast_json = fast_json
+            results["fast_json" if fast_json else "validated"] = asyncio.run(measure(args.repeat))
+    finally:
+        app.dependency_overrides.clear()
+    results["products_speedup"] = round(
+        results["validated"]["products_best_ms"] / results["fast_json"]["products_best_ms"], 2
+    )
+    results["orders_speedup"] = round(
+        results["validated"]["orders_walk_best_ms"] / results["fast_json"]["orders_walk_best_ms"], 2
+    )
+    print(json.dumps({"rows": args.rows, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Measure /auth/login throughput and latency at several password pool sizes.
+
+A concurrent probe hits a sync endpoint during the burst to show whether
+logins starve the request threadpool that checkout traffic also uses.
+
+Usage: python -m benchmarks.bench_login [--pool-sizes 1,2,4] [--logins 200] [--concurrency 50]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.config import reset_settings_cache
+from app.db import get_db
+from app.main import app
+from app.models import Base, User
+from app.utils.security import hash_password, reset_password_pool
+
+USER_COUNT = 50
+PASSWORD = "secret"
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 2)
+
+
+async def run_burst(logins: int, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    latencies: list[float] = []
+    probe_latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    gate = asyncio.Semaphore(concurrency)
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def one_login(index: int) -> None:
+            async with gate:
+                began = time.perf_counter()
+                resp = await client.post(
+                    "/auth/login", json={"email": f"clerk{index % USER_COUNT}@example.com", "password": PASSWORD}
+                )
+                latencies.append((time.perf_counter() - began) * 1000)
+                statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+
+        async def probe() -> None:
+            while not done.is_set():
+                began = time.perf_counter()
+                await client.get("/healthz")
+                probe_latencies.append((time.perf_counter() - began) * 1000)
+                await asyncio.sleep(0.01)
+
+        probe_task = asyncio.create_task(probe())
+        began = time.perf_counter()
+        await asyncio.gather(*(one_login(index) for index in range(logins)))
+        elapsed = time.perf_counter() - began
+        done.set()
+        await probe_task
+
+    return {
+        "logins_per_s": round(logins / elapsed, 1),
+        "login_p50_ms": percentile(latencies, 0.50),
+        "login_p99_ms": percentile(latencies, 0.99),
+        "statuses": statuses,
+        "probe_p99_ms": percentile(probe_latencies, 0.99) if probe_latencies else None,
+        "probe_median_ms": round(statistics.median(probe_latencies), 2) if probe_latencies else None,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pool-sizes", default="1,2,4")
+    parser.add_argument("--queue-depth", type=int, default=256)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    db_path = Path(tempfile.mkdtemp()) / "bench_login.db"
+    engine = create_engine(f"sqlite+pysqlite:///{db_path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    shared_hash = hash_password(PASSWORD)
+    with SessionLocal() as session:
+        session.execute(
+            insert(User), [{"email": f"clerk{i}@example.com", "password_hash": shared_hash} for i in range(USER_COUNT)]
+        )
+        session.commit()
+
+    def override_get_db():
+        session = SessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    results = []
+    try:
+        for size in (int(value) for value in args.pool_sizes.split(",")):
+            os.environ["PASSWORD_POOL_SIZE"] = str(size)
+            os.environ["PASSWORD_POOL_QUEUE_DEPTH"] = str(args.queue_depth)
+            reset_settings_cache()
+            reset_password_pool()
+            results.append({"pool_size": size, **asyncio.run(run_burst(args.logins, args.concurrency))})
+    finally:
+        app.dependency_overrides.clear()
+        reset_password_pool()
+    print(json.dumps({"cpu_count": os.cpu_count(), "logins": args.logins, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Compare sequential POST /orders/ with POST /orders/batch for a replayed offline queue.
+
+Usage: python -m benchmarks.bench_order_batch [--orders 2000] [--batch-size 500] [--lines 3]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import get_db
+from app.main import app
+from app.models import Base, Product, User
+from app.utils.security import create_access_token, hash_password
+
+PRODUCT_COUNT = 50
+
+
+def make_orders(count: int, lines: int, product_ids: list[int]) -> list[dict]:
+    return [
+        {
+            "items": [
+                {"product_id": product_ids[(index + line) % len(product_ids)], "quantity": 1 + line}
+                for line in range(lines)
+            ],
+            "memo": f"offline #{index}",
+        }
+        for index in range(count)
+    ]
+
+
+async def replay(orders: list[dict], batch_size: int, headers: dict[str, str]) -> dict:
+    # Keep going on 500s: a clash on orders.order_no fails that checkout, not the run.
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    sequential_errors = 0
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        began = time.perf_counter()
+        for order in orders:
+            sequential_errors += (await client.post("/orders/", headers=headers, json=order)).status_code != 201
+        sequential = time.perf_counter() - began
+
+        batch_failed = 0
+        began = time.perf_counter()
+        for start in range(0, len(orders), batch_size):
+            resp = await client.post("/orders/batch", headers=headers, json={"orders": orders[start : start + batch_size]})
+            assert resp.status_code == 200, resp.text
+            batch_failed += resp.json()["failed"]
+        batched = time.perf_counter() - began
+
+    return {
+        "sequential_orders_per_s": round(len(orders) / sequential, 1),
+        "batch_orders_per_s": round(len(orders) / batched, 1),
+        "speedup": round(sequential / batched, 1),
+        "sequential_errors": sequential_errors,
+        "batch_failed": batch_failed,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--lines", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    db_path = Path(tempfile.mkdtemp()) / "bench_order_batch.db"
+    engine = create_engine(f"sqlite+pysqlite:///{db_path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    with SessionLocal() as session:
+        user = User(email="bench@example.com", password_hash=hash_password("secret"))
+        products = [
+            Product(sku=f"BENCH-{i:03d}", name=f"Item {i}", unit_price=Decimal("120.00"), tax_rate=Decimal("8.00"))
+            for i in range(PRODUCT_COUNT)
+        ]
+        session.add_all([user, *products])
+        session.commit()
+        user_id, product_ids = user.id, [product.id for product in products]
+
+    def override_get_db():
+        session = SessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    headers = {"Authorization": f"Bearer {create_access_token(user_id, 30)}"}
+    try:
+        result = asyncio.run(replay(make_orders(args.orders, args.lines, product_ids), args.batch_size, headers))
+    finally:
+        app.dependency_overrides.clear()
+    print(json.dumps({"orders": args.orders, "batch_size": args.batch_size, "lines": args.lines, **result}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
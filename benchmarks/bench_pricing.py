@@ -0,0 +1,144 @@
+"""Compare the former Decimal pricing of orders with the integer engine in app.services.pricing.
+
+"legacy" is the inline Decimal loop price_order ran before (Decimal per line,
+several quantize calls); "price_order" is today's function over the same
+payloads and Product rows; "engine" prices lines already held in minor units,
+as batch imports and previews can. Lines are drawn from a fixed catalog, as
+at a till, so repeated prices hit the conversion caches as in production.
+
+Usage: python -m benchmarks.bench_pricing [--baskets 20000] [--lines 5] [--products 500] [--repeat 7]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from collections.abc import Callable
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any
+
+from app.models import OrderStatus, Product
+from app.routes.orders import PricedOrder, price_order
+from app.schemas.order import OrderCreate
+from app.services.pricing import PriceLine, price_baskets, rate_to_basis_points, to_minor
+
+CENT = Decimal("0.01")
+
+
+def _quantize(amount: Decimal) -> Decimal:
+    return amount.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def legacy_price_order(payload: OrderCreate, products: dict[int, Product]) -> PricedOrder:
+    """price_order as it was before the integer engine, kept verbatim for comparison."""
+
+    subtotal = Decimal("0")
+    tax_total = Decimal("0")
+    order_items: list[dict[str, Any]] = []
+
+    for item in payload.items:
+        product = products[item.product_id]
+        unit_price = Decimal(product.unit_price)
+        quantity = item.quantity
+        line_subtotal = unit_price * quantity
+        tax_rate = Decimal(product.tax_rate) / Decimal("100")
+        line_tax = _quantize(line_subtotal * tax_rate)
+
+        subtotal += line_subtotal
+        tax_total += line_tax
+
+        order_items.append(
+            {
+                "product_id": product.id,
+                "quantity": quantity,
+                "unit_price": _quantize(unit_price),
+                "line_total": _quantize(line_subtotal + line_tax),
+            }
+        )
+
+    subtotal = _quantize(subtotal)
+    tax_total = _quantize(tax_total)
+    total = _quantize(subtotal + tax_total)
+
+    payments: list[dict[str, Any]] = []
+    paid_amount = Decimal("0")
+    for payment in payload.payments or []:
+        amount = _quantize(Decimal(payment.amount))
+        payments.append({"method": payment.method, "amount": amount, "transaction_id": payment.transaction_id})
+        paid_amount += amount
+
+    paid_amount = _quantize(paid_amount)
+    change_amount = _quantize(paid_amount - total) if paid_amount >= total else _quantize(Decimal("0"))
+    status_value = OrderStatus.PAID if paid_amount >= total else OrderStatus.DRAFT
+
+    return PricedOrder(
+        subtotal=subtotal,
+        tax_total=tax_total,
+        total=total,
+        paid_amount=paid_amount,
+        change_amount=change_amount,
+        status=status_value,
+        items=order_items,
+        payments=payments,
+    )
+
+
+def best_of(func: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - began)
+    return min(timings)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baskets", type=int, default=20000)
+    parser.add_argument("--lines", type=int, default=5)
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    products = {
+        product_id: Product(
+            id=product_id, sku=f"SKU-{product_id}", name=f"Item {product_id}",
+            unit_price=Decimal(rng.randrange(100, 300_000)).scaleb(-2), tax_rate=Decimal(rng.choice(["8.00", "10.00"])),
+        )
+        for product_id in range(1, args.products + 1)
+    }
+    payloads = [
+        OrderCreate(
+            items=[{"product_id": product_id, "quantity": rng.randint(1, 3)}
+                   for product_id in rng.sample(list(products), args.lines)],
+            payments=[{"method": "cash", "amount": "10000.00"}, {"method": "card", "amount": "5000.00"}],
+        )
+        for _ in range(args.baskets)
+    ]
+    preconverted = [
+        [PriceLine(item.product_id, item.quantity, to_minor(products[item.product_id].unit_price),
+                   rate_to_basis_points(products[item.product_id].tax_rate)) for item in payload.items]
+        for payload in payloads
+    ]
+    for payload in payloads[:1000]:
+        assert legacy_price_order(payload, products) == price_order(payload, products)
+
+    legacy_s = best_of(lambda: [legacy_price_order(payload, products) for payload in payloads], args.repeat)
+    current_s = best_of(lambda: [price_order(payload, products) for payload in payloads], args.repeat)
+    engine_s = best_of(lambda: price_baskets(preconverted), args.repeat)
+    print(json.dumps({
+        "baskets": args.baskets,
+        "lines": args.lines,
+        "products": args.products,
+        "legacy_orders_per_s": round(args.baskets / legacy_s),
+        "price_order_orders_per_s": round(args.baskets / current_s),
+        "engine_baskets_per_s": round(args.baskets / engine_s),
+        "price_order_speedup": round(legacy_s / current_s, 2),
+        "engine_speedup": round(legacy_s / engine_s, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
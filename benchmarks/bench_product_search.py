@@ -0,0 +1,152 @@
+"""Time GET /products/by-sku/{sku} and GET /products/search on a seeded catalog of 200k SKUs.
+
+Product names are built from Japanese and English brand, item, flavour and
+size words, so the bigram posting lists are as skewed as a real catalog's
+("ml", "ボトル" and the like are in a large share of names). Each query is
+sent ``--repeat`` times through the ASGI app; p50/p95 are reported per kind.
+Search queries are run once beforehand so the posting-size cache is warm,
+as it is in a long-running worker.
+
+Usage: python -m benchmarks.bench_product_search [--products 200000] [--repeat 50]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+
+import httpx
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.db import get_db
+from app.main import app
+from app.models import Base, Product
+from app.services.catalog import catalog_cache
+from app.services.product_search import gram_counts, index_product_names, sku_cache
+
+SEED_CHUNK_SIZE = 10_000
+BRANDS = ["サントリー", "キリン", "アサヒ", "伊藤園", "明治", "森永", "カルビー", "日清", "ロッテ", "グリコ",
+          "Coca-Cola", "Pepsi", "Nestle", "Lipton", "Kagome", "ハウス", "味の素", "キッコーマン", "山崎", "雪印"]
+ITEMS = ["緑茶", "烏龍茶", "ほうじ茶", "麦茶", "コーヒー", "カフェラテ", "紅茶", "ミネラルウォーター", "炭酸水",
+         "オレンジジュース", "りんごジュース", "スポーツドリンク", "ヨーグルト", "牛乳", "ポテトチップス", "チョコレート",
+         "ガム", "カップラーメン", "焼きそば", "カレー", "おにぎり", "サンドイッチ", "プリン", "アイスクリーム",
+         "Green Tea", "Black Coffee", "Cola", "Lemon Soda", "Potato Chips", "Cookies"]
+FLAVOURS = ["", "無糖", "微糖", "ゼロ", "レモン", "ミルク", "抹茶", "いちご", "うすしお", "コンソメ", "醤油", "味噌",
+            "塩", "辛口", "甘口", "Light", "Original", "Premium", "季節限定", "特濃"]
+SIZES = ["350ml", "500ml", "1L", "2L", "185g", "60g", "90g", "1個", "6個入", "ペットボトル", "缶", "紙パック"]
+QUERIES = {
+    "sku_prefix": ["49000001", "4900000012", "4900000199999"],
+    "name_kanji": ["緑茶", "烏龍茶 500", "味噌"],
+    "name_katakana": ["コーヒー", "ヨーグルト", "ポテトチップス"],
+    "name_hiragana_input": ["こーひー", "いちご", "うすしお"],
+    "name_halfwidth_input": ["ｺｰﾋｰ", "ＣＯＬＡ"],
+    "name_ascii": ["coffee", "lemon soda", "premium"],
+    "name_one_char": ["茶", "塩"],
+    "name_rare_combination": ["プリン 季節限定", "牛乳 特濃 1l"],
+    "no_match": ["存在しない商品", "zzzz"],
+}
+
+
+def catalog(count: int) -> list[dict]:
+    rng = random.Random(0)
+    return [
+        {
+            "id": index,
+            "sku": f"49{index:011d}",
+            "name": " ".join(part for part in (rng.choice(BRANDS), rng.choice(ITEMS), rng.choice(FLAVOURS),
+                                               rng.choice(SIZES)) if part),
+            "unit_price": Decimal(rng.randrange(80, 3000)),
+            "tax_rate": Decimal("8.00"),
+        }
+        for index in range(1, count + 1)
+    ]
+
+
+def seed(session_factory: sessionmaker, products: list[dict]) -> float:
+    began = time.perf_counter()
+    with session_factory() as session:
+        for start in range(0, len(products), SEED_CHUNK_SIZE):
+            chunk = products[start : start + SEED_CHUNK_SIZE]
+            session.execute(insert(Product), chunk)
+            index_product_names(session, [(product["id"], product["name"]) for product in chunk])
+        session.commit()
+    return time.perf_counter() - began
+
+
+def summarise(timings: list[float]) -> dict[str, float]:
+    timings = sorted(timings)
+    return {"p50_ms": round(statistics.median(timings) * 1000, 3),
+            "p95_ms": round(timings[int(len(timings) * 0.95) - 1] * 1000, 3)}
+
+
+async def measure(products: list[dict], repeat: int) -> dict[str, dict]:
+    rng = random.Random(1)
+    results: dict[str, dict] = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def timed(url: str, params: dict | None = None) -> tuple[float, httpx.Response]:
+            began = time.perf_counter()
+            resp = await client.get(url, params=params)
+            elapsed = time.perf_counter() - began
+            assert resp.status_code in (200, 404), resp.text
+            return elapsed, resp
+
+        skus = [product["sku"] for product in rng.sample(products, repeat)]
+        cold = []
+        for sku in skus:
+            sku_cache.clear()
+            cold.append((await timed(f"/products/by-sku/{sku}"))[0])
+        results["by_sku_uncached"] = summarise(cold)
+        results["by_sku_cached"] = summarise([(await timed(f"/products/by-sku/{skus[0]}"))[0] for _ in range(repeat)])
+
+        for kind, queries in QUERIES.items():
+            timings = []
+            hits = []
+            for query in queries:
+                _, resp = await timed("/products/search", {"q": query})
+                hits.append(len(resp.json()))
+                for _ in range(repeat):
+                    timings.append((await timed("/products/search", {"q": query}))[0])
+            results[f"search_{kind}"] = {**summarise(timings), "results": hits}
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    db_path = Path(tempfile.mkdtemp()) / "bench_product_search.db"
+    engine = create_engine(f"sqlite+pysqlite:///{db_path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    products = catalog(args.products)
+    seed_seconds = seed(SessionLocal, products)
+
+    def override_get_db():
+        session = SessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    catalog_cache.clear()
+    gram_counts.clear()
+    try:
+        results = asyncio.run(measure(products, args.repeat))
+    finally:
+        app.dependency_overrides.clear()
+    print(json.dumps({"products": args.products, "seed_seconds": round(seed_seconds, 1), **results}, indent=2,
+                     ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Seed a year of orders and time GET /reports/sales style bucket queries.
+
+Usage: python -m benchmarks.bench_sales_report [--orders 1000000] [--db PATH]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app.models import Base, Order, OrderItem, OrderStatus, Payment, PaymentMethod, Product, SalesDimension, User
+from app.services.rollups import query_sales_buckets, rebuild_rollups
+
+SEED_CHUNK_SIZE = 20_000
+PRODUCT_COUNT = 200
+
+
+def seed(session: Session, order_count: int, start: datetime, rng: random.Random) -> None:
+    session.execute(insert(User), [{"id": 1, "email": "bench@example.com", "password_hash": "x"}])
+    prices = {product_id: Decimal(rng.randrange(100, 3000)) for product_id in range(1, PRODUCT_COUNT + 1)}
+    session.execute(
+        insert(Product),
+        [{"id": pid, "sku": f"SKU-{pid:05d}", "name": f"Item {pid}", "unit_price": price} for pid, price in prices.items()],
+    )
+    methods = list(PaymentMethod)
+    span = 365 * 24 * 3600
+    item_id = 0
+    for chunk_start in range(0, order_count, SEED_CHUNK_SIZE):
+        orders, items, payments = [], [], []
+        for order_id in range(chunk_start + 1, min(chunk_start + SEED_CHUNK_SIZE, order_count) + 1):
+            created_at = start + timedelta(seconds=span * order_id // order_count)
+            total = Decimal("0")
+            for product_id in rng.sample(range(1, PRODUCT_COUNT + 1), rng.randint(1, 3)):
+                item_id += 1
+                quantity = rng.randint(1, 3)
+                line_total = prices[product_id] * quantity
+                total += line_total
+                items.append(
+                    {
+                        "id": item_id,
+                        "order_id": order_id,
+                        "product_id": product_id,
+                        "quantity": quantity,
+                        "unit_price": prices[product_id],
+                        "line_total": line_total,
+                        "created_at": created_at,
+                    }
+                )
+            orders.append(
+                {
+                    "id": order_id,
+                    "order_no": f"BENCH-{order_id:08d}",
+                    "user_id": 1,
+                    "subtotal": total,
+                    "tax_total": Decimal("0"),
+                    "total": total,
+                    "paid_amount": total,
+                    "change_amount": Decimal("0"),
+                    "status": OrderStatus.PAID,
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                }
+            )
+            payments.append({"order_id": order_id, "method": rng.choice(methods), "amount": total, "created_at": created_at})
+        session.execute(insert(Order), orders)
+        session.execute(insert(OrderItem), items)
+        session.execute(insert(Payment), payments)
+        session.commit()
+
+
+def time_query(session: Session, start: datetime, end: datetime, granularity: str, dimension: SalesDimension, runs: int) -> dict:
+    samples = []
+    rows = 0
+    for _ in range(runs):
+        began = time.perf_counter()
+        rows = len(query_sales_buckets(session, start, end, granularity, dimension))
+        samples.append((time.perf_counter() - began) * 1000)
+    samples.sort()
+    return {
+        "granularity": granularity,
+        "group_by": str(dimension),
+        "rows": rows,
+        "p50_ms": round(statistics.median(samples), 2),
+        "max_ms": round(samples[-1], 2),
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--db", type=Path, default=None, help="SQLite file to (re)use; a temp file by default")
+    args = parser.parse_args(argv)
+
+    db_path = args.db or Path(tempfile.mkdtemp()) / "bench_sales.db"
+    fresh = not db_path.exists()
+    engine = create_engine(f"sqlite+pysqlite:///{db_path}")
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    end = start + timedelta(days=365)
+    result: dict = {"orders": args.orders, "db": str(db_path)}
+
+    with Session(engine) as session:
+        if fresh:
+            Base.metadata.create_all(engine)
+            began = time.perf_counter()
+            seed(session, args.orders, start, random.Random(42))
+            result["seed_s"] = round(time.perf_counter() - began, 1)
+            began = time.perf_counter()
+            rebuild_rollups(session)
+            session.commit()
+            result["rebuild_rollups_s"] = round(time.perf_counter() - began, 1)
+
+        result["queries"] = [
+            time_query(session, start, end, "day", SalesDimension.PAYMENT_METHOD, args.runs),
+            time_query(session, start, end, "day", SalesDimension.PRODUCT, args.runs),
+            time_query(session, end - timedelta(days=7), end, "hour", SalesDimension.PRODUCT, args.runs),
+            time_query(session, end - timedelta(days=1), end, "hour", SalesDimension.PAYMENT_METHOD, args.runs),
+        ]
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
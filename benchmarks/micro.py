@@ -0,0 +1,181 @@
+"""Micro-benchmarks for the per-request hot paths, with saved baselines and a regression check.
+
+Each case is timed in-process with ``timeit``: the loop count is calibrated
+to roughly 0.2 s, repeated, and the fastest repeat is kept as the per-call
+cost (the least noisy statistic on a shared machine). Baselines only compare
+meaningfully on the machine and Python that produced them; a mismatch is
+reported next to the results.
+
+Usage: python -m benchmarks.micro [--only price_order,...] [--repeat 7]
+       python -m benchmarks.micro --save benchmarks/baselines/micro.json
+       python -m benchmarks.micro --compare benchmarks/baselines/micro.json [--threshold 0.20]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+from collections.abc import Callable
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.deps.auth import clear_auth_caches, get_current_user
+from app.models import Base, Order, OrderItem, OrderStatus, Payment, PaymentMethod, Product, User
+from app.routes.orders import price_order
+from app.routes.products import product_list_adapter
+from app.schemas.order import OrderCreate, OrderRead
+from app.utils.security import create_access_token, verify_token
+
+DEFAULT_BASELINE = Path(__file__).with_name("baselines") / "micro.json"
+DEFAULT_THRESHOLD = 0.20
+CATALOG_SIZE = 200
+ORDER_LINES = 5
+
+
+def _products(count: int) -> list[Product]:
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        Product(
+            id=index, sku=f"SKU-{index:05d}", name=f"Item {index}", description=None,
+            unit_price=Decimal(f"{100 + index * 7}.50"), tax_rate=Decimal("8.00") if index % 3 else Decimal("10.00"),
+            is_active=True, created_at=now, updated_at=now,
+        )
+        for index in range(1, count + 1)
+    ]
+
+
+def _order_payload() -> OrderCreate:
+    return OrderCreate(
+        items=[{"product_id": index, "quantity": index % 3 + 1} for index in range(1, ORDER_LINES + 1)],
+        payments=[{"method": "card", "amount": "1500.00"}, {"method": "cash", "amount": "2000.00"}],
+    )
+
+
+def _order(products: dict[int, Product]) -> Order:
+    priced = price_order(_order_payload(), products)
+    now = datetime(2026, 1, 1, 12, tzinfo=timezone.utc)
+    return Order(
+        id=1, order_no="20260101120000-000000001", user_id=1, memo=None, created_at=now, updated_at=now,
+        items=[OrderItem(id=index, **line) for index, line in enumerate(priced.items, 1)],
+        payments=[Payment(id=index, created_at=now, **payment) for index, payment in enumerate(priced.payments, 1)],
+        **priced.order_values(),
+    )
+
+
+def build_cases() -> tuple[dict[str, Callable[[], object]], Callable[[], None]]:
+    """Return the benchmark callables and a cleanup hook."""
+
+    catalog = _products(CATALOG_SIZE)
+    products = {product.id: product for product in catalog[:ORDER_LINES]}
+    payload = _order_payload()
+    order = _order(products)
+    assert order.status == OrderStatus.PAID and order.payments[0].method == PaymentMethod.CARD
+
+    engine = create_engine("sqlite+pysqlite:///:memory:", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = Session(engine)
+    user = User(email="bench@example.com", password_hash="x")
+    session.add(user)
+    session.commit()
+    token = create_access_token(user.id, 30)
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    def current_user_cold() -> User:
+        # Token cache, user cache and identity map all empty: verify + one primary key SELECT.
+        clear_auth_caches()
+        session.expunge_all()
+        return get_current_user(credentials, session)
+
+    def cleanup() -> None:
+        session.close()
+        engine.dispose()
+        clear_auth_caches()
+
+    cases: dict[str, Callable[[], object]] = {
+        "price_order": lambda: price_order(payload, products),
+        "order_read_validate": lambda: OrderRead.model_validate(order),
+        "order_read_json": lambda: OrderRead.model_validate(order).model_dump_json(),
+        "product_list_validate": lambda: product_list_adapter.validate_python(catalog, from_attributes=True),
+        "create_access_token": lambda: create_access_token(1, 30),
+        "verify_token": lambda: verify_token(token),
+        "get_current_user_cached": lambda: get_current_user(credentials, session),
+        "get_current_user_cold": current_user_cold,
+    }
+    return cases, cleanup
+
+
+def measure(func: Callable[[], object], repeat: int) -> dict[str, float]:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    number = max(1, number)
+    runs = [elapsed / number * 1e6 for elapsed in timer.repeat(repeat=repeat, number=number)]
+    return {"best_us": round(min(runs), 3), "median_us": round(statistics.median(runs), 3), "loops": number}
+
+
+def environment() -> dict[str, object]:
+    return {"python": platform.python_version(), "machine": platform.machine(), "system": platform.system(),
+            "cpu_count": os.cpu_count()}
+
+
+def compare(results: dict[str, dict], baseline: dict, threshold: float) -> list[dict]:
+    rows = []
+    for name, current in results.items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            rows.append({"name": name, "status": "new", "best_us": current["best_us"]})
+            continue
+        change = current["best_us"] / previous["best_us"] - 1
+        status = "regressed" if change > threshold else "improved" if change < -threshold else "ok"
+        rows.append({"name": name, "status": status, "baseline_us": previous["best_us"],
+                     "best_us": current["best_us"], "change": round(change, 3)})
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", help="comma-separated case names")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--save", type=Path, nargs="?", const=DEFAULT_BASELINE, help="write results as a baseline")
+    parser.add_argument("--compare", type=Path, nargs="?", const=DEFAULT_BASELINE, help="baseline to check against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="fractional slowdown of best_us that counts as a regression")
+    args = parser.parse_args(argv)
+
+    cases, cleanup = build_cases()
+    selected = args.only.split(",") if args.only else list(cases)
+    unknown = set(selected) - cases.keys()
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(sorted(unknown))}")
+    try:
+        results = {name: measure(cases[name], args.repeat) for name in selected}
+    finally:
+        cleanup()
+
+    report: dict[str, object] = {"environment": environment(), "results": results}
+    exit_code = 0
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        rows = compare(results, baseline, args.threshold)
+        report["comparison"] = {"baseline": str(args.compare), "threshold": args.threshold,
+                                "same_environment": baseline.get("environment") == environment(), "cases": rows}
+        exit_code = 1 if any(row["status"] == "regressed" for row in rows) else 0
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps({"environment": environment(), "results": results}, indent=2) + "\n",
+                             encoding="utf-8")
+    print(json.dumps(report, indent=2))
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,19 @@
+"""Gunicorn hooks; gunicorn loads ./gunicorn.conf.py automatically."""
+
+import os
+import shutil
+
+
+def on_starting(server):  # noqa: ANN001, ANN201
+    # Samples of workers from a previous run would otherwise be summed into /metrics.
+    directory = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+
+
+def child_exit(server, worker):  # noqa: ANN001, ANN201
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
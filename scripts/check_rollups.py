@@ -0,0 +1,43 @@
+"""Recompute daily sales rollups and sales buckets from raw orders and report any drift.
+
+Usage: python -m scripts.check_rollups [--repair]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+
+from app.db import SessionLocal
+from app.services.rollups import find_bucket_drift, find_rollup_drift, rebuild_rollups
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repair", action="store_true", help="rewrite all rollups from raw rows when drift is found")
+    args = parser.parse_args(argv)
+
+    with SessionLocal() as db:
+        drift = find_rollup_drift(db)
+        for entry in drift:
+            print(
+                f"{entry.business_day}: "
+                f"orders {entry.actual.order_count} != {entry.expected.order_count}, "
+                f"revenue {entry.actual.revenue_total} != {entry.expected.revenue_total}, "
+                f"payments {entry.actual.payment_total} != {entry.expected.payment_total}"
+            )
+        bucket_drift = find_bucket_drift(db)
+        for granularity, dimension, bucket_start, key in bucket_drift:
+            print(f"{granularity} bucket {dimension}/{key} @ {bucket_start.isoformat()} differs from raw rows")
+        if not drift and not bucket_drift:
+            print("rollups consistent")
+            return 0
+        if args.repair:
+            days = rebuild_rollups(db)
+            db.commit()
+            print(f"repaired: rebuilt {days} day(s)")
+            return 0
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
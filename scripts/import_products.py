@@ -0,0 +1,37 @@
+"""Upsert products by SKU from a CSV or NDJSON file, in batched transactions.
+
+Usage: python -m scripts.import_products FILE [--format csv|ndjson] [--chunk-size 1000] [--report errors.json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from dataclasses import asdict
+from pathlib import Path
+
+from app.db import SessionLocal
+from app.services.catalog_import import import_products, iter_records
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("file", type=Path)
+    parser.add_argument("--format", choices=("csv", "ndjson"), help="default: from the file extension")
+    parser.add_argument("--chunk-size", type=int, help="rows per transaction (default: IMPORT_CHUNK_SIZE)")
+    parser.add_argument("--report", type=Path, help="write the full report, with row errors, as JSON")
+    args = parser.parse_args(argv)
+    file_format = args.format or ("ndjson" if args.file.suffix.lower() in (".ndjson", ".jsonl") else "csv")
+
+    with args.file.open("rb") as stream, SessionLocal() as db:
+        report = import_products(db, iter_records(stream, file_format), chunk_size=args.chunk_size)
+    print(f"{report.rows} row(s): {report.created} created, {report.updated} updated, {report.failed} failed")
+    for error in report.errors[:20]:
+        print(f"  row {error.row} ({error.sku or '-'}): {'; '.join(error.errors)}", file=sys.stderr)
+    if args.report:
+        args.report.write_text(json.dumps(asdict(report), ensure_ascii=False, indent=2), encoding="utf-8")
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,288 @@
+"""Drive a realistic POS traffic mix against the API and report per-endpoint latency percentiles as JSON.
+
+Clerks are seeded through the models (a fresh run prefix each time, nothing
+is deleted), then every virtual clerk logs in and loops over catalog polls,
+checkouts and report polls until the duration is up. Without --base-url a
+local uvicorn is started on a scratch SQLite file; pass --database-url to
+seed and serve a local MySQL stand-in instead. Keep the JSON of each run to
+compare commits.
+
+Usage: python -m scripts.loadtest [--duration 30] [--clerks 20] [--workers 1] [--output run.json]
+       python -m scripts.loadtest --base-url http://127.0.0.1:8000 --database-url mysql+pymysql://...
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from decimal import ROUND_UP, Decimal
+from pathlib import Path
+from typing import Iterator
+
+import httpx
+
+PASSWORD = "loadtest-secret"
+# Relative frequency of each clerk action; a checkout dominates like on a till.
+SCENARIO_WEIGHTS = {"catalog": 3, "checkout": 5, "summary_report": 1, "sales_report": 1, "login": 0.2}
+MAX_LINES = 5
+READY_TIMEOUT_SECONDS = 30.0
+
+
+@dataclass
+class Seeded:
+    emails: list[str]
+    products: list[tuple[int, Decimal, Decimal]]
+
+
+@dataclass
+class EndpointStats:
+    latencies_ms: list[float] = field(default_factory=list)
+    statuses: dict[int, int] = field(default_factory=lambda: defaultdict(int))
+    errors: int = 0
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 2)
+
+
+def seed(database_url: str, clerks: int, product_count: int) -> Seeded:
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.models import Base, Product, User, UserRole
+    from app.utils.security import hash_password
+
+    run = uuid.uuid4().hex[:8]
+    rng = random.Random(run)
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    password_hash = hash_password(PASSWORD)
+    with sessionmaker(bind=engine, expire_on_commit=False)() as session:
+        users = [
+            User(email=f"load-{run}-{i}@example.com", password_hash=password_hash, role=UserRole.CLERK)
+            for i in range(clerks)
+        ]
+        products = [
+            Product(
+                sku=f"LOAD-{run}-{i:04d}",
+                name=f"Load item {i}",
+                unit_price=Decimal(rng.randrange(100, 3000, 10)),
+                tax_rate=Decimal("8.00") if i % 3 else Decimal("10.00"),
+            )
+            for i in range(product_count)
+        ]
+        session.add_all([*users, *products])
+        session.commit()
+        seeded = Seeded(
+            emails=[user.email for user in users],
+            products=[(product.id, product.unit_price, product.tax_rate) for product in products],
+        )
+    engine.dispose()
+    return seeded
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def local_server(database_url: str, workers: int) -> Iterator[str]:
+    port = _free_port()
+    env = {**os.environ, "DATABASE_URL": database_url}
+    command = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+               "--workers", str(workers), "--log-level", "warning", "--no-access-log"]
+    process = subprocess.Popen(command, env=env)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + READY_TIMEOUT_SECONDS
+        while True:
+            try:
+                if httpx.get(f"{base_url}/healthz", timeout=1.0).status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            if process.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError("uvicorn did not become ready")
+            time.sleep(0.2)
+        yield base_url
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def checkout_body(rng: random.Random, products: list[tuple[int, Decimal, Decimal]]) -> dict:
+    lines = rng.sample(products, rng.randint(1, min(MAX_LINES, len(products))))
+    items = [{"product_id": product_id, "quantity": rng.randint(1, 3)} for product_id, _, _ in lines]
+    # Over-estimate the total so the order is always paid; the server computes the change.
+    estimate = sum(
+        price * item["quantity"] * (1 + rate / 100) for (_, price, rate), item in zip(lines, items)
+    ).quantize(Decimal("100"), rounding=ROUND_UP) + 100
+    if rng.random() < 0.5:
+        return {"items": items, "payments": [{"method": "cash", "amount": str(estimate)}]}
+    card = (estimate / 2).quantize(Decimal("1"))
+    return {
+        "items": items,
+        "payments": [{"method": "card", "amount": str(card)}, {"method": "cash", "amount": str(estimate - card)}],
+    }
+
+
+class Clerk:
+    def __init__(self, client: httpx.AsyncClient, email: str, seeded: Seeded, stats: dict[str, EndpointStats],
+                 rng: random.Random) -> None:
+        self.client = client
+        self.email = email
+        self.seeded = seeded
+        self.stats = stats
+        self.rng = rng
+        self.headers: dict[str, str] = {}
+        self.catalog_etag: str | None = None
+
+    async def request(self, name: str, method: str, url: str, **kwargs) -> httpx.Response | None:
+        began = time.perf_counter()
+        entry = self.stats[name]
+        try:
+            resp = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            entry.errors += 1
+            return None
+        entry.latencies_ms.append((time.perf_counter() - began) * 1000)
+        entry.statuses[resp.status_code] += 1
+        if resp.status_code >= 400:
+            entry.errors += 1
+        return resp
+
+    async def login(self) -> None:
+        resp = await self.request("login", "POST", "/auth/login", json={"email": self.email, "password": PASSWORD})
+        if resp is not None and resp.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+    async def catalog(self) -> None:
+        headers = {"If-None-Match": self.catalog_etag} if self.catalog_etag else {}
+        resp = await self.request("catalog", "GET", "/products/", headers=headers)
+        if resp is not None and resp.status_code == 200:
+            self.catalog_etag = resp.headers.get("ETag")
+
+    async def checkout(self) -> None:
+        await self.request(
+            "checkout", "POST", "/orders/", headers=self.headers, json=checkout_body(self.rng, self.seeded.products)
+        )
+
+    async def summary_report(self) -> None:
+        await self.request("summary_report", "GET", "/reports/")
+
+    async def sales_report(self) -> None:
+        end = datetime.now(timezone.utc) + timedelta(hours=1)
+        params = {"from": (end - timedelta(days=1)).isoformat(), "to": end.isoformat(), "granularity": "hour"}
+        await self.request("sales_report", "GET", "/reports/sales", params=params)
+
+    async def run(self, until: float) -> None:
+        await self.login()
+        names = list(SCENARIO_WEIGHTS)
+        weights = list(SCENARIO_WEIGHTS.values())
+        while time.monotonic() < until:
+            await getattr(self, self.rng.choices(names, weights)[0])()
+
+
+async def drive(base_url: str, seeded: Seeded, duration: float, warmup: float, seed_value: int) -> dict:
+    limits = httpx.Limits(max_connections=len(seeded.emails), max_keepalive_connections=len(seeded.emails))
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        if warmup:
+            warm_stats: dict[str, EndpointStats] = defaultdict(EndpointStats)
+            until = time.monotonic() + warmup
+            await asyncio.gather(*(
+                Clerk(client, email, seeded, warm_stats, random.Random(seed_value + i)).run(until)
+                for i, email in enumerate(seeded.emails)
+            ))
+
+        stats: dict[str, EndpointStats] = defaultdict(EndpointStats)
+        began = time.monotonic()
+        await asyncio.gather(*(
+            Clerk(client, email, seeded, stats, random.Random(seed_value + len(seeded.emails) + i)).run(began + duration)
+            for i, email in enumerate(seeded.emails)
+        ))
+        elapsed = time.monotonic() - began
+
+    endpoints = {}
+    for name in sorted(stats):
+        entry = stats[name]
+        samples = entry.latencies_ms or [0.0]
+        endpoints[name] = {
+            "requests": len(entry.latencies_ms),
+            "throughput_rps": round(len(entry.latencies_ms) / elapsed, 1),
+            "p50_ms": percentile(samples, 0.50),
+            "p95_ms": percentile(samples, 0.95),
+            "p99_ms": percentile(samples, 0.99),
+            "max_ms": round(max(samples), 2),
+            "errors": entry.errors,
+            "statuses": dict(sorted(entry.statuses.items())),
+        }
+    total = sum(endpoint["requests"] for endpoint in endpoints.values())
+    return {"elapsed_s": round(elapsed, 2), "requests": total, "throughput_rps": round(total / elapsed, 1),
+            "endpoints": endpoints}
+
+
+def git_commit() -> str | None:
+    try:
+        completed = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="unmeasured seconds before the run")
+    parser.add_argument("--clerks", type=int, default=20, help="concurrent virtual clerks")
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the local server")
+    parser.add_argument("--base-url", help="target an already running server instead of starting one")
+    parser.add_argument("--database-url", help="sync SQLAlchemy URL to seed (and serve, without --base-url)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the traffic mix")
+    parser.add_argument("--output", type=Path, help="also write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    if args.base_url and not args.database_url:
+        parser.error("--base-url needs --database-url so clerks and products can be seeded")
+    database_url = args.database_url or f"sqlite+pysqlite:///{Path(tempfile.mkdtemp()) / 'loadtest.db'}"
+    seeded = seed(database_url, args.clerks, args.products)
+    started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    if args.base_url:
+        result = asyncio.run(drive(args.base_url, seeded, args.duration, args.warmup, args.seed))
+    else:
+        with local_server(database_url, args.workers) as base_url:
+            result = asyncio.run(drive(base_url, seeded, args.duration, args.warmup, args.seed))
+
+    report = {
+        "commit": git_commit(),
+        "started_at": started_at,
+        "config": {"duration_s": args.duration, "clerks": args.clerks, "products": args.products,
+                   "workers": None if args.base_url else args.workers, "database": database_url.split(":", 1)[0],
+                   "mix": SCENARIO_WEIGHTS},
+        **result,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
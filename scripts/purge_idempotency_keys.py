@@ -0,0 +1,26 @@
+"""Delete Idempotency-Key rows older than IDEMPOTENCY_KEY_TTL_HOURS in small batches.
+
+Usage: python -m scripts.purge_idempotency_keys [--batch-size 1000]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+
+from app.db import SessionLocal
+from app.services.idempotency import PURGE_BATCH_SIZE, purge_expired_keys
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=PURGE_BATCH_SIZE, help="rows deleted per transaction")
+    args = parser.parse_args(argv)
+
+    with SessionLocal() as db:
+        purged = purge_expired_keys(db, batch_size=args.batch_size)
+    print(f"purged {purged} idempotency key(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,11 +10,26 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.db import Base, get_db
+from app.deps.auth import clear_auth_caches
 from app.main import app
+from app.services.catalog import catalog_cache
+from app.services.idempotency import response_cache as idempotent_responses
+from app.services.product_search import gram_counts, sku_cache
+from app.utils.sql_stats import guard, instrument_engine
 
 os.environ.setdefault("DATABASE_URL", "sqlite+pysqlite:///:memory:")
 
 
+# Any endpoint running one statement more often than this in a single request fails its test.
+SQL_REPEAT_LIMIT = 10
+
+
+@pytest.fixture(autouse=True)
+def strict_query_guard(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(guard, "repeat_limit", SQL_REPEAT_LIMIT)
+    monkeypatch.setattr(guard, "strict", True)
+
+
 @pytest.fixture()
 def client_and_session() -> Iterator[tuple[TestClient, sessionmaker]]:
     engine = create_engine(
@@ -22,6 +37,7 @@ def client_and_session() -> Iterator[tuple[TestClient, sessionmaker]]:
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
+    instrument_engine(engine)
     TestingSessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)
     Base.metadata.create_all(engine)
 
@@ -33,6 +49,11 @@ def client_and_session() -> Iterator[tuple[TestClient, sessionmaker]]:
             session.close()
 
     app.dependency_overrides[get_db] = override_get_db
+    catalog_cache.clear()
+    idempotent_responses.clear()
+    sku_cache.clear()
+    gram_counts.clear()
+    clear_auth_caches()
 
     with TestClient(app) as client:
         yield client, TestingSessionLocal
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Iterator
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db import Base, get_async_db
+from app.deps.auth import clear_auth_caches
+from app.models import Product, User, UserRole
+from app.routes import orders, products, reports
+from app.services.catalog import catalog_cache
+from app.utils.security import create_access_token, hash_password
+
+try:  # pragma: no cover
+    from fastapi.testclient import TestClient
+except ImportError:  # pragma: no cover
+    TestClient = object  # type: ignore
+
+
+@pytest.fixture()
+def async_client(tmp_path: Path) -> Iterator[tuple["TestClient", dict[str, str], int]]:
+    """Serve the async handlers directly, independent of the DATABASE_MODE chosen at import."""
+
+    database = tmp_path / "pos.db"
+    sync_engine = create_engine(f"sqlite+pysqlite:///{database}")
+    Base.metadata.create_all(sync_engine)
+    with sync_engine.begin() as connection:
+        user_id = connection.execute(
+            User.__table__.insert().values(
+                email="clerk@example.com", password_hash=hash_password("secret"), role=UserRole.CLERK
+            )
+        ).inserted_primary_key[0]
+        product_id = connection.execute(
+            Product.__table__.insert().values(
+                sku="SKU-001", name="Coffee", unit_price=Decimal("300.00"), tax_rate=Decimal("8.00"), is_active=True
+            )
+        ).inserted_primary_key[0]
+    sync_engine.dispose()
+
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{database}")
+    factory = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db() -> AsyncIterator:
+        async with factory() as session:
+            yield session
+
+    app = FastAPI()
+    app.get("/products")(products.list_products_async)
+    app.post("/orders", status_code=201)(orders.create_order_async)
+    app.get("/reports")(reports.get_summary_report_async)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    catalog_cache.clear()
+    clear_auth_caches()
+
+    headers = {"Authorization": f"Bearer {create_access_token(user_id, 5)}"}
+    with TestClient(app) as client:
+        yield client, headers, product_id
+        client.portal.call(async_engine.dispose)
+
+
+def test_async_handlers_share_the_sync_logic(async_client: tuple["TestClient", dict[str, str], int]) -> None:
+    client, headers, product_id = async_client
+
+    listed = client.get("/products")
+    assert listed.status_code == 200, listed.text
+    assert [product["sku"] for product in listed.json()] == ["SKU-001"]
+    assert client.get("/products", headers={"If-None-Match": listed.headers["ETag"]}).status_code == 304
+
+    created = client.post(
+        "/orders",
+        headers=headers,
+        json={"items": [{"product_id": product_id, "quantity": 2}], "payments": [{"amount": "1000.00"}]},
+    )
+    assert created.status_code == 201, created.text
+    body = created.json()
+    assert Decimal(body["total"]) == Decimal("648.00")
+    assert len(body["items"]) == 1 and len(body["payments"]) == 1
+
+    missing = client.post("/orders", headers=headers, json={"items": [{"product_id": 999, "quantity": 1}]})
+    assert missing.status_code == 404
+
+    summary = client.get("/reports").json()
+    assert summary["total_orders"] == 1
+    assert Decimal(summary["total_payments"]) == Decimal("1000.00")
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import threading
+from decimal import Decimal
+from typing import Tuple
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Product, User, UserRole
+from app.utils.security import (
+    PasswordHashPool,
+    PasswordPoolBusy,
+    dummy_password_hash,
+    get_password_pool,
+    hash_password,
+    needs_rehash,
+    verify_password,
+)
+
+ClientAndSession = Tuple["TestClient", sessionmaker]
+
+try:  # pragma: no cover
+    from fastapi.testclient import TestClient
+except ImportError:  # pragma: no cover
+    TestClient = object  # type: ignore
+
+
+def _login(client: "TestClient", session_factory: sessionmaker, role: UserRole) -> tuple[int, dict[str, str]]:
+    with session_factory() as session:  # type: ignore[call-arg]
+        user = User(email="staff@example.com", password_hash=hash_password("secret"), role=role)
+        session.add(user)
+        session.commit()
+        user_id = user.id
+    resp = client.post("/auth/login", json={"email": "staff@example.com", "password": "secret"})
+    assert resp.status_code == 200, resp.text
+    return user_id, {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def test_repeated_requests_reuse_cached_token_and_user(client_and_session: ClientAndSession) -> None:
+    client, session_factory = client_and_session
+    _, headers = _login(client, session_factory, UserRole.ADMIN)
+
+    user_lookups: list[str] = []
+    engine = session_factory.kw["bind"]
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+        if "FROM users" in statement:
+            user_lookups.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    for _ in range(5):
+        assert client.get("/internal/auth-cache", headers=headers).status_code == 200
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    assert len(user_lookups) == 1
+    stats = client.get("/internal/auth-cache", headers=headers).json()
+    assert stats["token"]["hits"] == 5
+    assert stats["user"]["hits"] == 5
+    assert stats["user"]["misses"] == 1
+
+
+def test_role_change_invalidates_cached_user(client_and_session: ClientAndSession) -> None:
+    client, session_factory = client_and_session
+    user_id, headers = _login(client, session_factory, UserRole.ADMIN)
+    assert client.get("/internal/auth-cache", headers=headers).status_code == 200
+
+    with session_factory() as session:  # type: ignore[call-arg]
+        session.get(User, user_id).role = UserRole.CLERK
+        session.commit()
+
+    assert client.get("/internal/auth-cache", headers=headers).status_code == 403
+
+
+def test_legacy_sha256_hash_is_upgraded_on_login(client_and_session: ClientAndSession) -> None:
+    client, session_factory = client_and_session
+    legacy_hash = hashlib.sha256(b"secret").hexdigest()
+    with session_factory() as session:  # type: ignore[call-arg]
+        user = User(email="legacy@example.com", password_hash=legacy_hash, role=UserRole.CLERK)
+        session.add(user)
+        session.commit()
+        user_id = user.id
+
+    assert client.post("/auth/login", json={"email": "legacy@example.com", "password": "wrong"}).status_code == 401
+    resp = client.post("/auth/login", json={"email": "legacy@example.com", "password": "secret"})
+    assert resp.status_code == 200, resp.text
+
+    with session_factory() as session:  # type: ignore[call-arg]
+        stored = session.get(User, user_id).password_hash
+    assert stored.startswith("scrypt$")
+    assert not needs_rehash(stored)
+    assert verify_password("secret", stored)
+    assert client.post("/auth/login", json={"email": "legacy@example.com", "password": "secret"}).status_code == 200
+
+
+def test_unknown_email_still_verifies_a_password_hash(
+    client_and_session: ClientAndSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    client, _ = client_and_session
+    pool = get_password_pool()
+    verified: list[str] = []
+    real_verify = pool.verify
+
+    async def spy(password: str, password_hash: str) -> bool:
+        verified.append(password_hash)
+        return await real_verify(password, password_hash)
+
+    monkeypatch.setattr(pool, "verify", spy)
+    resp = client.post("/auth/login", json={"email": "nobody@example.com", "password": "secret"})
+
+    assert resp.status_code == 401
+    assert resp.json()["detail"] == "Invalid credentials"
+    assert verified == [dummy_password_hash()]
+    assert verified[0].startswith("scrypt$") and not needs_rehash(verified[0])
+
+
+def test_password_pool_rejects_work_beyond_queue_depth() -> None:
+    pool = PasswordHashPool(size=1, queue_depth=0)
+    release = threading.Event()
+
+    async def scenario() -> None:
+        blocked = asyncio.ensure_future(pool._run(release.wait))
+        await asyncio.sleep(0)
+        with pytest.raises(PasswordPoolBusy):
+            await pool.verify("secret", hash_password("secret"))
+        release.set()
+        assert await blocked is True
+        assert await pool.verify("secret", hash_password("secret")) is True
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+def test_cached_user_survives_a_rolled_back_request(client_and_session: ClientAndSession) -> None:
+    client, session_factory = client_and_session
+    _, headers = _login(client, session_factory, UserRole.ADMIN)
+    with session_factory() as session:  # type: ignore[call-arg]
+        product = Product(sku="LAST-1", name="Last one", unit_price=Decimal("100.00"), stock=1)
+        session.add(product)
+        session.commit()
+        product_id = product.id
+
+    # The 409 rolls back the session that loaded (and cached) the user.
+    oversell = client.post("/orders", headers=headers, json={"items": [{"product_id": product_id, "quantity": 3}]})
+    assert oversell.status_code == 409, oversell.text
+    resp = client.post("/orders", headers=headers, json={"items": [{"product_id": product_id, "quantity": 1}]})
+    assert resp.status_code == 201, resp.text
+    assert client.get("/internal/auth-cache", headers=headers).status_code == 200
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import io
+import json
+from decimal import Decimal
+from typing import Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Product, User, UserRole
+from app.services.catalog_import import import_products, iter_records
+from app.utils.security import hash_password
+
+ClientAndSession = Tuple["TestClient", sessionmaker]
+
+try:  # pragma: no cover
+    from fastapi.testclient import TestClient
+except ImportError:  # pragma: no cover
+    TestClient = object  # type: ignore
+
+
+def _auth_headers(client: "TestClient", session_factory: sessionmaker) -> dict[str, str]:
+    with session_factory() as session:  # type: ignore[call-arg]
+        session.add(User(email="admin@example.com", password_hash=hash_password("secret"), role=UserRole.ADMIN))
+        session.commit()
+    resp = client.post("/auth/login", json={"email": "admin@example.com", "password": "secret"})
+    assert resp.status_code == 200, resp.text
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def _products(session_factory: sessionmaker) -> dict[str, Product]:
+    with session_factory() as session:  # type: ignore[call-arg]
+        return {product.sku: product for product in session.scalars(select(Product))}
+
+
+def test_csv_import_upserts_by_sku_and_reports_bad_rows(client_and_session: ClientAndSession) -> None:
+    client, session_factory = client_and_session
+    headers = _auth_headers(client, session_factory)
+    created = client.post("/products", headers=headers, json={"sku": "SKU-1", "name": "Old name", "unit_price": "50.00", "stock": 7})
+    assert created.status_code == 201, created.text
+
+    body = (
+        "sku,name,unit_price,tax_rate\n"
+        "SKU-1,お茶 500ml,140.00,8\n"
+        "SKU-2,Coffee,-1,10\n"
+        "SKU-3,Cola,160.00,\n"
+        ",No SKU,10.00,10\n"
+        "SKU-4,Too,many,fields,here\n"
+        "SKU-3,Cola Zero,170.00,10\n"
+    ).encode("utf-8-sig")
+    resp = client.post("/products/import", headers=headers, content=body, params={"format": "csv"})
+    assert resp.status_code == 200, resp.text
+    report = resp.json()
+    assert {key: report[key] for key in ("rows", "created", "updated", "failed")} == {
+        "rows": 6, "created": 1, "updated": 1, "failed": 3,
+    }
+    assert [(error["row"], error["sku"]) for error in report["errors"]] == [(2, "SKU-2"), (4, None), (5, None)]
+    assert report["errors"][0]["errors"] == ["unit_price: Input should be greater than 0"]
+    assert report["errors"][2]["errors"] == ["more fields than the header"]
+    assert report["errors_truncated"] is False
+
+    products = _products(session_factory)
+    assert sorted(products) == ["SKU-1", "SKU-3"]
+    assert (products["SKU-1"].name, products["SKU-1"].unit_price, products["SKU-1"].tax_rate) == (
+        "お茶 500ml", Decimal("140.00"), Decimal("8.00"),
+    )
+    assert products["SKU-1"].stock == 7  # columns missing from the file are left alone
+    assert products["SKU-3"].name == "Cola Zero"  # the last row for a SKU wins
+
+    # Imported names are searchable and the catalog cache sees the new rows.
+    assert [product["sku"] for product in client.get("/products/search", params={"q": "おちゃ"}).json()] == []
+    assert [product["sku"] for product in client.get("/products/search", params={"q": "お茶"}).json()] == ["SKU-1"]
+    assert [product["sku"] for product in client.get("/products").json()] == ["SKU-1", "SKU-3"]
+
+
+def test_ndjson_import_commits_in_chunks_with_multi_row_upserts(client_and_session: ClientAndSession) -> None:
+    _, session_factory = client_and_session
+    lines = [json.dumps({"sku": f"SKU-{index:03d}", "name": f"Item {index}", "unit_price": "10.00"}) for index in range(25)]
+    lines[3] = "{not json"
+    lines[4] = "[1, 2]"
+    lines.insert(10, "")
+    stream = io.BytesIO("\n".join(lines).encode("utf-8"))
+
+    statements: list[str] = []
+    engine = session_factory.kw["bind"]
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    with session_factory() as session:  # type: ignore[call-arg]
+        report = import_products(session, iter_records(stream, "ndjson"), chunk_size=10)
+
+    assert (report.rows, report.created, report.updated, report.failed) == (25, 23, 0, 2)
+    assert [(error.row, error.errors[0].split(":")[0]) for error in report.errors] == [
+        (4, "invalid JSON"), (5, "expected a JSON object"),
+    ]
+    upserts = [statement for statement in statements if statement.startswith("INSERT INTO products")]
+    assert len(upserts) == 3 and all("ON CONFLICT (sku) DO UPDATE" in statement for statement in upserts)
+    assert len(_products(session_factory)) == 23
+
+
+def test_import_requires_authentication(client_and_session: ClientAndSession) -> None:
+    client, _ = client_and_session
+    resp = client.post("/products/import", content=b"sku,name,unit_price\nSKU-1,Tea,1.00\n")
+    assert resp.status_code == 401
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Tuple
+
+import pytest
+from sqlalchemy import create_engine, exc
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from app.models import User, UserRole
+from app.utils.db_pool import PoolStats, timed_pool_class
+from app.utils.security import hash_password
+
+ClientAndSession = Tuple["TestClient", sessionmaker]
+
+try:  # pragma: no cover
+    from fastapi.testclient import TestClient
+except ImportError:  # pragma: no cover
+    TestClient = object  # type: ignore
+
+
+def test_pool_stats_track_occupancy_and_exhaustion(tmp_path: Path) -> None:
+    stats = PoolStats()
+    engine = create_engine(
+        f"sqlite+pysqlite:///{tmp_path / 'pool.db'}",
+        poolclass=timed_pool_class(QueuePool, stats),
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+        pool_pre_ping=True,
+    )
+    stats.attach(engine)
+
+    held = engine.connect()
+    busy = stats.snapshot()
+    assert busy["pool"] == "TimedQueuePool"
+    assert busy["checked_out"] == 1 and busy["connects"] == 1
+
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    held.close()
+    with engine.connect():
+        pass
+    engine.dispose()
+
+    final = stats.snapshot()
+    assert final["checkouts"] == 2
+    assert final["checkout_timeouts"] == 1
+    assert final["wait_ms_max"] >= 50
+    assert final["disconnects"] == 1
+    assert final["checked_out"] == 0
+
+
+def test_db_pool_endpoint_requires_admin(client_and_session: ClientAndSession) -> None:
+    client, session_factory = client_and_session
+    with session_factory() as session:  # type: ignore[call-arg]
+        session.add(User(email="admin@example.com", password_hash=hash_password("secret"), role=UserRole.ADMIN))
+        session.commit()
+    token = client.post("/auth/login", json={"email": "admin@example.com", "password": "secret"}).json()["access_token"]
+
+    assert client.get("/internal/db-pool").status_code == 401
+    resp = client.get("/internal/db-pool", headers={"Authorization": f"Bearer {token}"})
+    assert resp.status_code == 200
+    assert {"connects", "checkouts", "pre_ping_failures", "wait_ms_max"} <= resp.json()["sync"].keys()
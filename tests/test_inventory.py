@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from pathlib import Path
+from typing import Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base, OrderItem, Product, User, UserRole
+from app.routes.orders import place_order
+from app.schemas.order import OrderCreate
+from app.utils.security import hash_password
+
+ClientAndSession = Tuple["TestClient", sessionmaker]
+
+try:  # pragma: no cover
+    from fastapi.testclient import TestClient
+except ImportError:  # pragma: no cover
+    TestClient = object  # type: ignore
+
+HOT_SKUS = 3
+INITIAL_STOCK = 60
+THREADS = 12
+ORDERS_PER_THREAD = 15
+
+
+def _seed(session_factory: sessionmaker, stocks: list[int | None]) -> tuple[User, list[Product]]:
+    with session_factory() as session:  # type: ignore[call-arg]
+        user = User(email="clerk@example.com", password_hash=hash_password("secret"), role=UserRole.CLERK)
+        products = [
+            Product(sku=f"HOT-{i}", name=f"Hot {i}", unit_price=Decimal("100.00"), tax_rate=Decimal("10.00"), stock=stock)
+            for i, stock in enumerate(stocks)
+        ]
+        session.add_all([user, *products])
+        session.commit()
+        return user, products
+
+
+def _auth_headers(client: "TestClient", email: str, password: str) -> dict[str, str]:
+    resp = client.post("/auth/login", json={"email": email, "password": password})
+    assert resp.status_code == 200, resp.text
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def test_orders_decrement_stock_and_reject_oversell(client_and_session: ClientAndSession) -> None:
+    client, session_factory = client_and_session
+    user, (tracked, untracked) = _seed(session_factory, [5, None])
+    headers = _auth_headers(client, user.email, "secret")
+
+    resp = client.post(
+        "/orders",
+        headers=headers,
+        json={"items": [{"product_id": tracked.id, "quantity": 3}, {"product_id": untracked.id, "quantity": 9}]},
+    )
+    assert resp.status_code == 201, resp.text
+    assert client.get(f"/products/{tracked.id}/stock", headers=headers).json() == {"product_id": tracked.id, "stock": 2}
+    assert client.get(f"/products/{untracked.id}/stock", headers=headers).json()["stock"] is None
+
+    resp = client.post("/orders", headers=headers, json={"items": [{"product_id": tracked.id, "quantity": 3}]})
+    assert resp.status_code == 409
+    assert resp.json()["detail"] == f"Insufficient stock for product {tracked.id}"
+
+    resp = client.post(
+        "/orders/batch",
+        headers=headers,
+        json={"orders": [{"items": [{"product_id": tracked.id, "quantity": 1}]} for _ in range(3)]},
+    )
+    assert resp.status_code == 200, resp.text
+    assert [result["status"] for result in resp.json()["results"]] == ["created", "created", "rejected"]
+    assert client.get(f"/products/{tracked.id}/stock", headers=headers).json()["stock"] == 0
+
+
+def test_hot_skus_never_oversell_under_concurrency(tmp_path: Path) -> None:
+    engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'stock.db'}", connect_args={"timeout": 30})
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    user, products = _seed(session_factory, [INITIAL_STOCK] * HOT_SKUS)
+    product_ids = [product.id for product in products]
+
+    def hammer(seed: int) -> tuple[int, int]:
+        rng = random.Random(seed)
+        created = rejected = 0
+        for _ in range(ORDERS_PER_THREAD):
+            # Lines in random order: the decrement itself must impose the lock order.
+            lines = rng.sample(product_ids, rng.randint(1, HOT_SKUS))
+            payload = OrderCreate(items=[{"product_id": pid, "quantity": rng.randint(1, 3)} for pid in lines])
+            with session_factory() as session:
+                try:
+                    place_order(session, payload, user)
+                    created += 1
+                except HTTPException as exc:
+                    assert exc.status_code == 409, exc.detail
+                    rejected += 1
+        return created, rejected
+
+    began = time.perf_counter()
+    with ThreadPoolExecutor(THREADS) as pool:
+        outcomes = list(pool.map(hammer, range(THREADS)))
+    elapsed = time.perf_counter() - began
+
+    created = sum(outcome[0] for outcome in outcomes)
+    rejected = sum(outcome[1] for outcome in outcomes)
+    with session_factory() as session:
+        stock = dict(session.execute(select(Product.id, Product.stock)).all())
+        sold_by_product = select(OrderItem.product_id, func.sum(OrderItem.quantity)).group_by(OrderItem.product_id)
+        sold = dict(session.execute(sold_by_product).all())
+    engine.dispose()
+    print(f"\n{created} created, {rejected} rejected, {(created + rejected) / elapsed:.0f} orders/s on {THREADS} threads")
+
+    assert created + rejected == THREADS * ORDERS_PER_THREAD
+    assert rejected, "demand should exceed stock"
+    for product_id in product_ids:
+        assert stock[product_id] >= 0
+        assert stock[product_id] + sold.get(product_id, 0) == INITIAL_STOCK
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from typing import Tuple
+
+from sqlalchemy.orm import sessionmaker
+
+ClientAndSession = Tuple["TestClient", sessionmaker]
+
+try:  # pragma: no cover
+    from fastapi.testclient import TestClient
+except ImportError:  # pragma: no cover
+    TestClient = object  # type: ignore
+
+
+def _sample(exposition: str, prefix: str) -> float:
+    for line in exposition.splitlines():
+        if line.startswith(prefix):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_metrics_record_requests_by_route_template(client_and_session: ClientAndSession) -> None:
+    client, _ = client_and_session
+    count = 'http_request_duration_seconds_count{method="PUT",route="/products/{product_id}",status="401"}'
+    before = _sample(client.get("/metrics").text, count)
+
+    for product_id in (1, 2, 3):
+        assert client.put(f"/products/{product_id}", json={"name": "x"}).status_code == 401
+    assert client.get("/no-such-page").status_code == 404
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    text = resp.text
+    assert _sample(text, count) == before + 3
+    assert 'route="<unmatched>",status="404"' in text
+    assert 'http_response_size_bytes_sum{method="PUT",route="/products/{product_id}",status="401"}' in text
+    assert _sample(text, 'http_requests_in_progress{method="GET"}') == 1.0
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.models import Base
+from app.services.order_numbers import BlockSequenceOrderNumbers
+
+PROCESSES = 4
+THREADS = 4
+DRAWS_PER_THREAD = 150
+
+
+def _draw_numbers(database_url: str) -> list[str]:
+    engine = create_engine(database_url, connect_args={"timeout": 30})
+    # A tiny block forces many concurrent refills of the shared counter row.
+    generator = BlockSequenceOrderNumbers(block_size=7)
+
+    def draw(_: int) -> list[str]:
+        with Session(engine) as session:
+            return [number for _ in range(DRAWS_PER_THREAD) for number in generator.take(session, 1)]
+
+    try:
+        with ThreadPoolExecutor(THREADS) as pool:
+            return [number for numbers in pool.map(draw, range(THREADS)) for number in numbers]
+    finally:
+        engine.dispose()
+
+
+def test_block_sequence_is_unique_across_processes(tmp_path: Path) -> None:
+    database_url = f"sqlite+pysqlite:///{tmp_path / 'order_numbers.db'}"
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+    with multiprocessing.get_context("spawn").Pool(PROCESSES) as pool:
+        drawn = [number for numbers in pool.map(_draw_numbers, [database_url] * PROCESSES) for number in numbers]
+
+    assert len(drawn) == PROCESSES * THREADS * DRAWS_PER_THREAD
+    assert len(set(drawn)) == len(drawn)
+    assert all(len(number.split("-")[1]) == 9 for number in drawn)
+
+
+def test_batch_larger_than_block_gets_consecutive_values(tmp_path: Path) -> None:
+    engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'order_numbers.db'}")
+    Base.metadata.create_all(engine)
+    generator = BlockSequenceOrderNumbers(block_size=10)
+
+    with Session(engine) as session:
+        first = generator.take(session, 3)
+        batch = generator.take(session, 25)
+
+    values = [int(number.split("-")[1]) for number in first + batch]
+    assert values == list(range(1, 4)) + list(range(4, 11)) + list(range(11, 29))
+    engine.dispose()
@@ -0,0 +1,328 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Tuple
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app.config import get_settings
+from app.models import IdempotencyKey, Order, Product, User, UserRole
+from app.routes.orders import NEXT_CURSOR_HEADER
+from app.services import idempotency
+from app.services.rollups import find_bucket_drift, find_rollup_drift
+from app.utils.security import hash_password
+
+ClientAndSession = Tuple["TestClient", sessionmaker]
+
+try:  # pragma: no cover
+    from fastapi.testclient import TestClient
+except ImportError:  # pragma: no cover
+    TestClient = object  # type: ignore
+
+
+def _seed(session_factory: sessionmaker) -> tuple[User, Product]:
+    with session_factory() as session:  # type: ignore[call-arg]
+        user = User(email="clerk@example.com", password_hash=hash_password("secret"), role=UserRole.CLERK)
+        product = Product(sku="SKU-001", name="Bottled Water", unit_price=Decimal("100.00"), tax_rate=Decimal("10.00"))
+        session.add_all([user, product])
+        session.commit()
+        session.refresh(user)
+        session.refresh(product)
+        return user, product
+
+
+def _auth_headers(client: "TestClient", email: str, password: str) -> dict[str, str]:
+    resp = client.post("/auth/login", json={"email": email, "password": password})
+    assert resp.status_code == 200, resp.text
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def _place_orders(client: "TestClient", headers: dict[str, str], product_id: int, count: int) -> list[int]:
+    ids = []
+    for _ in range(count):
+        resp = client.post("/orders", headers=headers, json={"items": [{"product_id": product_id, "quantity": 1}]})
+        assert resp.status_code == 201, resp.text
+        ids.append(resp.json()["id"])
+    return ids
+
+
+def test_list_orders_walks_pages_with_cursor(client_and_session: ClientAndSession) -> None:
+    client, session_factory = client_and_session
+    user, product = _seed(session_factory)
+    headers = _auth_headers(client, user.email, "secret")
+    created = _place_orders(client, headers, product.id, 5)
+
+    seen: list[int] = []
+    params: dict[str, object] = {"limit": 2}
+    while True:
+        resp = client.get("/orders", params=params)
+        assert resp.status_code == 200, resp.text
+        page = resp.json()
+        assert len(page) <= 2
+        assert all(order["items"] and order["payments"] for order in page)
+        seen.extend(order["id"] for order in page)
+        next_cursor = resp.headers.get("X-Next-Cursor")
+        if not next_cursor:
+            break
+        params = {"limit": 2, "cursor": next_cursor}
+
+    assert seen == sorted(created, reverse=True)
+
+
+def test_list_orders_filters(client_and_session: ClientAndSession) -> None:
+    client, session_factory = client_and_session
+    user, product = _seed(session_factory)
+    headers = _auth_headers(client, user.email, "secret")
+    _place_orders(client, headers, product.id, 2)
+
+    assert len(client.get("/orders", params={"status": "paid", "user_id": user.id}).json()) == 2
+    assert client.get("/orders", params={"status": "draft"}).json() == []
+    assert client.get("/orders", params={"user_id": user.id + 1}).json() == []
+    assert client.get("/orders", params={"from": "2999-01-01T00:00:00"}).json() == []
+
+
+@pytest.mark.parametrize("fields", [None, "id,total"])
+def test_list_orders_cursor_survives_deleting_the_anchor(
+    client_and_session: ClientAndSession, fields: str | None
+) -> None:
+    client, session_factory = client_and_session
+    user, product = _seed(session_factory)
+    headers = _auth_headers(client, user.email, "secret")
+    created = _place_orders(client, headers, product.id, 5)
+    params = {"limit": 2} if fields is None else {"limit": 2, "fields": fields}
+
+    first = client.get("/orders", params=params)
+    anchor = first.json()[-1]["id"]
+    with session_factory() as session:  # type: ignore[call-arg]
+        session.delete(session.get(Order, anchor))
+        session.commit()
+
+    rest = client.get("/orders", params={**params, "limit": 10, "cursor": first.headers[NEXT_CURSOR_HEADER]})
+    assert rest.status_code == 200, rest.text
+    assert [order["id"] for order in rest.json()] == sorted(created, reverse=True)[2:]
+    if fields is not None:
+        assert all(list(order) == ["id", "total"] for order in rest.json())  # the cursor column stays internal
+
+
+def test_list_orders_rejects_invalid_cursor(client_and_session: ClientAndSession) -> None:
+    client, _ = client_and_session
+    resp = client.get("/orders", params={"cursor": "not-a-cursor"})
+    assert resp.status_code == 400
+
+
+def test_export_orders_streams_ndjson_and_csv(client_and_session: ClientAndSession) -> None:
+    client, session_factory = client_and_session
+    user, product = _seed(session_factory)
+    headers = _auth_headers(client, user.email, "secret")
+    created = _place_orders(client, headers, product.id, 3)
+
+    ndjson = client.get("/orders/export", headers=headers, params={"format": "ndjson"})
+    assert ndjson.status_code == 200, ndjson.text
+    assert ndjson.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in ndjson.text.splitlines()]
+    assert [row["id"] for row in rows] == created
+    assert rows[0]["total"] == "110.00"
+    assert rows[0]["status"] == "paid"
+
+    exported = client.get("/orders/export", headers=headers, params={"format": "csv"})
+    assert exported.status_code == 200
+    records = list(csv.DictReader(io.StringIO(exported.text)))
+    assert [int(record["id"]) for record in records] == created
+
+    assert client.get("/orders/export").status_code == 401
+
+
+def _record_selects(session_factory: sessionmaker) -> list[str]:
+    statements: list[str] = []
+    engine = session_factory.kw["bind"]
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+def test_create_order_query_count_is_constant(client_and_session: ClientAndSession) -> None:
+    client, session_factory = client_and_session
+    user, _ = _seed(session_factory)
+    with session_factory() as session:  # type: ignore[call-arg]
+        extra = [Product(sku=f"SKU-X{i}", name=f"Item {i}", unit_price=Decimal("50.00")) for i in range(10)]
+        session.add_all(extra)
+        session.commit()
+        product_ids = [product.id for product in extra]
+    headers = _auth_headers(client, user.email, "secret")
+    statements = _record_selects(session_factory)
+
+    def place(items: list[dict[str, int]]) -> int:
+        statements.clear()
+        resp = client.post("/orders", headers=headers, json={"items": items})
+        assert resp.status_code == 201, resp.text
+        return len(statements)
+
+    place([{"product_id": product_ids[0], "quantity": 1}])  # warm the auth caches
+    single = place([{"product_id": product_ids[0], "quantity": 1}])
+    many = place([{"product_id": product_id, "quantity": 2} for product_id in product_ids * 4])
+    assert many == single
+
+
+def test_create_order_reports_all_unavailable_products(client_and_session: ClientAndSession) -> None:
+    client, session_factory = client_and_session
+    user, product = _seed(session_factory)
+    with session_factory() as session:  # type: ignore[call-arg]
+        inactive = Product(sku="SKU-OLD", name="Retired", unit_price=Decimal("10.00"), is_active=False)
+        session.add(inactive)
+        session.commit()
+        inactive_id = inactive.id
+    headers = _auth_headers(client, user.email, "secret")
+
+    resp = client.post(
+        "/orders",
+        headers=headers,
+        json={"items": [{"product_id": product.id, "quantity": 1}, {"product_id": inactive_id, "quantity": 1},
+                        {"product_id": 999, "quantity": 1}]},
+    )
+    assert resp.status_code == 404
+    assert resp.json()["detail"] == f"Product {inactive_id}, 999 not available"
+
+
+def test_batch_orders_match_single_orders_and_report_rejections(client_and_session: ClientAndSession) -> None:
+    client, session_factory = client_and_session
+    user, product = _seed(session_factory)
+    headers = _auth_headers(client, user.email, "secret")
+    sale = {"items": [{"product_id": product.id, "quantity": 3}], "payments": [{"amount": "400.00"}], "memo": "queued"}
+    single = client.post("/orders", headers=headers, json=sale).json()
+
+    batch = [sale] * 250 + [
+        {"items": [{"product_id": 999, "quantity": 1}]},
+        {"items": []},
+        {**sale, "user_id": user.id + 1},
+    ]
+    resp = client.post("/orders/batch", headers=headers, json={"orders": batch})
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert (body["created"], body["rejected"], body["failed"]) == (250, 3, 0)
+    assert [result["index"] for result in body["results"]] == list(range(253))
+    assert body["results"][250]["error"] == "Product 999 not available"
+    assert body["results"][252]["status"] == "rejected"
+    assert len({result["order_no"] for result in body["results"][:250]}) == 250
+
+    stored = client.get("/orders", params={"limit": 1}).json()[0]
+    assert stored["id"] == body["results"][249]["order_id"]
+    for field in ("subtotal", "tax_total", "total", "paid_amount", "change_amount", "status", "memo"):
+        assert stored[field] == single[field]
+    assert [(item["product_id"], item["line_total"]) for item in stored["items"]] == [
+        (item["product_id"], item["line_total"]) for item in single["items"]
+    ]
+    assert client.get("/reports").json()["total_orders"] == 251
+    with session_factory() as session:  # type: ignore[call-arg]
+        assert find_rollup_drift(session) == []
+        assert find_bucket_drift(session) == []
+
+
+def test_fast_json_order_page_matches_validated_response(
+    client_and_session: ClientAndSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    client, session_factory = client_and_session
+    user, product = _seed(session_factory)
+    headers = _auth_headers(client, user.email, "secret")
+    for memo in ("first", None, "третий"):
+        sale = {
+            "items": [{"product_id": product.id, "quantity": 2}, {"product_id": product.id, "quantity": 1}],
+            "payments": [{"method": "card", "amount": "200.00", "transaction_id": "T-1"}, {"amount": "150.5"}],
+            "memo": memo,
+        }
+        assert client.post("/orders", headers=headers, json=sale).status_code == 201
+
+    settings = get_settings()
+    pages = {}
+    for fast_json in (True, False):
+        monkeypatch.setattr(settings, "fast_json", fast_json)
+        resp = client.get("/orders", params={"limit": 2})
+        assert resp.status_code == 200, resp.text
+        pages[fast_json] = (resp.json(), resp.headers[NEXT_CURSOR_HEADER])
+    assert pages[True] == pages[False]
+    assert pages[True][0][0]["payments"][1]["amount"] == "150.50"
+
+
+def test_order_fields_project_columns_and_skip_unrequested_children(
+    client_and_session: ClientAndSession,
+) -> None:
+    client, session_factory = client_and_session
+    user, product = _seed(session_factory)
+    headers = _auth_headers(client, user.email, "secret")
+    for _ in range(3):
+        sale = {"items": [{"product_id": product.id, "quantity": 1}], "payments": [{"amount": "200.00"}]}
+        assert client.post("/orders", headers=headers, json=sale).status_code == 201
+    full = client.get("/orders", params={"limit": 2}).json()
+    statements = _record_selects(session_factory)
+
+    headers_only = client.get("/orders", params={"limit": 2, "fields": "total,order_no, status"})
+    assert headers_only.status_code == 200, headers_only.text
+    assert headers_only.json() == [
+        {"order_no": order["order_no"], "total": order["total"], "status": order["status"]} for order in full
+    ]
+    assert len(statements) == 1
+    assert "memo" not in statements[0] and "order_items" not in statements[0]
+
+    cursor = headers_only.headers[NEXT_CURSOR_HEADER]
+    next_page = client.get("/orders", params={"limit": 2, "cursor": cursor, "fields": "id"})
+    assert [order["id"] for order in next_page.json()] == [full[-1]["id"] - 1]
+
+    statements.clear()
+    with_items = client.get("/orders", params={"limit": 2, "fields": "id,items"}).json()
+    assert with_items == [{"id": order["id"], "items": order["items"]} for order in full]
+    assert len(statements) == 2 and not any("payments" in statement for statement in statements)
+
+    assert client.get("/orders", params={"fields": "id,description"}).status_code == 400
+    assert client.get("/orders", params={"fields": ","}).status_code == 400
+
+
+def test_idempotency_key_replays_original_order(client_and_session: ClientAndSession) -> None:
+    client, session_factory = client_and_session
+    user, product = _seed(session_factory)
+    headers = {**_auth_headers(client, user.email, "secret"), "Idempotency-Key": "terminal-7:sale-42"}
+    sale = {"items": [{"product_id": product.id, "quantity": 2}]}
+
+    first = client.post("/orders", headers=headers, json=sale)
+    assert first.status_code == 201, first.text
+    assert "Idempotent-Replayed" not in first.headers
+
+    cached = client.post("/orders", headers=headers, json=sale)
+    idempotency.response_cache.clear()  # as if the retry reached another worker
+    reloaded = client.post("/orders", headers=headers, json=sale)
+    for replay in (cached, reloaded):
+        assert replay.status_code == 201
+        assert replay.headers["Idempotent-Replayed"] == "true"
+        assert replay.json() == first.json()
+    assert client.get("/reports").json()["total_orders"] == 1
+
+    changed = client.post("/orders", headers=headers, json={"items": [{"product_id": product.id, "quantity": 3}]})
+    assert changed.status_code == 422
+
+
+def test_idempotency_key_claim_and_purge(client_and_session: ClientAndSession) -> None:
+    _, session_factory = client_and_session
+    user, _ = _seed(session_factory)
+
+    with session_factory() as first, session_factory() as second:  # type: ignore[call-arg]
+        assert idempotency.claim_key(first, user.id, "dup", "a" * 64) is not None
+        first.commit()
+        assert idempotency.claim_key(second, user.id, "dup", "a" * 64) is None
+
+    now = datetime.now(timezone.utc)
+    with session_factory() as session:  # type: ignore[call-arg]
+        session.add_all(
+            IdempotencyKey(user_id=user.id, key=f"old-{i}", request_hash="b" * 64, created_at=now - timedelta(days=2))
+            for i in range(5)
+        )
+        session.commit()
+        assert idempotency.purge_expired_keys(session, now=now, batch_size=2) == 5
+        assert [row.key for row in session.query(IdempotencyKey)] == ["dup"]
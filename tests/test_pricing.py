@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import random
+from decimal import ROUND_HALF_UP, Decimal
+
+from app.services.pricing import (
+    PriceLine,
+    from_minor,
+    price_basket,
+    price_baskets,
+    rate_to_basis_points,
+    settle,
+    to_minor,
+)
+
+CASES = 3000
+TAX_RATES = ("0.00", "8.00", "10.00", "5.50", "7.75", "20.00", "3.33")
+CENT = Decimal("0.01")
+
+
+def _quantize(amount: Decimal) -> Decimal:
+    return amount.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def _decimal_reference(lines: list[tuple[Decimal, int, Decimal]]) -> dict[str, object]:
+    """The per-line Decimal pricing orders used before the integer engine, kept as the oracle."""
+
+    subtotal = tax_total = Decimal("0")
+    line_totals = []
+    for unit_price, quantity, rate in lines:
+        line_subtotal = unit_price * quantity
+        line_tax = _quantize(line_subtotal * (rate / Decimal("100")))
+        subtotal += line_subtotal
+        tax_total += line_tax
+        line_totals.append(str(_quantize(line_subtotal + line_tax)))
+    subtotal, tax_total = _quantize(subtotal), _quantize(tax_total)
+    return {
+        "lines": line_totals,
+        "subtotal": str(subtotal),
+        "tax_total": str(tax_total),
+        "total": str(_quantize(subtotal + tax_total)),
+    }
+
+
+def _random_basket(rng: random.Random) -> list[tuple[Decimal, int, Decimal]]:
+    return [
+        (
+            Decimal(rng.choice([rng.randint(1, 99), rng.randint(1, 100_000), rng.randint(1, 10**10 - 1)])) / 100,
+            rng.choice([1, 1, 2, 3, rng.randint(1, 9999)]),
+            Decimal(rng.choice(TAX_RATES)),
+        )
+        for _ in range(rng.randint(1, 12))
+    ]
+
+
+def test_integer_engine_matches_decimal_rounding_on_random_baskets() -> None:
+    rng = random.Random(20261018)
+    baskets = [_random_basket(rng) for _ in range(CASES)]
+
+    priced = price_baskets(
+        [PriceLine(index, quantity, to_minor(price), rate_to_basis_points(rate)) for index, (price, quantity, rate)
+         in enumerate(basket)]
+        for basket in baskets
+    )
+
+    for basket, result in zip(baskets, priced):
+        assert {
+            "lines": [str(from_minor(line.total)) for line in result.lines],
+            "subtotal": str(from_minor(result.subtotal)),
+            "tax_total": str(from_minor(result.tax_total)),
+            "total": str(from_minor(result.total)),
+        } == _decimal_reference(basket), basket
+        assert sum(result.tax_by_rate.values()) == result.tax_total
+
+
+def test_tax_inclusive_lines_split_gross_into_net_and_tax() -> None:
+    basket = price_basket(
+        [
+            PriceLine(1, 3, to_minor("108.00"), 800, tax_inclusive=True),
+            PriceLine(2, 1, to_minor("1100.00"), 1000, tax_inclusive=True),
+            PriceLine(3, 2, to_minor("100.00"), 1000),
+        ]
+    )
+
+    assert [(line.net, line.tax, line.total) for line in basket.lines] == [
+        (30000, 2400, 32400),
+        (100000, 10000, 110000),
+        (20000, 2000, 22000),
+    ]
+    assert basket.tax_by_rate == {800: 2400, 1000: 12000}
+    assert (basket.subtotal, basket.tax_total, basket.total) == (150000, 14400, 164400)
+
+
+def test_minor_unit_conversions_round_half_up() -> None:
+    assert to_minor("1.005") == 101
+    assert to_minor(Decimal("-1.005")) == -101
+    assert str(from_minor(100)) == "1.00"
+    assert settle(1000, [600, 500]) == (1100, 100)
+    assert settle(1000, [600]) == (600, 0)
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from typing import Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import sessionmaker
+
+from app.models import ProductNameGram, User, UserRole
+from app.services.product_search import name_grams, normalize
+from app.utils.security import hash_password
+
+ClientAndSession = Tuple["TestClient", sessionmaker]
+
+try:  # pragma: no cover
+    from fastapi.testclient import TestClient
+except ImportError:  # pragma: no cover
+    TestClient = object  # type: ignore
+
+PRODUCTS = [
+    {"sku": "4901234567894", "name": "おーいお茶 緑茶 525ml", "unit_price": "140.00"},
+    {"sku": "4901234500001", "name": "ジョージア ブラックコーヒー", "unit_price": "130.00"},
+    {"sku": "4902102072618", "name": "Coca-Cola Zero 500ml", "unit_price": "160.00"},
+    {"sku": "COFFEE-BEANS", "name": "Roasted beans", "unit_price": "980.00"},
+]
+
+
+def _auth_headers(client: "TestClient", session_factory: sessionmaker) -> dict[str, str]:
+    with session_factory() as session:  # type: ignore[call-arg]
+        session.add(User(email="admin@example.com", password_hash=hash_password("secret"), role=UserRole.ADMIN))
+        session.commit()
+    resp = client.post("/auth/login", json={"email": "admin@example.com", "password": "secret"})
+    assert resp.status_code == 200, resp.text
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def _seed(client: "TestClient", session_factory: sessionmaker) -> tuple[dict[str, str], list[int]]:
+    headers = _auth_headers(client, session_factory)
+    ids = []
+    for product in PRODUCTS:
+        resp = client.post("/products", headers=headers, json=product)
+        assert resp.status_code == 201, resp.text
+        ids.append(resp.json()["id"])
+    return headers, ids
+
+
+def _search(client: "TestClient", query: str, **params: object) -> list[str]:
+    resp = client.get("/products/search", params={"q": query, **params})
+    assert resp.status_code == 200, resp.text
+    return [product["sku"] for product in resp.json()]
+
+
+def test_normalize_folds_width_case_and_kana() -> None:
+    assert normalize("ｺｰﾋｰ  ＢＬＡＣＫ") == normalize("こーひー black") == "コーヒー black"
+    assert name_grams("お茶") == {"オ茶", "茶 "}
+
+
+def test_lookup_by_sku_is_served_from_cache_per_catalog_version(client_and_session: ClientAndSession) -> None:
+    client, session_factory = client_and_session
+    headers, ids = _seed(client, session_factory)
+
+    statements: list[str] = []
+    engine = session_factory.kw["bind"]
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    first = client.get(f"/products/by-sku/{PRODUCTS[0]['sku']}")
+    assert first.status_code == 200, first.text
+    assert first.json()["id"] == ids[0] and first.json()["unit_price"] == "140.00"
+    assert any("products.sku = " in statement for statement in statements)
+    statements.clear()
+    assert client.get(f"/products/by-sku/{PRODUCTS[0]['sku']}").json() == first.json()
+    assert not any("products.sku = " in statement for statement in statements)
+
+    assert client.get("/products/by-sku/0000000000000").status_code == 404
+    assert client.put(f"/products/{ids[0]}", headers=headers, json={"is_active": False}).status_code == 200
+    assert client.get(f"/products/by-sku/{PRODUCTS[0]['sku']}").status_code == 404
+
+
+def test_search_matches_sku_prefix_and_japanese_names(client_and_session: ClientAndSession) -> None:
+    client, session_factory = client_and_session
+    headers, ids = _seed(client, session_factory)
+
+    assert _search(client, "4901234") == ["4901234500001", "4901234567894"]
+    assert _search(client, "4901234", limit=1) == ["4901234500001"]
+    assert _search(client, "コーヒー") == ["4901234500001"]
+    assert _search(client, "ｺｰﾋｰ") == ["4901234500001"]
+    assert _search(client, "おちゃ") == []
+    assert _search(client, "お茶") == ["4901234567894"]
+    assert _search(client, "茶") == ["4901234567894"]
+    assert _search(client, "cola zero") == ["4902102072618"]
+    assert _search(client, "ml") == ["4901234567894", "4902102072618"]
+    assert _search(client, "ｍｌ 緑") == []  # bigrams present, but not as one substring
+    assert _search(client, "COFFEE") == ["COFFEE-BEANS"]
+
+    assert client.put(f"/products/{ids[1]}", headers=headers, json={"name": "ジョージア 微糖"}).status_code == 200
+    assert _search(client, "コーヒー") == []
+    assert _search(client, "微糖") == ["4901234500001"]
+    assert client.delete(f"/products/{ids[1]}", headers=headers).status_code == 204
+    assert _search(client, "微糖") == []
+    with session_factory() as session:  # type: ignore[call-arg]
+        assert session.scalars(select(ProductNameGram).where(ProductNameGram.product_id == ids[1])).all() == []
+
+    assert client.get("/products/search", params={"q": ""}).status_code == 422
+
+
+def test_names_indexed_after_a_miss_are_found(client_and_session: ClientAndSession) -> None:
+    client, session_factory = client_and_session
+    headers, _ = _seed(client, session_factory)
+
+    assert _search(client, "ラテ") == []  # caches a zero posting size for its gram
+    resp = client.post("/products", headers=headers, json={"sku": "MATCHA-LATTE", "name": "抹茶ラテ", "unit_price": "180.00"})
+    assert resp.status_code == 201, resp.text
+    assert _search(client, "ラテ") == ["MATCHA-LATTE"]
+
+
+def test_single_character_search_returns_the_lowest_ids(client_and_session: ClientAndSession) -> None:
+    client, session_factory = client_and_session
+    headers = _auth_headers(client, session_factory)
+    # Gram order ("ab" < "am" < "az") is the reverse of creation order.
+    for sku, name in (("SKU-Z", "az"), ("SKU-M", "am"), ("SKU-B", "ab")):
+        resp = client.post("/products", headers=headers, json={"sku": sku, "name": name, "unit_price": "100.00"})
+        assert resp.status_code == 201, resp.text
+
+    assert _search(client, "a", limit=2) == ["SKU-Z", "SKU-M"]
+    assert _search(client, "a") == ["SKU-Z", "SKU-M", "SKU-B"]
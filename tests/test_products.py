@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from typing import Tuple
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app.config import get_settings
+from app.models import User, UserRole
+from app.services.catalog import catalog_cache
+from app.utils.security import hash_password
+
+ClientAndSession = Tuple["TestClient", sessionmaker]
+
+try:  # pragma: no cover
+    from fastapi.testclient import TestClient
+except ImportError:  # pragma: no cover
+    TestClient = object  # type: ignore
+
+PRODUCT = {"sku": "SKU-001", "name": "Bottled Water", "unit_price": "100.00", "tax_rate": "10.00"}
+
+
+def _auth_headers(client: "TestClient", session_factory: sessionmaker) -> dict[str, str]:
+    with session_factory() as session:  # type: ignore[call-arg]
+        session.add(User(email="admin@example.com", password_hash=hash_password("secret"), role=UserRole.ADMIN))
+        session.commit()
+    resp = client.post("/auth/login", json={"email": "admin@example.com", "password": "secret"})
+    assert resp.status_code == 200, resp.text
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def test_list_products_etag_round_trip(client_and_session: ClientAndSession) -> None:
+    client, session_factory = client_and_session
+    headers = _auth_headers(client, session_factory)
+    created = client.post("/products", headers=headers, json=PRODUCT)
+    assert created.status_code == 201, created.text
+
+    first = client.get("/products")
+    assert first.status_code == 200
+    assert [product["sku"] for product in first.json()] == ["SKU-001"]
+    assert first.json()[0]["unit_price"] == "100.00"
+    etag = first.headers["ETag"]
+
+    statements: list[str] = []
+    engine = session_factory.kw["bind"]
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        cached = client.get("/products", headers={"If-None-Match": etag})
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+    assert statements == []
+
+    updated = client.put(f"/products/{created.json()['id']}", headers=headers, json={"name": "Sparkling Water"})
+    assert updated.status_code == 200
+
+    refreshed = client.get("/products", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.headers["ETag"] != etag
+    assert refreshed.json()[0]["name"] == "Sparkling Water"
+
+
+def test_fast_json_catalog_matches_validated_body(
+    client_and_session: ClientAndSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    client, session_factory = client_and_session
+    headers = _auth_headers(client, session_factory)
+    for index, price in enumerate(("100.00", "0.5", "1234567.89")):
+        product = {**PRODUCT, "sku": f"SKU-{index}", "unit_price": price, "description": "説明" if index else None}
+        assert client.post("/products", headers=headers, json=product).status_code == 201
+
+    bodies = {}
+    for fast_json in (True, False):
+        monkeypatch.setattr(get_settings(), "fast_json", fast_json)
+        catalog_cache.clear()
+        bodies[fast_json] = client.get("/products").json()
+    assert bodies[True] == bodies[False]
+    assert [product["unit_price"] for product in bodies[True]] == ["100.00", "0.50", "1234567.89"]
+
+
+def test_product_fields_return_only_requested_columns(client_and_session: ClientAndSession) -> None:
+    client, session_factory = client_and_session
+    headers = _auth_headers(client, session_factory)
+    assert client.post("/products", headers=headers, json={**PRODUCT, "description": "long text"}).status_code == 201
+
+    terminal = client.get("/products", params={"fields": "tax_rate,id,sku,name,unit_price"})
+    assert terminal.status_code == 200, terminal.text
+    assert [list(product) for product in terminal.json()] == [["id", "sku", "name", "unit_price", "tax_rate"]]
+    assert client.get("/products").json()[0]["description"] == "long text"  # cached per field selection
+    assert client.get("/products", params={"fields": "sku,sku"}).json() == [{"sku": PRODUCT["sku"]}]
+
+    unknown = client.get("/products", params={"fields": "sku,stock"})
+    assert unknown.status_code == 400
+    assert unknown.json()["detail"] == "Unknown field(s): stock"
+
+
+def test_catalog_etag_differs_per_field_selection(client_and_session: ClientAndSession) -> None:
+    client, session_factory = client_and_session
+    headers = _auth_headers(client, session_factory)
+    created = client.post("/products", headers=headers, json=PRODUCT)
+    assert created.status_code == 201, created.text
+
+    full = client.get("/products").headers["ETag"]
+    sparse = client.get("/products", params={"fields": "sku,id"}).headers["ETag"]
+    assert sparse != full
+    assert client.get("/products", params={"fields": "id,sku,id"}).headers["ETag"] == sparse  # normalised
+
+    # A validator for one representation never revalidates another.
+    other = client.get("/products", params={"fields": "id,sku"}, headers={"If-None-Match": full})
+    assert other.status_code == 200
+    assert other.json() == [{"id": created.json()["id"], "sku": PRODUCT["sku"]}]
+    revalidated = client.get("/products", params={"fields": "id,sku"}, headers={"If-None-Match": f"{full}, {sparse}"})
+    assert revalidated.status_code == 304
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from decimal import Decimal
+from typing import Tuple
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import db as app_db
+from app.config import get_settings
+from app.db import Base, get_db
+from app.main import create_app
+from app.models import Product, User, UserRole
+from app.services.catalog import catalog_cache
+from app.utils import replicas as replicas_module
+from app.utils.replicas import LAST_WRITE_HEADER, ReplicaSet, recent_writers
+from app.utils.security import hash_password
+
+try:  # pragma: no cover
+    from fastapi.testclient import TestClient
+except ImportError:  # pragma: no cover
+    TestClient = object  # type: ignore
+
+ReplicaClient = Tuple["TestClient", sessionmaker, sessionmaker]
+PRODUCT = {"sku": "SKU-001", "name": "Bottled Water", "unit_price": "100.00", "tax_rate": "10.00"}
+
+
+def _memory_sessionmaker() -> sessionmaker:
+    engine = create_engine("sqlite+pysqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+
+@pytest.fixture()
+def replica_client(monkeypatch: pytest.MonkeyPatch, tmp_path) -> Iterator[ReplicaClient]:  # noqa: ANN001
+    primary = _memory_sessionmaker()
+    replica = _memory_sessionmaker()
+    # Opening a database inside a missing directory fails at connect time, like an unreachable host.
+    unreachable = sessionmaker(bind=create_engine(f"sqlite+pysqlite:///{tmp_path / 'missing' / 'replica.db'}"))
+    replicas = ReplicaSet([("down", unreachable), ("replica", replica)], retry_after=60.0)
+    monkeypatch.setattr(app_db, "read_replicas", replicas)
+    monkeypatch.setattr(get_settings(), "database_read_urls", ["sqlite://"])
+    app = create_app()
+
+    def override_get_db():
+        session = primary()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    catalog_cache.clear()
+    recent_writers.clear()
+    with TestClient(app) as client:
+        yield client, primary, replica
+    catalog_cache.clear()
+    recent_writers.clear()
+
+
+def _auth_headers(client: "TestClient", session_factory: sessionmaker, email: str = "admin@example.com") -> dict[str, str]:
+    with session_factory() as session:  # type: ignore[call-arg]
+        session.add(User(email=email, password_hash=hash_password("secret"), role=UserRole.ADMIN))
+        session.commit()
+    resp = client.post("/auth/login", json={"email": email, "password": "secret"})
+    assert resp.status_code == 200, resp.text
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def test_reads_use_primary_after_the_same_user_writes(replica_client: ReplicaClient) -> None:
+    client, primary, _ = replica_client
+    headers = _auth_headers(client, primary)
+    other = _auth_headers(client, primary, email="clerk@example.com")
+
+    assert client.get("/reports", headers=headers).json()["total_products"] == 0  # the replica has not caught up
+
+    created = client.post("/products", headers=headers, json=PRODUCT)
+    assert created.status_code == 201, created.text
+    assert not created.headers.get("set-cookie")  # bearer clients never send cookies back
+    assert client.get("/reports", headers=headers).json()["total_products"] == 1
+    assert [product["sku"] for product in client.get("/products", headers=headers).json()] == ["SKU-001"]
+
+    # Other users and anonymous reads stay on the replica.
+    assert client.get("/reports", headers=other).json()["total_products"] == 0
+    assert client.get("/reports").json()["total_products"] == 0
+
+    # Echoing the response header pins reads to the primary on any worker.
+    echoed = {LAST_WRITE_HEADER: created.headers[LAST_WRITE_HEADER]}
+    assert client.get("/reports", headers=echoed).json()["total_products"] == 1
+    assert client.get("/reports", headers={LAST_WRITE_HEADER: f"{time.time() - 3600:.3f}"}).json()["total_products"] == 0
+
+    recent_writers.clear()
+    assert client.get("/reports", headers=headers).json()["total_products"] == 0
+
+
+def test_unreachable_replicas_fail_over_and_are_retried(
+    replica_client: ReplicaClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    client, _, replica = replica_client
+    with replica() as session:  # type: ignore[call-arg]
+        session.add(Product(sku="SKU-R", name="Replicated", unit_price=Decimal("10.00")))
+        session.commit()
+
+    def products_seen() -> int:
+        resp = client.get("/reports")
+        assert resp.status_code == 200, resp.text
+        return resp.json()["total_products"]
+
+    assert [products_seen() for _ in range(3)] == [1, 1, 1]
+    status = {entry["name"]: entry for entry in app_db.read_replicas.status()}
+    assert status["down"] == {"name": "down", "healthy": False, "failures": 1}
+    assert status["replica"] == {"name": "replica", "healthy": True, "failures": 0}
+
+    app_db.read_replicas.mark_down("replica")
+    assert products_seen() == 0  # no healthy replica left: the primary answers
+
+    clock = time.monotonic
+    monkeypatch.setattr(replicas_module.time, "monotonic", lambda: clock() + 61)  # past retry_after
+    assert products_seen() == 1
+    assert {entry["name"]: entry["failures"] for entry in app_db.read_replicas.status()} == {"down": 2, "replica": 1}
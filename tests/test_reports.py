@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Tuple
+
+from sqlalchemy import update
+from sqlalchemy.orm import sessionmaker
+
+from app.models import DailySalesRollup, Product, User, UserRole
+from app.services.rollups import find_bucket_drift, find_rollup_drift, net_payment_lines, rebuild_rollups
+from app.utils.security import hash_password
+
+ClientAndSession = Tuple["TestClient", sessionmaker]
+
+try:  # pragma: no cover
+    from fastapi.testclient import TestClient
+except ImportError:  # pragma: no cover
+    TestClient = object  # type: ignore
+
+
+def _checkout(client: "TestClient", session_factory: sessionmaker, count: int) -> None:
+    with session_factory() as session:  # type: ignore[call-arg]
+        session.add(User(email="clerk@example.com", password_hash=hash_password("secret"), role=UserRole.CLERK))
+        product = Product(sku="SKU-001", name="Coffee", unit_price=Decimal("300.00"), tax_rate=Decimal("8.00"))
+        session.add(product)
+        session.commit()
+        product_id = product.id
+    token = client.post("/auth/login", json={"email": "clerk@example.com", "password": "secret"}).json()["access_token"]
+    for _ in range(count):
+        resp = client.post(
+            "/orders",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"items": [{"product_id": product_id, "quantity": 1}], "payments": [{"amount": "500.00"}]},
+        )
+        assert resp.status_code == 201, resp.text
+
+
+def test_summary_report_reads_rollups(client_and_session: ClientAndSession) -> None:
+    client, session_factory = client_and_session
+    _checkout(client, session_factory, 3)
+
+    summary = client.get("/reports").json()
+    assert summary["total_products"] == 1
+    assert summary["total_orders"] == 3
+    assert Decimal(summary["total_revenue"]) == Decimal("972.00")
+    assert Decimal(summary["total_payments"]) == Decimal("1500.00")
+
+
+def test_rollup_drift_is_detected_and_repaired(client_and_session: ClientAndSession) -> None:
+    client, session_factory = client_and_session
+    _checkout(client, session_factory, 2)
+
+    with session_factory() as session:  # type: ignore[call-arg]
+        assert find_rollup_drift(session) == []
+        assert find_bucket_drift(session) == []
+        session.execute(update(DailySalesRollup).values(order_count=DailySalesRollup.order_count + 5))
+        session.commit()
+
+        drift = find_rollup_drift(session)
+        assert len(drift) == 1
+        assert drift[0].actual.order_count == 7
+        assert drift[0].expected.order_count == 2
+
+        rebuild_rollups(session)
+        session.commit()
+        assert find_rollup_drift(session) == []
+        assert find_bucket_drift(session) == []
+
+
+def test_sales_report_groups_by_product_and_payment_method(client_and_session: ClientAndSession) -> None:
+    client, session_factory = client_and_session
+    _checkout(client, session_factory, 2)
+    window = {"from": "2000-01-01T00:00:00", "to": "2999-01-01T00:00:00"}
+
+    by_product = client.get("/reports/sales", params={**window, "granularity": "day", "group_by": "product"})
+    assert by_product.status_code == 200, by_product.text
+    report = by_product.json()
+    assert report["granularity"] == "day"
+    assert len(report["buckets"]) == 1
+    bucket = report["buckets"][0]
+    assert bucket["order_count"] == 2
+    assert bucket["quantity"] == 2
+    assert Decimal(bucket["amount"]) == Decimal("648.00")
+    assert bucket["bucket_start"].endswith("T00:00:00+09:00")
+
+    by_method = client.get("/reports/sales", params={**window, "granularity": "hour", "group_by": "payment_method"})
+    assert by_method.status_code == 200, by_method.text
+    buckets = by_method.json()["buckets"]
+    assert {entry["key"] for entry in buckets} == {"cash"}
+    assert sum(Decimal(entry["amount"]) for entry in buckets) == Decimal("648.00")  # 500 tendered, 176 change
+
+    inverted = client.get("/reports/sales", params={"from": window["to"], "to": window["from"]})
+    assert inverted.status_code == 400
+
+
+def test_payment_method_buckets_count_the_order_total_net_of_change(client_and_session: ClientAndSession) -> None:
+    client, session_factory = client_and_session
+    _checkout(client, session_factory, 1)
+    token = client.post("/auth/login", json={"email": "clerk@example.com", "password": "secret"}).json()["access_token"]
+    product_id = client.get("/products").json()[0]["id"]
+    mixed = client.post(
+        "/orders",
+        headers={"Authorization": f"Bearer {token}"},
+        json={
+            "items": [{"product_id": product_id, "quantity": 1}],
+            "payments": [{"method": "cash", "amount": "500.00"}, {"method": "card", "amount": "200.00"}],
+        },
+    )
+    assert mixed.status_code == 201, mixed.text
+    assert Decimal(mixed.json()["change_amount"]) == Decimal("376.00")
+
+    window = {"from": "2000-01-01T00:00:00", "to": "2999-01-01T00:00:00", "granularity": "day"}
+    buckets = client.get("/reports/sales", params={**window, "group_by": "payment_method"}).json()["buckets"]
+    by_method = {entry["key"]: (entry["order_count"], Decimal(entry["amount"])) for entry in buckets}
+    # Change comes back in cash: 324 + (500 - 376) cash, the card's 200 in full.
+    assert by_method == {"cash": (2, Decimal("448.00")), "card": (1, Decimal("200.00"))}
+
+    with session_factory() as session:  # type: ignore[call-arg]
+        assert find_bucket_drift(session) == []
+
+
+def test_net_payment_lines_takes_change_from_cash_first() -> None:
+    cash, card, qr = "cash", "card", "qr"
+    assert net_payment_lines([(cash, Decimal("500"))], Decimal("176")) == [(cash, Decimal("324"))]
+    assert net_payment_lines([(card, Decimal("300")), (cash, Decimal("100"))], Decimal("150")) == [(card, Decimal("250"))]
+    assert net_payment_lines([(card, Decimal("100")), (qr, Decimal("100"))], Decimal("50")) == [
+        (card, Decimal("100")), (qr, Decimal("50")),
+    ]
+    assert net_payment_lines([(cash, Decimal("100"))], Decimal("0")) == [(cash, Decimal("100"))]
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import logging
+from typing import Tuple
+
+import pytest
+from fastapi import Depends, FastAPI
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import Settings
+from app.db import get_db
+from app.models import Product
+from app.utils.sql_stats import QueryAccountingMiddleware, RepeatedQueryError, fingerprint, guard
+
+ClientAndSession = Tuple["TestClient", sessionmaker]
+
+try:  # pragma: no cover
+    from fastapi.testclient import TestClient
+except ImportError:  # pragma: no cover
+    TestClient = object  # type: ignore
+
+
+def test_fingerprint_ignores_literals_and_in_list_length() -> None:
+    assert fingerprint("SELECT * FROM t WHERE id IN (?, ?, ?) AND name = 'x'") == fingerprint(
+        "SELECT *  FROM t\nWHERE id IN (?, ?) AND name = 'y''s'"
+    )
+    assert fingerprint("SELECT anon_1.id FROM t LIMIT 50") == "SELECT anon_1.id FROM t LIMIT ?"
+
+
+def test_server_timing_reports_queries(client_and_session: ClientAndSession) -> None:
+    client, _ = client_and_session
+
+    resp = client.get("/reports")
+    assert resp.status_code == 200
+    assert resp.headers["Server-Timing"].startswith("db;dur=")
+    assert resp.headers["Server-Timing"].endswith('desc="1 queries"')
+
+
+def test_slow_queries_are_logged_with_fingerprint(
+    client_and_session: ClientAndSession, caplog: pytest.LogCaptureFixture, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    client, _ = client_and_session
+    monkeypatch.setattr(guard, "slow_query_ms", 1e-6)
+
+    with caplog.at_level(logging.WARNING, logger="app.sql"):
+        client.get("/reports")
+    assert any("slow query" in record.getMessage() and "FROM daily_sales_rollups" in record.getMessage()
+               for record in caplog.records)
+
+
+def test_slow_query_parameters_are_hidden_by_default(
+    client_and_session: ClientAndSession, caplog: pytest.LogCaptureFixture, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    client, _ = client_and_session
+    monkeypatch.delenv("SLOW_QUERY_LOG_PARAMETERS", raising=False)
+    assert Settings().slow_query_log_parameters is False
+    monkeypatch.setattr(guard, "slow_query_ms", 1e-6)
+    monkeypatch.setattr(guard, "log_parameters", False)
+
+    with caplog.at_level(logging.WARNING, logger="app.sql"):
+        client.post("/auth/login", json={"email": "someone@example.com", "password": "secret"})
+    messages = [record.getMessage() for record in caplog.records if "slow query" in record.getMessage()]
+    assert messages and all(message.endswith("params=<hidden>") for message in messages)
+    assert not any("someone@example.com" in message for message in messages)
+
+
+def test_repeated_statement_fails_in_strict_mode(
+    client_and_session: ClientAndSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _, session_factory = client_and_session
+    monkeypatch.setattr(guard, "repeat_limit", 2)
+
+    app = FastAPI()
+    app.add_middleware(QueryAccountingMiddleware)
+
+    @app.get("/n-plus-one")
+    def n_plus_one(db: Session = Depends(get_db)) -> int:
+        for product_id in (1, 2, 3):
+            db.execute(select(Product).where(Product.id == product_id))
+        return 3
+
+    @app.get("/batched")
+    def batched(db: Session = Depends(get_db)) -> int:
+        db.execute(select(Product).where(Product.id.in_([1, 2, 3])))
+        db.execute(text("SELECT 1"))
+        return 2
+
+    def override_get_db():
+        with session_factory() as session:  # type: ignore[call-arg]
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    with TestClient(app) as client:
+        assert client.get("/batched").headers["Server-Timing"].endswith('desc="2 queries"')
+        with pytest.raises(RepeatedQueryError, match="ran one statement 3 times"):
+            client.get("/n-plus-one")